@@ -1,51 +1,161 @@
-from flask import Flask, jsonify, request
+import time
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from controller.book_recommend_controller import book_bp
 from controller.movie_recommend_controller import movie_bp
 from controller.user_controller import user_bp
 from controller.wishlist_controller import wishlist_bp
 from controller.rating_controller import rating_bp
+from controller.admin_controller import admin_bp
+from model import registry
+from model.registry import ComponentUnavailable
+from model.single_flight import SingleFlightTimeout
+from model.http_cache import apply_cache_policy
+from model.projection import InvalidFields
+from model.serialization import json_provider
+from model.compression import compress_response
+from model import metrics, tracing
+from model.profiler import get_profiler
+from model.activity_retention import ActivityRetentionJob
+from model.model_reloader import ModelWatcher, get_model_reloader
+from configs.config import ACTIVITY_RETENTION_JOB, MODEL_WARMUP, MODEL_WATCH_INTERVAL, METRICS_ENABLED
 
-# Flask constructor takes the name of current module (__name__) as argument.app is a instance of the Flask app
-app = Flask(__name__)
-
-# Configure CORS with specific settings
-CORS(app, 
-     resources={
-         r"/*": {
-             "origins": ["http://localhost:5173", "http://127.0.0.1:5173"],
-             "allow_headers": ["Content-Type", "Authorization"],
-             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-             "supports_credentials": True,
-             "expose_headers": ["Content-Type", "Authorization"]
-         }
-     })
-
-# Register blueprints
-app.register_blueprint(book_bp)
-app.register_blueprint(rating_bp)
-app.register_blueprint(movie_bp)
-app.register_blueprint(user_bp)
-app.register_blueprint(wishlist_bp)
-
-
-# Add CORS headers to all responses
-@app.after_request
-def after_request(response):
-    response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-    response.headers.add('Access-Control-Allow-Credentials', 'true')
-    return response
-
-# The route() function of the Flask class is a decorator, which tells the application which URL should call the associated function.
-@app.route("/")
-def home():
-    return "Welcome to the SujhavMitra!"
+
+def start_background_tasks():
+    """Per-process threads: model warm-up, the artifact watcher and the activity retention job"""
+    if MODEL_WARMUP:
+        registry.start_warm_up()
+
+    # Hot-swap to a newly activated artifact version (models/CURRENT)
+    if MODEL_WATCH_INTERVAL > 0:
+        ModelWatcher(get_model_reloader()).start()
+
+    # Periodically roll up and purge old sm_user_activity rows
+    if ACTIVITY_RETENTION_JOB:
+        ActivityRetentionJob().start()
+
+
+def create_app(preload=False):
+    """
+    Build the Flask app. Importing this module loads nothing heavy: model
+    artifacts, the DB pool and the endpoint ACL are created on a background
+    warm-up thread (or on first use), so the process binds its port at once
+    and /readyz tells the load balancer when it can take traffic.
+
+    With preload=True (the gunicorn master, see gunicorn.conf.py) the model
+    artifacts are loaded synchronously before the workers are forked, and
+    the background tasks are left for each worker to start after the fork.
+    """
+    # Flask constructor takes the name of current module (__name__) as argument.app is a instance of the Flask app
+    app = Flask(__name__)
+    app.json = json_provider(app)
+
+    # Configure CORS with specific settings
+    CORS(app, 
+         resources={
+             r"/*": {
+                 "origins": ["http://localhost:5173", "http://127.0.0.1:5173"],
+                 "allow_headers": ["Content-Type", "Authorization", "X-Request-ID", "X-Trace", "X-Profile"],
+                 "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+                 "supports_credentials": True,
+                 "expose_headers": ["Content-Type", "Authorization", "X-Model-Version", "ETag", "X-Request-ID"]
+             }
+         })
+
+    # Register blueprints
+    app.register_blueprint(book_bp)
+    app.register_blueprint(rating_bp)
+    app.register_blueprint(movie_bp)
+    app.register_blueprint(user_bp)
+    app.register_blueprint(wishlist_bp)
+    app.register_blueprint(admin_bp)
+
+    @app.before_request
+    def start_timer():
+        g._request_start = time.perf_counter()
+        tracing.begin_trace()
+        get_profiler().begin_request()
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        get_profiler().end_request(exc)
+
+    # Add CORS headers to all responses
+    @app.after_request
+    def after_request(response):
+        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+        response.headers.add('Access-Control-Allow-Credentials', 'true')
+        response.headers.add('Timing-Allow-Origin', 'http://localhost:5173')
+
+        # Artifact version of the models that served this request
+        version = registry.model_version()
+        if version:
+            response.headers['X-Model-Version'] = version
+
+        # Cache-Control per blueprint (public + ETag for book/movie, no-store for user data)
+        response = apply_cache_policy(response)
+
+        # Last: gzip/brotli large JSON bodies
+        response = compress_response(response)
+
+        # Server-Timing / X-Request-ID, and the sampled trace log line
+        response = tracing.finish_trace(response)
+
+        # Latency per route template (not per URL, to keep the label set small)
+        start = g.get("_request_start")
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - start)
+        return response
+
+    # A model that failed to load answers 503 instead of a stack trace
+    @app.errorhandler(ComponentUnavailable)
+    def component_unavailable(e):
+        return jsonify({"error": str(e)}), 503
+
+    # ?fields= named something the endpoint does not return
+    @app.errorhandler(InvalidFields)
+    def invalid_fields(e):
+        return jsonify({"error": str(e)}), 400
+
+    # A coalesced request waited too long for the identical in-flight one
+    @app.errorhandler(SingleFlightTimeout)
+    def single_flight_timeout(e):
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+
+    # The route() function of the Flask class is a decorator, which tells the application which URL should call the associated function.
+    @app.route("/")
+    def home():
+        return "Welcome to the SujhavMitra!"
+
+    # Liveness: the process is up and serving requests
+    @app.route("/healthz")
+    def healthz():
+        return jsonify({"status": "ok"}), 200
+
+    # Readiness: database, ACL and model artifacts are loaded
+    @app.route("/readyz")
+    def readyz():
+        ready, components = registry.readiness()
+        return jsonify({"ready": ready, "components": components}), 200 if ready else 503
+
+    if METRICS_ENABLED:
+        @app.route("/metrics")
+        def prometheus_metrics():
+            return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+    if preload:
+        registry.preload()
+    else:
+        start_background_tasks()
+
+    return app
 
 
 # main driver function
 if __name__ == "__main__":
     # run() method of Flask class runs the application on the local development server.
     # Use 0.0.0.0 to make it accessible from other devices on the same network
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
@@ -9,9 +9,119 @@ dbconfig = {
     "database": os.getenv("DB_NAME", "db_sujhavmitranew")
 }
 
+# Connection pool configuration
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))  # seconds to wait for a free connection
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))  # replace connections older than this
+DB_POOL_PING_INTERVAL = int(os.getenv("DB_POOL_PING_INTERVAL", 30))  # ping idle connections before reuse
+
+# Asynchronous sm_user_activity writer
+ACTIVITY_QUEUE_SIZE = int(os.getenv("ACTIVITY_QUEUE_SIZE", 10000))  # events held in memory before dropping
+ACTIVITY_BATCH_SIZE = int(os.getenv("ACTIVITY_BATCH_SIZE", 200))  # rows per multi-row INSERT
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", 2))  # seconds between flushes
+
+# Activity retention: raw events older than ACTIVITY_RETENTION_DAYS are purged after
+# being rolled up into sm_user_activity_daily
+ACTIVITY_RETENTION_DAYS = int(os.getenv("ACTIVITY_RETENTION_DAYS", 90))
+ACTIVITY_ROLLUP_LOOKBACK_DAYS = int(os.getenv("ACTIVITY_ROLLUP_LOOKBACK_DAYS", 2))  # days recomputed per run
+ACTIVITY_ARCHIVE = os.getenv("ACTIVITY_ARCHIVE", "True") == "True"  # copy purged rows to sm_user_activity_archive
+ACTIVITY_PURGE_BATCH = int(os.getenv("ACTIVITY_PURGE_BATCH", 5000))
+ACTIVITY_RETENTION_JOB = os.getenv("ACTIVITY_RETENTION_JOB", "True") == "True"  # run the job inside the app
+ACTIVITY_RETENTION_INTERVAL = int(os.getenv("ACTIVITY_RETENTION_INTERVAL", 3600))  # seconds between runs
+
+# Per-user wishlist cache
+WISHLIST_CACHE_MAX_BYTES = int(os.getenv("WISHLIST_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+WISHLIST_CACHE_TTL = int(os.getenv("WISHLIST_CACHE_TTL", 300))  # reload after this many seconds
+
+# Maximum number of items accepted by the bulk wishlist endpoints
+WISHLIST_BULK_MAX = int(os.getenv("WISHLIST_BULK_MAX", 500))
+
+# Endpoint ACL cache: seconds before the in-memory accessibility map is refreshed
+ACL_CACHE_TTL = int(os.getenv("ACL_CACHE_TTL", 300))
+ACL_RETRY_INTERVAL = int(os.getenv("ACL_RETRY_INTERVAL", 30))  # wait after a failed load before trying again
+
 # JWT Secret Key
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-this-in-production")
 
+# Password hashing: bcrypt cost and the process pool that runs it.
+# Stored hashes with a different cost are rehashed on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))  # 0 = hash inline on the request thread
+# Jobs queued or running per app worker; beyond this, respond 503. Kept at the pool
+# size so a burst cannot hold more request threads than there are hashers.
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", max(PASSWORD_HASH_WORKERS, 1)))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 10))
+
+# Number of recently verified tokens kept in memory (0 disables the cache)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 1024))
+
+# Load database, ACL and model artifacts on a background thread at startup
+# (/readyz reports 503 until they are ready). False = load on first request.
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "True") == "True"
+# Seconds between database pings made by /readyz once the database is ready
+READINESS_CHECK_INTERVAL = float(os.getenv("READINESS_CHECK_INTERVAL", 5))
+# Seconds before a component that failed to load (models, database, ACL) is tried again
+COMPONENT_RETRY_INTERVAL = float(os.getenv("COMPONENT_RETRY_INTERVAL", 30))
+
+# Versioned model artifacts (see model/artifacts.py). Each worker polls
+# MODEL_DIR/CURRENT and hot-swaps to a newly activated version; 0 disables.
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", 10))
+# Memory-map .npy similarity/TF-IDF matrices instead of reading them into private memory
+MODEL_MMAP = os.getenv("MODEL_MMAP", "True") == "True"
+
+# Per-process cache of serialized /recommend/* responses (0 disables).
+# Entries are keyed on the model artifacts, so a model reload never serves stale ones;
+# not-found titles are cached for RESPONSE_CACHE_NEGATIVE_TTL seconds.
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+RESPONSE_CACHE_NEGATIVE_TTL = int(os.getenv("RESPONSE_CACHE_NEGATIVE_TTL", 300))
+# Identical concurrent recommendation requests share one computation; followers
+# wait at most this many seconds before answering 503
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", 30))
+# HTTP caching of the book/movie endpoints (model/http_cache.py). ETags follow the
+# model artifacts, so clients revalidate with If-None-Match and get 304 until a new
+# version is activated; these set how long they may reuse a response without asking.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 300))
+HTTP_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", 60))
+
+# Response JSON encoder: "auto" (orjson if installed), "orjson" or "stdlib"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+# gzip/brotli for JSON and text bodies of at least COMPRESS_MIN_BYTES (0 disables);
+# brotli is used when the Brotli package is installed and the client accepts it
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+
+# Prometheus-format GET /metrics (per worker process). Unauthenticated, so off unless
+# enabled on a deployment where the proxy keeps it off the public port.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False") == "True"
+# Per-request stage timings (model/tracing.py): a JSON log line for this fraction of
+# requests plus all slower than TRACE_SLOW_MS. Admins always get the Server-Timing
+# header and may force a trace with X-Trace: 1; True extends both to every client.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "False") == "True"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.01))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 500))
+# Sampling profiler sessions started via /admin/profile/start (model/profiler.py):
+# collapsed-stack output directory, default sampling interval and longest session
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/sujhavmitra-profiles")
+PROFILE_INTERVAL_MS = int(os.getenv("PROFILE_INTERVAL_MS", 5))
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", 600))
+# Memory breakdown per artifact and cache (model/memory_accounting.py): logged once the
+# models are loaded, and tracemalloc settings for /admin/memory/tracemalloc/*
+MEMORY_REPORT_ON_STARTUP = os.getenv("MEMORY_REPORT_ON_STARTUP", "True") == "True"
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", 10))
+TRACEMALLOC_MAX_SNAPSHOTS = int(os.getenv("TRACEMALLOC_MAX_SNAPSHOTS", 8))
+
+# gunicorn (gunicorn.conf.py). The app and models are preloaded in the master
+# and shared copy-on-write; DB_POOL_SIZE applies to each worker process.
+GUNICORN_BIND = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", 2))
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", 4))  # >1 uses the gthread worker
+GUNICORN_TIMEOUT = int(os.getenv("GUNICORN_TIMEOUT", 60))
+GUNICORN_MAX_REQUESTS = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))  # 0 = never recycle workers
+GUNICORN_PIDFILE = os.getenv("GUNICORN_PIDFILE", "/tmp/sujhavmitra-gunicorn.pid")
+
 # Flask configuration
 DEBUG = os.getenv("FLASK_DEBUG", "True") == "True"
 HOST = os.getenv("FLASK_HOST", "127.0.0.1")
@@ -0,0 +1,156 @@
+from flask import Blueprint, make_response, request
+from model.auth_model import auth_model, token_cache
+from model.artifacts import ArtifactError
+from model.model_reloader import get_model_reloader
+from model.response_cache import get_response_cache
+from model.single_flight import get_single_flight
+from model.profiler import get_profiler
+from model.memory_accounting import report as memory_report, get_tracemalloc_session
+from configs.config import PROFILE_INTERVAL_MS, TRACEMALLOC_FRAMES
+
+auth_obj = auth_model()
+
+admin_bp = Blueprint("admin", __name__)
+
+# Inspect the in-memory endpoint ACL (size and staleness) and verified-token cache
+@admin_bp.route("/admin/acl", methods=["GET"])
+@auth_obj.token_auth()
+def acl_status_controller():
+    return make_response({"acl": auth_obj.acl.stats(), "token_cache": token_cache.stats()}, 200)
+
+# Reload the endpoint ACL after sm_accessibility has been edited
+@admin_bp.route("/admin/acl/refresh", methods=["POST"])
+@auth_obj.token_auth()
+def acl_refresh_controller():
+    if not auth_obj.invalidate_acl():
+        return make_response({"error": "Failed to reload endpoint ACL"}, 500)
+    return make_response({"message": "Endpoint ACL reloaded", "acl": auth_obj.acl.stats()}, 200)
+
+# Loaded / active / available model artifact versions and reload status
+@admin_bp.route("/admin/models", methods=["GET"])
+@auth_obj.token_auth()
+def model_status_controller():
+    reloader = get_model_reloader()
+    return make_response({**reloader.stats(), "available": reloader.store.list_versions()}, 200)
+
+# Hot-reload an artifact version (optional) in the background. It is written to
+# models/CURRENT only once this worker has loaded and swapped it in; other worker
+# processes then follow through their models/CURRENT watcher.
+@admin_bp.route("/admin/models/reload", methods=["POST"])
+@auth_obj.token_auth()
+def model_reload_controller():
+    data = request.get_json(silent=True) or {}
+    version = data.get("version")
+    reloader = get_model_reloader()
+    if reloader.is_reloading():
+        return make_response({"error": "A model reload is already in progress"}, 409)
+
+    try:
+        if version:
+            reloader.store.verify(version, checksums=False)
+    except ArtifactError as e:
+        return make_response({"error": str(e)}, 400)
+
+    if not reloader.reload_async(version, force=bool(data.get("force")), activate=bool(version)):
+        return make_response({"error": "A model reload is already in progress"}, 409)
+    return make_response({"message": "Model reload started", "version": version or reloader.store.current_version()}, 202)
+
+# Recommendation response cache size and hit rates, and request coalescing counters
+@admin_bp.route("/admin/cache", methods=["GET"])
+@auth_obj.token_auth()
+def response_cache_status_controller():
+    return make_response({**get_response_cache().stats(), "single_flight": get_single_flight().stats()}, 200)
+
+# Drop every cached recommendation response in this worker
+@admin_bp.route("/admin/cache/clear", methods=["POST"])
+@auth_obj.token_auth()
+def response_cache_clear_controller():
+    get_response_cache().clear()
+    return make_response({"message": "Response cache cleared"}, 200)
+
+# Sampling profiler session state and the collapsed-stack files written so far
+@admin_bp.route("/admin/profile", methods=["GET"])
+@auth_obj.token_auth()
+def profile_status_controller():
+    return make_response(get_profiler().status(), 200)
+
+# Profile a fraction of live requests (plus admin requests sent with X-Profile: 1) in every worker.
+# JSON body: {"rate": 0.1, "duration": 60, "interval_ms": 5}
+@admin_bp.route("/admin/profile/start", methods=["POST"])
+@auth_obj.token_auth()
+def profile_start_controller():
+    data = request.get_json(silent=True) or {}
+    profiler = get_profiler()
+    try:
+        session = profiler.start(
+            rate=float(data.get("rate", 0.1)),
+            duration=float(data.get("duration", 60)),
+            interval_ms=int(data.get("interval_ms", PROFILE_INTERVAL_MS)),
+        )
+    except (TypeError, ValueError) as e:
+        return make_response({"error": str(e)}, 400)
+    return make_response({"message": "Profiling started", **session, "output": profiler.output_path()}, 200)
+
+# End the session early; each worker writes its final collapsed stacks
+@admin_bp.route("/admin/profile/stop", methods=["POST"])
+@auth_obj.token_auth()
+def profile_stop_controller():
+    profiler = get_profiler()
+    session = profiler.stop()
+    if session is None:
+        return make_response({"message": "No profiling session was active"}, 200)
+    return make_response({"message": "Profiling stopped", "session": session, "output": profiler.output_path(session)}, 200)
+
+# Memory of this worker by model artifact (heap vs mmap) and cache, plus process RSS/PSS/USS
+@admin_bp.route("/admin/memory", methods=["GET"])
+@auth_obj.token_auth()
+def memory_status_controller():
+    return make_response(memory_report(), 200)
+
+# Start tracing Python allocations in this worker. JSON body: {"frames": 10}
+@admin_bp.route("/admin/memory/tracemalloc/start", methods=["POST"])
+@auth_obj.token_auth()
+def tracemalloc_start_controller():
+    data = request.get_json(silent=True) or {}
+    session = get_tracemalloc_session()
+    try:
+        session.start(int(data.get("frames", TRACEMALLOC_FRAMES)))
+    except (TypeError, ValueError) as e:
+        return make_response({"error": str(e)}, 400)
+    return make_response({"message": "tracemalloc started", **session.status()}, 200)
+
+# Take a labelled snapshot. JSON body: {"label": "before"}
+@admin_bp.route("/admin/memory/tracemalloc/snapshot", methods=["POST"])
+@auth_obj.token_auth()
+def tracemalloc_snapshot_controller():
+    data = request.get_json(silent=True) or {}
+    session = get_tracemalloc_session()
+    try:
+        label = session.snapshot(data.get("label"))
+    except ValueError as e:
+        return make_response({"error": str(e)}, 400)
+    return make_response({"message": "Snapshot taken", "label": label, **session.status()}, 200)
+
+# Allocation growth between two snapshots: ?from=before&to=after&top=20&group_by=lineno
+@admin_bp.route("/admin/memory/tracemalloc/diff", methods=["GET"])
+@auth_obj.token_auth()
+def tracemalloc_diff_controller():
+    before, after = request.args.get("from"), request.args.get("to")
+    if not before or not after:
+        return make_response({"error": "from and to snapshot labels are required"}, 400)
+    try:
+        diff = get_tracemalloc_session().diff(
+            before, after,
+            top=int(request.args.get("top", 20)),
+            group_by=request.args.get("group_by", "lineno"),
+        )
+    except ValueError as e:
+        return make_response({"error": str(e)}, 400)
+    return make_response(diff, 200)
+
+# Stop tracing and drop the snapshots
+@admin_bp.route("/admin/memory/tracemalloc/stop", methods=["POST"])
+@auth_obj.token_auth()
+def tracemalloc_stop_controller():
+    get_tracemalloc_session().stop()
+    return make_response({"message": "tracemalloc stopped"}, 200)
@@ -1,30 +1,37 @@
 from flask import request, Blueprint
-from model.book_recommend_model import BookRecommendModel
-
-recommender = BookRecommendModel()
+from model.registry import get_book_model
+from model.response_cache import cached_response
+from model.http_cache import conditional
+from model.projection import BOOK_FIELDS, parse_fields
 
 book_bp = Blueprint("book", __name__)
 
 @book_bp.route("/recommend/book", methods=["GET"])
+@conditional(get_book_model)
 def book_recommend_controller():
+    model = get_book_model()
+    fields = parse_fields(request.args.get("fields"), BOOK_FIELDS)
     raw_title = request.args.get("title")
     if not raw_title:
-        Popular_books = recommender.get_popular_book_title()
-        return  Popular_books
+        return cached_response("recommend_book", model, (None, fields), lambda: model.get_popular_book_title(fields))
     
     # Normalize title input
     title = raw_title.strip().strip('"').strip("'").lower()
-    result=recommender.book_recommend_model(title)
+    result = cached_response("recommend_book", model, (title, fields), lambda: model.book_recommend_model(title, fields))
 
     return result
 
 @book_bp.route("/book/<isbn>", methods=["GET"])
+@conditional(get_book_model)
 def get_book_by_isbn_controller(isbn):
-    return recommender.get_book_by_isbn(isbn)
+    fields = parse_fields(request.args.get("fields"), BOOK_FIELDS)
+    return get_book_model().get_book_by_isbn(isbn, fields)
 
 @book_bp.route("/book/by-title", methods=["GET"])
+@conditional(get_book_model)
 def get_book_by_title_controller():
+    fields = parse_fields(request.args.get("fields"), BOOK_FIELDS)
     title = request.args.get("title", type=str)
     if not title:
         return {"error": "title is required"}, 400
-    return recommender.get_book_by_title(title)
+    return get_book_model().get_book_by_title(title, fields)
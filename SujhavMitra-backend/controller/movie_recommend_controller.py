@@ -1,18 +1,21 @@
 from flask import request, Blueprint
-from model.movie_recommend_model import MovieRecommendModel
-
-recommender = MovieRecommendModel()
+from model.registry import get_movie_model
+from model.response_cache import cached_response
+from model.http_cache import conditional
+from model.projection import MOVIE_FIELDS, parse_fields
 
 movie_bp = Blueprint("movie", __name__)
 
 # Original route - Get recommendations (can optionally include TF-IDF via query params)
 @movie_bp.route("/recommend/movie", methods=["GET"])
+@conditional(get_movie_model)
 def movie_recommend_controller():
+    model = get_movie_model()
+    fields = parse_fields(request.args.get("fields"), MOVIE_FIELDS)
     raw_title = request.args.get("title")
     
     if not raw_title:
-        all_movies = recommender.get_popular_movies()
-        return all_movies
+        return cached_response("recommend_movie", model, (None, fields), lambda: model.get_popular_movies(fields))
     
     title = raw_title.strip().strip('"').strip("'")
     
@@ -20,16 +23,27 @@ def movie_recommend_controller():
     include_tfidf = request.args.get("include_tfidf", "false").lower() == "true"
     top_features = int(request.args.get("top_features", 10))
     
-    result = recommender.movie_recommend_model(title, include_tfidf=include_tfidf, top_features=top_features)
+    # The TF-IDF variant echoes the title as given; top_features only matters with it
+    if include_tfidf:
+        key = (title, True, top_features, fields)
+    else:
+        key = (title.lower().strip(), False, None, fields)
+    result = cached_response(
+        "recommend_movie", model, key,
+        lambda: model.movie_recommend_model(title, include_tfidf=include_tfidf, top_features=top_features, fields=fields),
+    )
     return result
 
 # Get movie by ID
 @movie_bp.route("/movie/<int:movie_id>", methods=["GET"])
+@conditional(get_movie_model)
 def get_movie_by_id_controller(movie_id):
-    return recommender.get_movie_by_id(movie_id)
+    fields = parse_fields(request.args.get("fields"), MOVIE_FIELDS)
+    return get_movie_model().get_movie_by_id(movie_id, fields)
 
 # New route - Get detailed TF-IDF analysis for a single movie
 @movie_bp.route("/movie/tfidf-analysis", methods=["GET"])
+@conditional(get_movie_model)
 def movie_tfidf_analysis_controller():
     raw_title = request.args.get("title")
     
@@ -38,11 +52,14 @@ def movie_tfidf_analysis_controller():
     
     title = raw_title.strip().strip('"').strip("'")
     top_n = int(request.args.get("top_n", 20))
+    fields = parse_fields(request.args.get("fields"), MOVIE_FIELDS)
     
-    result = recommender.get_movie_tfidf_analysis(title, top_n=top_n)
+    result = get_movie_model().get_movie_tfidf_analysis(title, top_n=top_n, fields=fields)
     return result
 
 # Optional: Get all movie titles (for dropdown/autocomplete)
 @movie_bp.route("/movies/all", methods=["GET"])
+@conditional(get_movie_model)
 def get_all_movies_controller():
-    return recommender.get_all_movie_titles()
\ No newline at end of file
+    fields = parse_fields(request.args.get("fields"), MOVIE_FIELDS)
+    return get_movie_model().get_all_movie_titles(fields)
\ No newline at end of file
@@ -1,29 +1,13 @@
 from flask import request, Blueprint, jsonify
-from model.rating_model import RatingModel
-from model.auth_model import auth_model
-import jwt
-from configs.config import JWT_SECRET
+from model.registry import get_rating_model
+from model.auth_model import auth_model, current_user_id
 
-rating_model = RatingModel()
 auth = auth_model()
 rating_bp = Blueprint("rating", __name__)
 
 def get_current_user_id():
-    """Extract user_id from JWT token in Authorization header"""
-    authorization = request.headers.get("authorization")
-    
-    if not authorization or not authorization.startswith("Bearer "):
-        return None
-    
-    token = authorization.split(" ")[1]
-    
-    try:
-        tokendata = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        # Your JWT structure: tokendata['payload']['id']
-        return tokendata['payload']['id']
-    except Exception as e:
-        print(f"Error decoding token: {e}")
-        return None
+    """User id from the claims token_auth already verified for this request"""
+    return current_user_id()
 
 
 @rating_bp.route("/rating/add", methods=["POST"])
@@ -52,7 +36,7 @@ def add_rating():
     except ValueError:
         return jsonify({"error": "Rating must be a valid integer"}), 400
     
-    return rating_model.add_rating(user_id, isbn, book_title, rating)
+    return get_rating_model().add_rating(user_id, isbn, book_title, rating)
 
 
 @rating_bp.route("/rating/my-ratings", methods=["GET"])
@@ -65,7 +49,7 @@ def get_my_ratings():
     if not user_id:
         return jsonify({"error": "Unable to identify user"}), 401
     
-    return rating_model.get_user_ratings(user_id)
+    return get_rating_model().get_user_ratings(user_id)
 
 
 @rating_bp.route("/rating/user/<int:user_id>", methods=["GET"])
@@ -78,7 +62,7 @@ def get_user_ratings(user_id):
     if not current_user_id:
         return jsonify({"error": "Unable to identify user"}), 401
     
-    return rating_model.get_user_ratings(user_id)
+    return get_rating_model().get_user_ratings(user_id)
 
 
 @rating_bp.route("/rating/update/<int:rating_id>", methods=["PATCH"])
@@ -104,7 +88,7 @@ def update_rating(rating_id):
         return jsonify({"error": "Rating must be a valid integer"}), 400
     
     # Verify ownership before updating
-    return rating_model.update_rating(rating_id, new_rating, user_id)
+    return get_rating_model().update_rating(rating_id, new_rating, user_id)
 
 
 @rating_bp.route("/rating/delete/<int:rating_id>", methods=["DELETE"])
@@ -117,7 +101,7 @@ def delete_rating(rating_id):
         return jsonify({"error": "Unable to identify user"}), 401
     
     # Verify ownership before deleting
-    return rating_model.delete_rating(rating_id, user_id)
+    return get_rating_model().delete_rating(rating_id, user_id)
 
 
 @rating_bp.route("/recommend/my-recommendations", methods=["GET"])
@@ -130,7 +114,7 @@ def get_my_recommendations():
         return jsonify({"error": "Unable to identify user"}), 401
     
     limit = request.args.get("limit", default=10, type=int)
-    return rating_model.get_recommendations_for_user(user_id, limit)
+    return get_rating_model().get_recommendations_for_user(user_id, limit)
 
 
 @rating_bp.route("/recommend/user/<int:user_id>", methods=["GET"])
@@ -143,4 +127,4 @@ def get_user_recommendations(user_id):
         return jsonify({"error": "Unable to identify user"}), 401
     
     limit = request.args.get("limit", default=10, type=int)
-    return rating_model.get_recommendations_for_user(user_id, limit)
\ No newline at end of file
+    return get_rating_model().get_recommendations_for_user(user_id, limit)
\ No newline at end of file
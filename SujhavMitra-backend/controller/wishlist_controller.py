@@ -1,27 +1,14 @@
 from flask import request, Blueprint, make_response
-from model.wishlist_model import WishlistModel
-from model.auth_model import auth_model
-import jwt
-from configs.config import JWT_SECRET
+from model.registry import get_wishlist_model
+from model.auth_model import auth_model, current_user_id, current_role_id
 
-wishlist_obj = WishlistModel()
 auth_obj = auth_model()
 
 wishlist_bp = Blueprint("wishlist", __name__)
 
 def get_user_id_from_token():
-    """Extract user_id from JWT token"""
-    try:
-        authorization = request.headers.get("authorization")
-        if not authorization:
-            return None
-        
-        token = authorization.split(" ")[1]
-        tokendata = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        return tokendata['payload']['id']
-    except Exception as e:
-        print(f"Error extracting user_id: {e}")
-        return None
+    """User id from the claims token_auth already verified for this request"""
+    return current_user_id()
 
 
 # Add item to wishlist
@@ -48,12 +35,59 @@ def add_to_wishlist_controller():
     item_type = data.get('item_type')
     item_id = data.get('item_id')
     title = data.get('title')
-    
-    # Extract all other fields to be stored as item data
-    item_data = {k: v for k, v in data.items() 
-                if k not in ['item_type', 'item_id', 'title']}
 
-    return wishlist_obj.add_to_wishlist(user_id, item_type, item_id, title, **item_data)
+    # Only the reference is stored; details are hydrated from the catalog on read
+    return get_wishlist_model().add_to_wishlist(user_id, item_type, item_id, title)
+
+
+# Add many items to wishlist in one transaction
+@wishlist_bp.route("/wishlist/bulk-add", methods=["POST"])
+@auth_obj.token_auth()
+def bulk_add_to_wishlist_controller():
+    """
+    Add many books/movies to wishlist
+    Expected JSON body:
+    {
+        "items": [
+            {"item_type": "book", "item_id": "isbn", "title": "Item title"},
+            ...
+        ]
+    }
+    Returns a per-item status: added, exists or invalid
+    """
+    user_id = get_user_id_from_token()
+    if not user_id:
+        return make_response({"error": "Invalid token"}, 401)
+
+    data = request.get_json(silent=True)
+    if not data:
+        return make_response({"error": "Request body is required"}, 400)
+    if not isinstance(data, dict):
+        return make_response({"error": "Request body must be a JSON object"}, 400)
+
+    return get_wishlist_model().bulk_add_to_wishlist(user_id, data.get('items'))
+
+
+# Remove many items from wishlist in one transaction
+@wishlist_bp.route("/wishlist/bulk-remove", methods=["POST"])
+@auth_obj.token_auth()
+def bulk_remove_from_wishlist_controller():
+    """
+    Remove many wishlist entries by their wishlist IDs
+    Expected JSON body: {"ids": [1, 2, 3]}
+    Returns a per-item status: removed or not_found
+    """
+    user_id = get_user_id_from_token()
+    if not user_id:
+        return make_response({"error": "Invalid token"}, 401)
+
+    data = request.get_json(silent=True)
+    if not data:
+        return make_response({"error": "Request body is required"}, 400)
+    if not isinstance(data, dict):
+        return make_response({"error": "Request body must be a JSON object"}, 400)
+
+    return get_wishlist_model().bulk_remove_from_wishlist(user_id, data.get('ids'))
 
 
 # Get user's wishlist
@@ -69,7 +103,27 @@ def view_wishlist_controller():
         return make_response({"error": "Invalid token"}, 401)
 
     item_type = request.args.get('type')  # Optional filter
-    return wishlist_obj.get_wishlist(user_id, item_type)
+    return get_wishlist_model().get_wishlist(user_id, item_type)
+
+
+# Check whether a single item is saved
+@wishlist_bp.route("/wishlist/contains", methods=["GET"])
+@auth_obj.token_auth()
+def wishlist_contains_controller():
+    """
+    Check if an item is in the user's wishlist (served from the wishlist cache)
+    Query parameters: ?type=book|movie&id=<isbn or movie_id>
+    """
+    user_id = get_user_id_from_token()
+    if not user_id:
+        return make_response({"error": "Invalid token"}, 401)
+
+    item_type = request.args.get('type')
+    item_id = request.args.get('id')
+    if not item_type or not item_id:
+        return make_response({"error": "type and id are required"}, 400)
+
+    return get_wishlist_model().is_in_wishlist(user_id, item_type, item_id)
 
 
 # Remove item from wishlist
@@ -81,7 +135,7 @@ def remove_from_wishlist_controller(wishlist_id):
     if not user_id:
         return make_response({"error": "Invalid token"}, 401)
 
-    return wishlist_obj.remove_from_wishlist(user_id, wishlist_id)
+    return get_wishlist_model().remove_from_wishlist(user_id, wishlist_id)
 
 
 # Clear wishlist
@@ -97,7 +151,7 @@ def clear_wishlist_controller():
         return make_response({"error": "Invalid token"}, 401)
 
     item_type = request.args.get('type')  # Optional filter
-    return wishlist_obj.clear_wishlist(user_id, item_type)
+    return get_wishlist_model().clear_wishlist(user_id, item_type)
 
 
 # Get user activity
@@ -107,14 +161,14 @@ def get_user_activity_controller():
     """
     Get user's activity log.
     Optional query parameter: ?limit=100 (default: 50)
-    Admin can see all users' activity or specify user_id via query param.
+    Admin can see all users' daily counters (from the rollup table) or
+    specify user_id via query param for that user's raw events.
     """
     user_id = get_user_id_from_token()
     if not user_id:
         return make_response({"error": "Invalid token"}, 401)
 
-    # Hardcode admin role
-    role_id = 1  # Admin
+    role_id = current_role_id()
 
     limit = request.args.get('limit', default=50, type=int)
     if limit > 500:
@@ -124,13 +178,34 @@ def get_user_activity_controller():
     if role_id == 1:
         query_user_id = request.args.get("user_id", type=int)  # optional
         if query_user_id:
-            return wishlist_obj.get_user_activity(query_user_id, limit)
+            return get_wishlist_model().get_user_activity(query_user_id, limit)
         else:
-            # If no user_id specified, return all users' activities
-            return wishlist_obj.get_all_activity(limit)
+            # If no user_id specified, return all users' daily counters
+            return get_wishlist_model().get_all_activity(limit)
     else:
         # Regular users can only see their own activity
-        return wishlist_obj.get_user_activity(user_id, limit)
+        return get_wishlist_model().get_user_activity(user_id, limit)
+
+# Get daily activity counters
+@wishlist_bp.route("/user/activity/summary", methods=["GET"])
+@auth_obj.token_auth()
+def get_activity_summary_controller():
+    """
+    Per-day activity counts read from the rollup table.
+    Optional query parameters: ?days=30 (max 365)
+    Admin sees all users' counters or passes ?user_id=<id>; other users
+    only get their own.
+    """
+    user_id = get_user_id_from_token()
+    if not user_id:
+        return make_response({"error": "Invalid token"}, 401)
+
+    days = min(request.args.get('days', default=30, type=int), 365)
+    if current_role_id() == 1:
+        query_user_id = request.args.get("user_id", type=int)  # optional
+    else:
+        query_user_id = user_id
+    return get_wishlist_model().get_activity_summary(days, query_user_id)
 
 # Error handlers
 @wishlist_bp.errorhandler(404)
@@ -0,0 +1,52 @@
+"""
+Production server config. From the backend directory:
+
+    gunicorn -c gunicorn.conf.py
+
+The app and the model artifacts are loaded once in the master
+(preload_app) and the workers are forked from it, so the large read-only
+arrays are shared copy-on-write instead of being unpickled per worker.
+Database pools, the endpoint ACL and background threads are created in
+each worker after the fork. Tune with the GUNICORN_* settings in
+configs/config.py and check the sharing with scripts/worker_memory.py.
+"""
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from configs.config import (
+    GUNICORN_BIND,
+    GUNICORN_WORKERS,
+    GUNICORN_THREADS,
+    GUNICORN_TIMEOUT,
+    GUNICORN_MAX_REQUESTS,
+    GUNICORN_PIDFILE,
+)
+
+# Model files are opened relative to the backend directory
+chdir = BASE_DIR
+wsgi_app = "app:create_app(preload=True)"
+preload_app = True
+
+bind = GUNICORN_BIND
+workers = GUNICORN_WORKERS
+threads = GUNICORN_THREADS
+worker_class = "gthread" if GUNICORN_THREADS > 1 else "sync"
+timeout = GUNICORN_TIMEOUT
+graceful_timeout = GUNICORN_TIMEOUT
+pidfile = GUNICORN_PIDFILE
+
+# Recycled workers are re-forked from the master, so they share its pages too
+max_requests = GUNICORN_MAX_REQUESTS
+max_requests_jitter = GUNICORN_MAX_REQUESTS // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Threads do not survive fork: start warm-up (DB pool, ACL) and jobs per worker
+    from app import start_background_tasks
+    start_background_tasks()
@@ -0,0 +1,77 @@
+"""Small idempotent DDL helpers shared by the versioned migrations"""
+
+
+def table_exists(cursor, table):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def index_exists(cursor, table, index_name):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """,
+        (table, index_name),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def has_index_on(cursor, table, columns, unique=False):
+    """True if some index already starts with exactly these columns (in order)"""
+    cursor.execute(
+        """
+        SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """,
+        (table,),
+    )
+    indexes = {}
+    for index_name, non_unique, column in cursor.fetchall():
+        entry = indexes.setdefault(index_name, {"unique": not non_unique, "columns": []})
+        entry["columns"].append(column)
+
+    for entry in indexes.values():
+        if entry["columns"] == list(columns) and (entry["unique"] or not unique):
+            return True
+    return False
+
+
+def add_index(cursor, table, index_name, columns, unique=False):
+    """Create an index unless an equivalent one already exists"""
+    if index_exists(cursor, table, index_name) or has_index_on(cursor, table, columns, unique):
+        print(f"Index on {table} ({', '.join(columns)}) already exists")
+        return False
+
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    cursor.execute(f"ALTER TABLE `{table}` ADD {kind} `{index_name}` ({column_list})")
+    print(f"Created {kind.lower()} {index_name} on {table} ({', '.join(columns)})")
+    return True
+
+
+def delete_duplicates(cursor, table, columns):
+    """Keep only the newest row (highest id) for each combination of `columns`"""
+    join = " AND ".join(f"a.`{c}` = b.`{c}`" for c in columns)
+    cursor.execute(f"DELETE a FROM `{table}` a JOIN `{table}` b ON {join} AND a.id < b.id")
+    if cursor.rowcount:
+        print(f"Removed {cursor.rowcount} duplicate rows from {table}")
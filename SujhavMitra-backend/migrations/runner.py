@@ -0,0 +1,186 @@
+"""
+Versioned schema migration runner.
+
+Migrations live in migrations/versions/NNNN_description.py and define
+`upgrade(cursor)`. Applied versions are recorded in `schema_migrations`,
+so each one runs exactly once per database.
+
+Usage (from the backend directory):
+    python migrations/runner.py status     # list applied / pending migrations
+    python migrations/runner.py upgrade    # apply pending migrations in order
+    python migrations/runner.py explain    # EXPLAIN the models' hot queries
+"""
+import argparse
+import importlib.util
+import os
+import re
+import sys
+
+import mysql.connector
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configs.config import dbconfig
+from model.queries import (
+    LOGIN_QUERY,
+    RECENT_ACTIVITY_QUERY,
+    USER_ACTIVITY_QUERY,
+    USER_RATINGS_QUERY,
+    WISHLIST_QUERY,
+)
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+VERSION_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+# Hot queries issued by the models, with representative parameters. The SQL
+# comes from model/queries.py, which the models run, so the check cannot drift.
+# `explain` flags any of them that fall back to a full table scan or filesort.
+HOT_QUERIES = [
+    ("my ratings (RatingModel.get_user_ratings)", USER_RATINGS_QUERY, (1,)),
+    ("wishlist listing (WishlistModel.load_wishlist)", WISHLIST_QUERY, (1,)),
+    ("recent activity (WishlistModel.get_all_activity)", RECENT_ACTIVITY_QUERY, (50,)),
+    ("user activity (WishlistModel.get_user_activity)", USER_ACTIVITY_QUERY, (1, 50)),
+    ("login (user_model.user_login_model)", LOGIN_QUERY, ("a@b.c",)),
+]
+
+def get_connection():
+    return mysql.connector.connect(
+        host=dbconfig["host"],
+        port=dbconfig["port"],
+        user=dbconfig["user"],
+        password=dbconfig["password"],
+        database=dbconfig["database"]
+    )
+
+
+def discover_migrations():
+    """All migration files as (version, name, path), sorted by version"""
+    migrations = []
+    for filename in sorted(os.listdir(VERSIONS_DIR)):
+        match = VERSION_PATTERN.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(VERSIONS_DIR, filename)))
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Duplicate migration version numbers in migrations/versions")
+    return migrations
+
+
+def load_migration(version, path):
+    spec = importlib.util.spec_from_file_location(f"migration_{version}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "upgrade"):
+        raise RuntimeError(f"Migration {os.path.basename(path)} has no upgrade(cursor)")
+    return module
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(16) PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    ensure_migrations_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def status():
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        applied = applied_versions(cursor)
+        for version, name, _ in discover_migrations():
+            state = "applied" if version in applied else "pending"
+            print(f"{version}  {state:8}  {name}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def upgrade():
+    conn = get_connection()
+    cursor = conn.cursor(buffered=True)
+    try:
+        applied = applied_versions(cursor)
+        conn.commit()
+
+        pending = [m for m in discover_migrations() if m[0] not in applied]
+        if not pending:
+            print("Database schema is up to date")
+            return
+
+        for version, name, path in pending:
+            print(f"Applying {version}_{name}...")
+            module = load_migration(version, path)
+            try:
+                module.upgrade(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name),
+                )
+                conn.commit()
+            except Exception as e:
+                # MySQL DDL commits implicitly; only data changes can be rolled back
+                conn.rollback()
+                print(f"Error running migration {version}_{name}: {e}")
+                raise
+        print(f"Applied {len(pending)} migration(s)")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def explain():
+    """EXPLAIN each hot query and report full scans, filesorts and unused indexes"""
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    problems = 0
+    try:
+        for label, query, params in HOT_QUERIES:
+            cursor.execute(f"EXPLAIN {query}", params)
+            plan = cursor.fetchall()
+            issues = []
+            for row in plan:
+                extra = row.get("Extra") or ""
+                if row.get("type") == "ALL":
+                    issues.append(f"full scan of {row.get('table')}")
+                if "Using filesort" in extra:
+                    issues.append(f"filesort on {row.get('table')}")
+
+            keys = ", ".join(str(row.get("key")) for row in plan)
+            if issues:
+                problems += 1
+                print(f"WARN  {label}: {'; '.join(issues)} (key: {keys})")
+            else:
+                print(f"OK    {label} (key: {keys})")
+    finally:
+        cursor.close()
+        conn.close()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SujhavMitra schema migrations")
+    parser.add_argument("command", choices=["status", "upgrade", "explain"], nargs="?", default="upgrade")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        status()
+    elif args.command == "upgrade":
+        upgrade()
+    else:
+        return 1 if explain() else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Add the JSON `data` column used to store wishlist item details"""
+
+
+def upgrade(cursor):
+    # Add the data column if it doesn't exist
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND TABLE_NAME = 'sm_wishlist'
+        AND COLUMN_NAME = 'data';
+    """)
+    
+    if cursor.fetchone()[0] == 0:
+        # Add the data column as JSON type
+        cursor.execute("""
+            ALTER TABLE sm_wishlist
+            ADD COLUMN data JSON DEFAULT NULL
+            AFTER title;
+        """)
+        print("Successfully added 'data' column to sm_wishlist table")
+    else:
+        print("'data' column already exists in sm_wishlist table")
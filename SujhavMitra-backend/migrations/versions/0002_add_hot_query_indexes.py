@@ -0,0 +1,25 @@
+"""
+Unique and composite indexes backing the hot lookups in the models:
+
+- sm_user_ratings (user_id, isbn): rating upsert / "my ratings"
+- sm_wishlist (user_id, item_type, item_id): existence check and dedupe,
+  plus (user_id, added_at) for the ordered wishlist listing
+- sm_user_activity (timestamp) and (user_id, timestamp): recent activity
+
+The unique key on sm_users (email) is added by 0007, once existing emails
+have been checked for duplicates.
+"""
+from migrations.helpers import add_index, delete_duplicates
+
+
+def upgrade(cursor):
+    # Unique keys can only be added once existing duplicates are gone
+    delete_duplicates(cursor, "sm_user_ratings", ["user_id", "isbn"])
+    add_index(cursor, "sm_user_ratings", "uq_ratings_user_isbn", ["user_id", "isbn"], unique=True)
+
+    delete_duplicates(cursor, "sm_wishlist", ["user_id", "item_type", "item_id"])
+    add_index(cursor, "sm_wishlist", "uq_wishlist_user_item", ["user_id", "item_type", "item_id"], unique=True)
+    add_index(cursor, "sm_wishlist", "idx_wishlist_user_added", ["user_id", "added_at"])
+
+    add_index(cursor, "sm_user_activity", "idx_activity_timestamp", ["timestamp"])
+    add_index(cursor, "sm_user_activity", "idx_activity_user_timestamp", ["user_id", "timestamp"])
@@ -0,0 +1,31 @@
+"""
+Tables for activity retention:
+
+- sm_user_activity_daily: compact per-user, per-day, per-action-type counters
+  maintained by the rollup job (model/activity_retention.py)
+- sm_user_activity_archive: optional cold copy of raw events purged from
+  sm_user_activity once they fall outside the retention window
+"""
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sm_user_activity_daily (
+            user_id INT NOT NULL,
+            activity_date DATE NOT NULL,
+            action_type VARCHAR(32) NOT NULL,
+            event_count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, activity_date, action_type),
+            KEY idx_activity_daily_date (activity_date)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sm_user_activity_archive (
+            id INT PRIMARY KEY,
+            user_id INT NOT NULL,
+            action TEXT,
+            timestamp DATETIME,
+            KEY idx_activity_archive_timestamp (timestamp)
+        )
+    """)
@@ -0,0 +1,34 @@
+"""
+Wishlist rows are now stored by reference (item_type, item_id) and
+hydrated from the in-memory catalog on read. Backfill existing rows:
+recover a missing title from the stored JSON copy, then drop the copy.
+Runs in batches so each UPDATE statement stays small.
+"""
+from migrations.helpers import column_exists
+
+BATCH_SIZE = 5000
+
+
+def upgrade(cursor):
+    if not column_exists(cursor, "sm_wishlist", "data"):
+        print("sm_wishlist has no data column, nothing to backfill")
+        return
+
+    cursor.execute("""
+        UPDATE sm_wishlist
+        SET title = JSON_UNQUOTE(JSON_EXTRACT(data, '$.title'))
+        WHERE (title IS NULL OR title = '')
+        AND data IS NOT NULL
+        AND JSON_EXTRACT(data, '$.title') IS NOT NULL
+    """)
+
+    slimmed = 0
+    while True:
+        cursor.execute(
+            "UPDATE sm_wishlist SET data = NULL WHERE data IS NOT NULL LIMIT %s",
+            (BATCH_SIZE,),
+        )
+        slimmed += cursor.rowcount
+        if cursor.rowcount < BATCH_SIZE:
+            break
+    print(f"Slimmed {slimmed} wishlist rows to (item_type, item_id) references")
@@ -0,0 +1,9 @@
+"""
+sm_user_ratings (user_id, updated_at): "my ratings" lists a user's ratings
+newest first, which (user_id, isbn) from 0002 could only serve with a filesort.
+"""
+from migrations.helpers import add_index
+
+
+def upgrade(cursor):
+    add_index(cursor, "sm_user_ratings", "idx_ratings_user_updated", ["user_id", "updated_at"])
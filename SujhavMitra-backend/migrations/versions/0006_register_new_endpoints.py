@@ -0,0 +1,77 @@
+"""
+Register the endpoints added since the ACL sample data in accessibility_view,
+which token_auth answers with 404 UNKNOWN_ENDPOINT until they are listed:
+
+- user routes get the roles already allowed on their sibling route
+  (/wishlist/bulk-add as /wishlist/add, ...), or ADMIN and USER if the
+  sibling is not registered either;
+- /admin/* routes get the admin role.
+
+Existing rows are left alone. If accessibility_view is a view over other
+tables rather than the table from the README setup, the missing rows are
+printed for you to add there instead.
+"""
+ADMIN = 1
+USER = 3
+
+USER_ENDPOINTS = {
+    "/wishlist/bulk-add": "/wishlist/add",
+    "/wishlist/bulk-remove": "/wishlist/remove/<int:wishlist_id>",
+    "/wishlist/contains": "/wishlist",
+    "/user/activity/summary": "/user/activity",
+}
+
+ADMIN_ENDPOINTS = [
+    "/admin/acl",
+    "/admin/acl/refresh",
+    "/admin/models",
+    "/admin/models/reload",
+    "/admin/cache",
+    "/admin/cache/clear",
+    "/admin/profile",
+    "/admin/profile/start",
+    "/admin/profile/stop",
+    "/admin/memory",
+    "/admin/memory/tracemalloc/start",
+    "/admin/memory/tracemalloc/snapshot",
+    "/admin/memory/tracemalloc/diff",
+    "/admin/memory/tracemalloc/stop",
+]
+
+
+def _roles(cursor, endpoint):
+    cursor.execute("SELECT DISTINCT role_id FROM accessibility_view WHERE endpoint = %s", (endpoint,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _is_base_table(cursor, table):
+    cursor.execute(
+        """
+        SELECT TABLE_TYPE FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+    )
+    row = cursor.fetchone()
+    return row is not None and row[0] == "BASE TABLE"
+
+
+def upgrade(cursor):
+    wanted = []
+    for endpoint, sibling in USER_ENDPOINTS.items():
+        wanted += [(endpoint, role) for role in sorted(_roles(cursor, sibling) or {ADMIN, USER})]
+    wanted += [(endpoint, ADMIN) for endpoint in ADMIN_ENDPOINTS]
+
+    missing = [(endpoint, role) for endpoint, role in wanted if role not in _roles(cursor, endpoint)]
+    if not missing:
+        print("All endpoints are already registered")
+        return
+
+    if not _is_base_table(cursor, "accessibility_view"):
+        print("accessibility_view is not a plain table; grant these (endpoint, role_id) pairs by hand:")
+        for endpoint, role in missing:
+            print(f"  {endpoint}  {role}")
+        return
+
+    cursor.executemany("INSERT INTO accessibility_view (endpoint, role_id) VALUES (%s, %s)", missing)
+    print(f"Registered {len(missing)} endpoint/role pairs")
@@ -0,0 +1,41 @@
+"""
+Unique key on sm_users (email), backing the signup/login lookup.
+
+Signup and login compare lower-cased, trimmed emails, but older rows may
+have been stored as typed. Those are normalized first. Accounts whose
+emails only differ by case or surrounding spaces cannot be merged
+automatically (each owns ratings and a wishlist), so they are listed and
+the migration stops before changing anything; resolve them and run
+`upgrade` again.
+"""
+from migrations.helpers import add_index, has_index_on
+
+
+def upgrade(cursor):
+    # Databases created from the README schema already have `email UNIQUE`
+    if has_index_on(cursor, "sm_users", ["email"], unique=True):
+        print("Unique index on sm_users (email) already exists")
+        return
+
+    cursor.execute("""
+        SELECT LOWER(TRIM(email)) AS normalized, GROUP_CONCAT(id ORDER BY id) AS ids
+        FROM sm_users
+        GROUP BY LOWER(TRIM(email))
+        HAVING COUNT(*) > 1
+    """)
+    duplicates = cursor.fetchall()
+    if duplicates:
+        print("These sm_users rows share an email once lower-cased and trimmed:")
+        for normalized, ids in duplicates:
+            print(f"  {normalized}: ids {ids}")
+        raise RuntimeError(f"{len(duplicates)} duplicate email(s) in sm_users; merge or rename them first")
+
+    cursor.execute("""
+        UPDATE sm_users
+        SET email = LOWER(TRIM(email))
+        WHERE BINARY email <> BINARY LOWER(TRIM(email))
+    """)
+    if cursor.rowcount:
+        print(f"Normalized {cursor.rowcount} email(s) in sm_users")
+
+    add_index(cursor, "sm_users", "uq_users_email", ["email"], unique=True)
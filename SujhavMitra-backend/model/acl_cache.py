@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+
+from configs.config import ACL_CACHE_TTL, ACL_RETRY_INTERVAL
+from model import db
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointACLCache:
+    """
+    In-memory endpoint -> allowed role_ids map built from accessibility_view.
+
+    The map is loaded once at startup and then refreshed in the background
+    whenever it is older than `ttl` seconds, so an authorization check is a
+    dict lookup plus a set membership test. Readers always see a complete
+    map: a refresh builds a new dict and swaps the reference. After a
+    failed load, no new attempt is made for `retry_interval` seconds.
+    """
+
+    def __init__(self, ttl=ACL_CACHE_TTL, retry_interval=ACL_RETRY_INTERVAL):
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._roles = {}
+        self._loaded_at = None  # monotonic time of the last successful load
+        self._loaded_wall = None
+        self._refresh_lock = threading.Lock()  # held while querying the database
+        self._state_lock = threading.Lock()  # guards _refreshing and _retry_at
+        self._refreshing = False
+        self._retry_at = 0.0
+        self._refreshes = 0
+        self._failures = 0
+
+    def _fetch(self):
+        with db.get_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT endpoint, role_id FROM accessibility_view")
+            rows = cursor.fetchall()
+            cursor.close()
+
+        roles = {}
+        for row in rows:
+            roles.setdefault(row["endpoint"], set()).add(row["role_id"])
+        return {endpoint: frozenset(ids) for endpoint, ids in roles.items()}
+
+    def _load_locked(self):
+        try:
+            roles = self._fetch()
+        except Exception as e:
+            self._failures += 1
+            with self._state_lock:
+                self._retry_at = time.monotonic() + self.retry_interval
+            logger.error(f"Failed to load endpoint ACL: {e}")
+            return False
+
+        self._roles = roles
+        self._loaded_at = time.monotonic()
+        self._loaded_wall = time.time()
+        self._refreshes += 1
+        logger.info(f"Endpoint ACL loaded ({len(roles)} endpoints)")
+        return True
+
+    def load(self):
+        """Reload the map from the database. Returns True on success."""
+        with self._refresh_lock:
+            return self._load_locked()
+
+    def _background_refresh(self):
+        try:
+            # A load already running (e.g. an explicit invalidate) is as good as ours
+            if not self._refresh_lock.acquire(blocking=False):
+                return
+            try:
+                self._load_locked()
+            finally:
+                self._refresh_lock.release()
+        finally:
+            with self._state_lock:
+                self._refreshing = False
+
+    def _refresh_in_background(self):
+        # At most one refresh thread, none while backing off after a failure;
+        # other requests keep using the old map
+        with self._state_lock:
+            if self._refreshing or time.monotonic() < self._retry_at:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="acl-refresh", daemon=True).start()
+
+    def invalidate(self):
+        """Explicit invalidation hook: reload immediately (e.g. after editing sm_accessibility)"""
+        return self.load()
+
+    def is_loaded(self):
+        return self._loaded_at is not None
+
+    def allowed_roles(self, endpoint):
+        """
+        Allowed role_ids for an endpoint, or None if the map could not be
+        loaded at all. Unknown endpoints return an empty set.
+        """
+        if self._loaded_at is None:
+            # Startup load failed (e.g. DB was down); try again synchronously,
+            # but not on every request while the database stays down
+            if time.monotonic() < self._retry_at or not self.load():
+                return None
+        elif time.monotonic() - self._loaded_at > self.ttl:
+            self._refresh_in_background()
+
+        return self._roles.get(endpoint, frozenset())
+
+    def staleness_seconds(self):
+        """Seconds since the map was last loaded successfully"""
+        if self._loaded_at is None:
+            return None
+        return round(time.monotonic() - self._loaded_at, 3)
+
+    def stats(self):
+        return {
+            "endpoints": len(self._roles),
+            "ttl_seconds": self.ttl,
+            "staleness_seconds": self.staleness_seconds(),
+            "loaded_at": self._loaded_wall,
+            "refreshes": self._refreshes,
+            "refresh_failures": self._failures,
+        }
+
+
+_acl_cache = None
+_acl_lock = threading.Lock()
+
+
+def get_acl_cache():
+    """Process-wide ACL cache, loaded on first use"""
+    global _acl_cache
+    if _acl_cache is None:
+        with _acl_lock:
+            if _acl_cache is None:
+                cache = EndpointACLCache()
+                cache.load()
+                _acl_cache = cache
+    return _acl_cache
@@ -0,0 +1,157 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from configs.config import ACTIVITY_QUEUE_SIZE, ACTIVITY_BATCH_SIZE, ACTIVITY_FLUSH_INTERVAL
+from model import db
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogger:
+    """
+    Asynchronous, batched writer for sm_user_activity.
+
+    Request handlers call log() which only appends to a bounded in-memory
+    queue. A background thread flushes the queue to MySQL with multi-row
+    INSERTs whenever `batch_size` events are waiting or `flush_interval`
+    seconds have passed, and drains whatever is left on shutdown. When the
+    queue is full new events are dropped (and counted) rather than blocking
+    the request.
+    """
+
+    def __init__(self, queue_size=ACTIVITY_QUEUE_SIZE, batch_size=ACTIVITY_BATCH_SIZE,
+                 flush_interval=ACTIVITY_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self.last_flush_at = None
+
+        atexit.register(self.shutdown)
+
+    def _ensure_started(self):
+        # Started lazily, and restarted in a forked worker, since threads do not survive fork()
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+            self._thread.start()
+
+    def log(self, user_id, action):
+        """Queue an activity event; never blocks the caller"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((user_id, action, datetime.now()))
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Activity queue full, dropping event for user {user_id}")
+
+    def _next_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, events):
+        """Insert events with one multi-row INSERT per batch_size chunk"""
+        for start in range(0, len(events), self.batch_size):
+            chunk = events[start:start + self.batch_size]
+            placeholders = ", ".join(["(%s, %s, %s)"] * len(chunk))
+            params = [value for event in chunk for value in event]
+            try:
+                with db.get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        f"INSERT INTO sm_user_activity (user_id, action, timestamp) VALUES {placeholders}",
+                        params,
+                    )
+                    cursor.close()
+                self.written += len(chunk)
+            except Exception as e:
+                self.failed_batches += 1
+                self.dropped += len(chunk)
+                logger.error(f"Failed to write {len(chunk)} activity events: {e}")
+        self.last_flush_at = time.time()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def flush(self):
+        """Synchronously write everything currently queued"""
+        events = self._drain()
+        if events:
+            self._write(events)
+
+    def shutdown(self, timeout=5):
+        """Stop the writer thread and drain the queue"""
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=max(timeout, self.flush_interval))
+        self.flush()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "last_flush_at": self.last_flush_at,
+        }
+
+
+_activity_logger = None
+_activity_lock = threading.Lock()
+
+
+def get_activity_logger():
+    """Process-wide activity writer"""
+    global _activity_logger
+    if _activity_logger is None:
+        with _activity_lock:
+            if _activity_logger is None:
+                _activity_logger = ActivityLogger()
+    return _activity_logger
+
+
+def log_activity(user_id, action):
+    """Queue an sm_user_activity row without touching the database on the request path"""
+    get_activity_logger().log(user_id, action)
@@ -0,0 +1,163 @@
+"""
+Activity retention: rolls raw sm_user_activity events up into compact
+per-user, per-day counters (sm_user_activity_daily) and purges raw events
+older than the retention window, optionally copying them to
+sm_user_activity_archive first.
+
+Run once from the backend directory:
+    python -m model.activity_retention
+or let the app run it periodically (ACTIVITY_RETENTION_JOB=True).
+"""
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+from configs.config import (
+    ACTIVITY_RETENTION_DAYS,
+    ACTIVITY_ROLLUP_LOOKBACK_DAYS,
+    ACTIVITY_ARCHIVE,
+    ACTIVITY_PURGE_BATCH,
+    ACTIVITY_RETENTION_INTERVAL,
+)
+from model import db
+
+logger = logging.getLogger(__name__)
+
+# Free-text actions written by the models, mapped to compact counter keys
+ACTION_TYPE_SQL = """
+    CASE
+        WHEN action LIKE 'Added %% to wishlist' THEN 'wishlist_add'
+        WHEN action LIKE 'Removed %% from wishlist' THEN 'wishlist_remove'
+        WHEN action LIKE 'Cleared %%' THEN 'wishlist_clear'
+        WHEN action LIKE 'Rated book %%' THEN 'rating_add'
+        WHEN action LIKE 'Updated rating %%' THEN 'rating_update'
+        WHEN action LIKE 'Deleted rating %%' THEN 'rating_delete'
+        WHEN action LIKE 'Viewed personalized recommendations%%' THEN 'recommendations_view'
+        ELSE 'other'
+    END
+"""
+
+# Named MySQL lock so only one worker process runs the job at a time
+JOB_LOCK_NAME = "sm_activity_retention"
+
+
+class ActivityRetention:
+    def __init__(self, retention_days=ACTIVITY_RETENTION_DAYS,
+                 lookback_days=ACTIVITY_ROLLUP_LOOKBACK_DAYS,
+                 archive=ACTIVITY_ARCHIVE, purge_batch=ACTIVITY_PURGE_BATCH):
+        if lookback_days >= retention_days:
+            # Days being rolled up must still have their raw events
+            raise ValueError("ACTIVITY_ROLLUP_LOOKBACK_DAYS must be smaller than ACTIVITY_RETENTION_DAYS")
+        self.retention_days = retention_days
+        self.lookback_days = lookback_days
+        self.archive = archive
+        self.purge_batch = purge_batch
+
+    def rollup(self, cursor, today=None):
+        """
+        Recompute the counters for the last `lookback_days` complete days
+        (plus today so far). Recomputing rather than incrementing keeps the
+        job idempotent and safe to re-run.
+        """
+        today = today or date.today()
+        start = today - timedelta(days=self.lookback_days)
+        end = today + timedelta(days=1)
+
+        cursor.execute(
+            f"""
+            INSERT INTO sm_user_activity_daily (user_id, activity_date, action_type, event_count)
+            SELECT user_id, DATE(timestamp), {ACTION_TYPE_SQL}, COUNT(*)
+            FROM sm_user_activity
+            WHERE timestamp >= %s AND timestamp < %s
+            GROUP BY user_id, DATE(timestamp), {ACTION_TYPE_SQL}
+            ON DUPLICATE KEY UPDATE event_count = VALUES(event_count)
+            """,
+            (start, end),
+        )
+        return cursor.rowcount
+
+    def purge(self, conn, cursor, now=None):
+        """Delete (and optionally archive) raw events older than the retention window in small batches"""
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        purged = 0
+        while True:
+            cursor.execute(
+                "SELECT id FROM sm_user_activity WHERE timestamp < %s ORDER BY timestamp LIMIT %s",
+                (cutoff, self.purge_batch),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+
+            placeholders = ", ".join(["%s"] * len(ids))
+            conn.start_transaction()
+            if self.archive:
+                cursor.execute(
+                    f"""
+                    INSERT IGNORE INTO sm_user_activity_archive (id, user_id, action, timestamp)
+                    SELECT id, user_id, action, timestamp FROM sm_user_activity WHERE id IN ({placeholders})
+                    """,
+                    ids,
+                )
+            cursor.execute(f"DELETE FROM sm_user_activity WHERE id IN ({placeholders})", ids)
+            conn.commit()
+            purged += len(ids)
+
+            if len(ids) < self.purge_batch:
+                break
+        return purged
+
+    def run(self):
+        """Roll up recent activity then purge expired raw events. Returns a summary dict."""
+        with db.get_connection() as conn:
+            cursor = conn.cursor(buffered=True)
+            try:
+                cursor.execute("SELECT GET_LOCK(%s, 0)", (JOB_LOCK_NAME,))
+                if cursor.fetchone()[0] != 1:
+                    logger.info("Activity retention already running in another process")
+                    return {"skipped": True}
+                try:
+                    rolled_up = self.rollup(cursor)
+                    purged = self.purge(conn, cursor)
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (JOB_LOCK_NAME,))
+                    cursor.fetchall()
+            finally:
+                cursor.close()
+
+        logger.info(f"Activity retention: {rolled_up} rollup rows written, {purged} raw events purged")
+        return {"skipped": False, "rollup_rows": rolled_up, "purged": purged}
+
+
+class ActivityRetentionJob:
+    """Runs ActivityRetention every `interval` seconds on a daemon thread"""
+
+    def __init__(self, retention=None, interval=ACTIVITY_RETENTION_INTERVAL):
+        self.retention = retention or ActivityRetention()
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_result = None
+        self.last_run_at = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_result = self.retention.run()
+                self.last_run_at = datetime.now().isoformat()
+            except Exception as e:
+                logger.error(f"Activity retention job failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="activity-retention", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(ActivityRetention().run())
@@ -0,0 +1,128 @@
+"""
+Reading and writing model artifacts.
+
+Catalog tables are stored as Parquet with only the columns the API serves,
+and numeric matrices as .npy files that are memory-mapped on load
+(MODEL_MMAP), so a cold start neither unpickles pandas internals nor
+copies the similarity matrices into private memory. The original pickles
+are still read when no columnar file is present (see ARTIFACT_FILES in
+model/artifacts.py); `python -m model.artifacts convert` writes the
+columnar set from them.
+"""
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from configs.config import MODEL_MMAP
+from model.artifacts import ARTIFACT_FILES, BOOK_ARTIFACTS, MOVIE_ARTIFACTS, ArtifactError, find_artifact
+
+# Columns read by the models; anything else in the source tables is dropped
+SERVING_COLUMNS = {
+    "books": ["ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher", "Image-URL-L"],
+    "popular_books": ["Book-Title", "num_rating", "avg_rating"],
+    "movies": ["movie_id", "title", "overview", "genres", "popularity", "vote_average",
+               "poster_url", "poster_path", "image_url", "backdrop_path"],
+    "movie_links": ["movie_id", "homepage", "cast_original", "crew_original"],
+}
+
+# Single-column tables that hold row/feature labels
+LABEL_COLUMNS = {"book_titles": "title", "tfidf_features": "feature"}
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _project(frame, name):
+    return frame.drop(columns=[c for c in frame.columns if c not in SERVING_COLUMNS[name]])
+
+
+def load_table(directory, name):
+    """Catalog table as a DataFrame with only its serving columns"""
+    path = find_artifact(directory, name)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return _project(_load_pickle(path), name)
+
+
+def load_array(directory, name, mmap=MODEL_MMAP):
+    """Numeric matrix; .npy files are memory-mapped read-only when `mmap` is set"""
+    path = find_artifact(directory, name)
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    array = _load_pickle(path)
+    if hasattr(array, "toarray"):
+        array = array.toarray()
+    return array
+
+
+def load_labels(directory, name):
+    """
+    Row or feature labels: the book titles indexing the similarity matrix,
+    or the TF-IDF vocabulary. Only these are needed from the pickled
+    user-item matrix and vectorizer at serving time.
+    """
+    path = find_artifact(directory, name)
+    if path.endswith(".parquet"):
+        return pd.Index(pd.read_parquet(path)[LABEL_COLUMNS[name]])
+    source = _load_pickle(path)
+    if name == "book_titles":
+        return source.index
+    return source.get_feature_names_out()
+
+
+def _parquet_safe(frame):
+    """Object columns holding lists (tokenized text) become strings Parquet can store"""
+    frame = frame.copy()
+    for column in frame.columns:
+        if frame[column].dtype != object:
+            continue
+        if not frame[column].map(lambda v: isinstance(v, list)).any():
+            continue
+        if column == "overview":
+            # Rendered this way by MovieRecommendModel.format_movie_row anyway
+            frame[column] = frame[column].map(lambda v: " ".join(str(w) for w in v) if isinstance(v, list) else v)
+        else:
+            # Parsed back into lists by MovieRecommendModel.safe_parse_list
+            frame[column] = frame[column].map(lambda v: repr(v) if isinstance(v, list) else v)
+    return frame
+
+
+def _write_parquet(frame, path):
+    tmp = path + ".tmp"
+    frame.to_parquet(tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def _write_npy(array, path):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+    os.replace(tmp, path)
+
+
+def convert_to_columnar(source_dir, target_dir):
+    """
+    Write the columnar form of every artifact in `source_dir` to `target_dir`.
+    Returns {file name: size in bytes}.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    written = {}
+    for name in BOOK_ARTIFACTS + MOVIE_ARTIFACTS:
+        filename = ARTIFACT_FILES[name][0]
+        path = os.path.join(target_dir, filename)
+        if name in SERVING_COLUMNS:
+            _write_parquet(_parquet_safe(load_table(source_dir, name)), path)
+        elif name in LABEL_COLUMNS:
+            labels = load_labels(source_dir, name)
+            _write_parquet(pd.DataFrame({LABEL_COLUMNS[name]: np.asarray(labels, dtype=object)}), path)
+        else:
+            array = load_array(source_dir, name, mmap=False)
+            if array.dtype == object:
+                raise ArtifactError(f"{name} is not a numeric array")
+            _write_npy(array, path)
+        written[filename] = os.path.getsize(path)
+    return written
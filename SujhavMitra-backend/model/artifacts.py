@@ -0,0 +1,240 @@
+"""
+Versioned model artifacts.
+
+Each retrained set of artifacts lives in its own directory with a manifest:
+
+    models/
+        CURRENT                     # name of the active version
+        versions/
+            2025-01-15/
+                manifest.json       # version, created_at, file sizes and sha256
+                books.parquet       # or books.pkl
+                similarity_scores.npy
+                ...
+
+Without a CURRENT file the flat files directly under models/ are served,
+so existing deployments keep working unchanged.
+
+From the backend directory:
+    python -m model.artifacts list
+    python -m model.artifacts convert --from models --to /tmp/columnar   # pickles -> Parquet + .npy
+    python -m model.artifacts publish 2025-01-15 --from /path/to/new/artifacts
+    python -m model.artifacts verify 2025-01-15
+    python -m model.artifacts activate 2025-01-15   # workers pick it up via the watcher
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime
+
+from configs.config import MODEL_DIR
+
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+UNVERSIONED = "unversioned"
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+# Logical artifact -> accepted files, columnar (Parquet/.npy, see model/artifact_io.py)
+# first, then the original pickle
+ARTIFACT_FILES = {
+    "books": ["books.parquet", "books.pkl"],
+    "popular_books": ["popular_books.parquet", "popular_books_df.pkl"],
+    "similarity_scores": ["similarity_scores.npy", "similarity_scores.pkl"],
+    "book_titles": ["book_titles.parquet", "book_user_matrix.pkl"],
+    "movies": ["movies.parquet", "movie_list.pkl"],
+    "movie_links": ["movie_links.parquet", "movie_homepage_link.pkl"],
+    "similarity_movies": ["similarity_movies.npy", "similarity_movies.pkl"],
+    "tfidf_features": ["tfidf_features.parquet", "tfidf_vectorizer.pkl"],
+    "tfidf_vectors": ["tfidf_vectors.npy", "tfidf_vectors.pkl"],
+}
+BOOK_ARTIFACTS = ["books", "popular_books", "similarity_scores", "book_titles"]
+MOVIE_ARTIFACTS = ["movies", "movie_links", "similarity_movies", "tfidf_features", "tfidf_vectors"]
+
+
+class ArtifactError(ValueError):
+    """An artifact version is missing, corrupt or internally inconsistent"""
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_artifact(directory, name):
+    """Path of the preferred existing file for a logical artifact"""
+    for filename in ARTIFACT_FILES[name]:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            return path
+    raise ArtifactError(f"{directory} has no {name} artifact ({' or '.join(ARTIFACT_FILES[name])})")
+
+
+def artifact_fingerprint(directory, version, names):
+    """
+    Short id of the exact artifact files behind a model (version plus file
+    names, sizes and mtimes). Identical in every worker process serving the
+    same files, so it can key caches and ETags.
+    """
+    digest = hashlib.sha256(version.encode("utf-8"))
+    for name in names:
+        path = find_artifact(directory, name)
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ArtifactStore:
+    def __init__(self, root=MODEL_DIR):
+        self.root = root
+        self.versions_dir = os.path.join(root, "versions")
+
+    def current_version(self):
+        """Active version from models/CURRENT, or UNVERSIONED for the flat layout"""
+        try:
+            with open(os.path.join(self.root, CURRENT)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return UNVERSIONED
+        return version or UNVERSIONED
+
+    def path_for(self, version):
+        if version == UNVERSIONED:
+            return self.root
+        if not VERSION_PATTERN.match(version or ""):
+            raise ArtifactError(f"Invalid artifact version name: {version!r}")
+        return os.path.join(self.versions_dir, version)
+
+    def list_versions(self):
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(name for name in os.listdir(self.versions_dir)
+                      if os.path.isfile(os.path.join(self.versions_dir, name, MANIFEST)))
+
+    def read_manifest(self, version):
+        if version == UNVERSIONED:
+            return {"version": UNVERSIONED, "files": {}}
+        path = os.path.join(self.path_for(version), MANIFEST)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ArtifactError(f"Artifact version {version} has no {MANIFEST}")
+        except ValueError as e:
+            raise ArtifactError(f"Unreadable manifest for {version}: {e}")
+
+    def verify(self, version, checksums=True):
+        """Check every file listed in the manifest exists with the recorded size (and sha256)"""
+        manifest = self.read_manifest(version)
+        directory = self.path_for(version)
+        listed = manifest.get("files", {})
+        for name in BOOK_ARTIFACTS + MOVIE_ARTIFACTS:
+            if version != UNVERSIONED and not any(f in listed for f in ARTIFACT_FILES[name]):
+                raise ArtifactError(f"{version}: manifest does not list a {name} artifact")
+        for name, meta in manifest.get("files", {}).items():
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                raise ArtifactError(f"{version}: missing {name}")
+            if os.path.getsize(path) != meta.get("bytes"):
+                raise ArtifactError(f"{version}: {name} size does not match the manifest")
+            if checksums and _sha256(path) != meta.get("sha256"):
+                raise ArtifactError(f"{version}: {name} checksum does not match the manifest")
+        return manifest
+
+    def publish(self, version, source_dir, notes=None):
+        """Copy a complete artifact set into versions/<version> and write its manifest"""
+        target = self.path_for(version)
+        if os.path.exists(target):
+            raise ArtifactError(f"Artifact version {version} already exists")
+
+        # One file per logical artifact, columnar preferred
+        names = [os.path.basename(find_artifact(source_dir, name)) for name in BOOK_ARTIFACTS + MOVIE_ARTIFACTS]
+
+        # Build in a temporary directory so a half-copied version is never listed
+        staging = target + ".partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        files = {}
+        for name in names:
+            path = os.path.join(staging, name)
+            shutil.copy2(os.path.join(source_dir, name), path)
+            files[name] = {"bytes": os.path.getsize(path), "sha256": _sha256(path)}
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "notes": notes,
+            "files": files,
+        }
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(staging, target)
+        return manifest
+
+    def activate(self, version):
+        """Point models/CURRENT at `version` (atomic rename, so readers never see a partial write)"""
+        if version != UNVERSIONED:
+            self.read_manifest(version)
+        tmp = os.path.join(self.root, f".{CURRENT}.{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp, os.path.join(self.root, CURRENT))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SujhavMitra model artifact versions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    convert = sub.add_parser("convert")
+    convert.add_argument("--from", dest="source", default=MODEL_DIR, help="directory holding the pickled artifacts")
+    convert.add_argument("--to", dest="target", required=True)
+    publish = sub.add_parser("publish")
+    publish.add_argument("version")
+    publish.add_argument("--from", dest="source", default=MODEL_DIR, help="directory holding the artifact files")
+    publish.add_argument("--notes")
+    publish.add_argument("--activate", action="store_true")
+    verify = sub.add_parser("verify")
+    verify.add_argument("version")
+    activate = sub.add_parser("activate")
+    activate.add_argument("version")
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore()
+    try:
+        if args.command == "list":
+            current = store.current_version()
+            for version in store.list_versions():
+                print(("* " if version == current else "  ") + version)
+            if current == UNVERSIONED:
+                print(f"* {UNVERSIONED} (flat files in {store.root}/)")
+        elif args.command == "convert":
+            from model.artifact_io import convert_to_columnar
+            for filename, size in convert_to_columnar(args.source, args.target).items():
+                print(f"{filename:<26} {size / 1024 / 1024:8.1f} MB")
+        elif args.command == "publish":
+            manifest = store.publish(args.version, args.source, args.notes)
+            print(f"Published {args.version} ({len(manifest['files'])} files)")
+            if args.activate:
+                store.activate(args.version)
+                print(f"Activated {args.version}")
+        elif args.command == "verify":
+            store.verify(args.version)
+            print(f"{args.version} OK")
+        else:
+            store.verify(args.version)
+            store.activate(args.version)
+            print(f"Activated {args.version}")
+    except ArtifactError as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,98 +1,125 @@
 # auth_model.py - FIXED VERSION
 from datetime import datetime, timedelta
-import mysql.connector
 import jwt
-from flask import make_response, request, json
-import re
-from configs.config import dbconfig, JWT_SECRET
+from flask import make_response, request, json, g
+from configs.config import JWT_SECRET, JWT_CACHE_SIZE
+from model.acl_cache import get_acl_cache
+from model.token_cache import VerifiedTokenCache
+from model.metrics import timer
 from functools import wraps
 
+# Shared across requests: recently verified tokens skip HMAC verification until they expire
+token_cache = VerifiedTokenCache(JWT_CACHE_SIZE)
+
+
+def decode_token(token):
+    """Verify a JWT once and return its claims (raises jwt.InvalidTokenError)"""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        token_cache.put(token, claims)
+    return claims
+
+
+def current_user():
+    """Claims payload of the user authenticated by token_auth for this request"""
+    return g.get("auth_user")
+
+
+def current_user_id():
+    user = current_user()
+    return user.get("id") if user else None
+
+
+def current_role_id():
+    user = current_user()
+    return user.get("role_id") if user else None
+
+
+def request_is_admin():
+    """
+    True if the request carries a valid admin token. Unlike current_role_id(),
+    this also works before token_auth has run and on public routes, where the
+    token is otherwise never decoded.
+    """
+    user = current_user()
+    if user is None:
+        scheme, _, token = (request.headers.get("authorization") or "").partition(" ")
+        token = token.strip()
+        if scheme != "Bearer" or not token:
+            return False
+        try:
+            user = decode_token(token)["payload"]
+        except (jwt.InvalidTokenError, KeyError, TypeError):
+            return False
+    return user.get("role_id") == 1
+
+
 class auth_model():
     def __init__(self):
-        """Don't create persistent connection - create fresh ones per request"""
+        """Endpoint ACL is loaded once into memory (on first use) and shared by every instance"""
         print("Auth model initialized")
-    
-    def get_connection(self):
-        """Get a fresh database connection for each request"""
-        try:
-            connection = mysql.connector.connect(
-                host=dbconfig["host"],
-                port=dbconfig["port"],
-                user=dbconfig["user"],
-                password=dbconfig["password"],
-                database=dbconfig["database"],
-                autocommit=True,
-                connect_timeout=10
-            )
-            return connection
-        except Exception as e:
-            print(f"Error connecting to database: {e}")
-            return None
+
+    @property
+    def acl(self):
+        return get_acl_cache()
+
+    def get_allowed_roles(self, endpoint):
+        """
+        Role_ids allowed to reach an endpoint, served from the in-memory
+        ACL cache (no database round trip). None if the ACL is unavailable.
+        """
+        return self.acl.allowed_roles(endpoint)
+
+    def invalidate_acl(self):
+        """Reload the endpoint ACL after sm_accessibility changes"""
+        return self.acl.invalidate()
 
     def token_auth(self, endpoint=""):
         def inner1(func):
             @wraps(func)
             def inner2(*args, **kwargs):
-                # Get fresh connection for THIS request
-                conn = self.get_connection()
-                if not conn:
-                    return make_response({"ERROR": "DATABASE_CONNECTION_ERROR"}, 500)
+                endpoint = request.url_rule.rule
+                print(f"Checking auth for endpoint: {endpoint}")
+                
+                # Get Authorization header
+                authorization = request.headers.get("authorization")
+                
+                # Validate Bearer token format
+                scheme, _, token = (authorization or "").partition(" ")
+                token = token.strip()
+                if scheme != "Bearer" or not token or " " in token:
+                    return make_response({"ERROR": "INVALID_TOKEN"}, 401)
                 
                 try:
-                    endpoint = request.url_rule.rule
-                    print(f"Checking auth for endpoint: {endpoint}")
+                    with timer("auth"):
+                        # Verify the token once; controllers read the claims from flask.g
+                        tokendata = decode_token(token)
+                        current_role = tokendata['payload']['role_id']
+                        
+                        # Look up allowed roles for the given endpoint
+                        allowed_roles = self.get_allowed_roles(endpoint)
+                    if allowed_roles is None:
+                        return make_response({"ERROR": "DATABASE_CONNECTION_ERROR"}, 500)
                     
-                    # Get Authorization header
-                    authorization = request.headers.get("authorization")
+                    if not allowed_roles:
+                        return make_response({"ERROR": "UNKNOWN_ENDPOINT"}, 404)
                     
-                    # Validate Bearer token format
-                    if not authorization or not re.match(r"^Bearer\s+[^ ]+$", authorization):
-                        return make_response({"ERROR": "INVALID_TOKEN"}, 401)
+                    # Check if user role is allowed
+                    if current_role not in allowed_roles:
+                        return make_response({"ERROR": "ACCESS_DENIED"}, 403)
                     
-                    # Extract token from header
-                    token = authorization.split(" ")[1]
+                    g.auth_user = tokendata['payload']
                     
-                    try:
-                        # Decode JWT token
-                        tokendata = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                        current_role = tokendata['payload']['role_id']
-                        
-                        # Create cursor for this operation
-                        cursor = conn.cursor(dictionary=True)
-                        
-                        # Fetch allowed roles for the given endpoint
-                        cursor.execute(
-                            "SELECT role_id FROM accessibility_view WHERE endpoint = %s",
-                            (endpoint,),
-                        )
-                        rows = cursor.fetchall()
-                        cursor.close()
-                        
-                        if not rows:
-                            return make_response({"ERROR": "UNKNOWN_ENDPOINT"}, 404)
-                        
-                        # Extract allowed role IDs
-                        allowed_roles = [row["role_id"] for row in rows]
-                        
-                        # Check if user role is allowed
-                        if current_role in allowed_roles:
-                            return func(*args, **kwargs)
-                        else:
-                            return make_response({"ERROR": "ACCESS_DENIED"}, 403)
-                        
-                    except jwt.ExpiredSignatureError:
-                        return make_response({"ERROR": "TOKEN_EXPIRED"}, 401)
-                    except jwt.InvalidTokenError:
-                        return make_response({"ERROR": "INVALID_TOKEN"}, 401)
-                    except Exception as e:
-                        print(f"Token auth error: {e}")
-                        return make_response({"ERROR": "AUTHENTICATION_ERROR"}, 500)
-                        
-                finally:
-                    # CRITICAL: Always close connection
-                    if conn and conn.is_connected():
-                        conn.close()
+                except jwt.ExpiredSignatureError:
+                    return make_response({"ERROR": "TOKEN_EXPIRED"}, 401)
+                except jwt.InvalidTokenError:
+                    return make_response({"ERROR": "INVALID_TOKEN"}, 401)
+                except Exception as e:
+                    print(f"Token auth error: {e}")
+                    return make_response({"ERROR": "AUTHENTICATION_ERROR"}, 500)
+                
+                return func(*args, **kwargs)
                         
             return inner2
         return inner1
-
@@ -1,22 +1,95 @@
 from flask import make_response
 import difflib
-import pickle
+import numpy as np
+from model.artifacts import ArtifactError, UNVERSIONED, BOOK_ARTIFACTS, artifact_fingerprint
+from model.artifact_io import load_table, load_array, load_labels, SERVING_COLUMNS
+from model.shared_layout import freeze_array, string_array, categorize
+from model.projection import project, wants
+from model.metrics import timer
 
 class BookRecommendModel:
-    def __init__(self):
-        with open("models/books.pkl", "rb") as f:
-            self.books = pickle.load(f)
-        with open("models/popular_books_df.pkl", "rb") as f:
-            self.popbooks = pickle.load(f)
-        with open("models/similarity_scores.pkl", "rb") as f:
-            self.similarity = pickle.load(f)
-        with open("models/book_user_matrix.pkl", "rb") as f:
-            self.book_user_matrix = pickle.load(f)
-
-        # Normalize titles for lookup
-        self.book_index_titles = list(self.book_user_matrix.index.str.lower().str.strip())
-
-    def get_popular_book_title(self):
+    def __init__(self, artifact_dir="models", version=UNVERSIONED):
+        self.version = version
+        self.fingerprint = artifact_fingerprint(artifact_dir, version, BOOK_ARTIFACTS)
+        self.books = load_table(artifact_dir, "books")
+        self.popbooks = load_table(artifact_dir, "popular_books")
+        self.similarity = load_array(artifact_dir, "similarity_scores")
+        # Titles labelling the similarity matrix rows (the user-item matrix itself is not needed)
+        self.book_titles = load_labels(artifact_dir, "book_titles")
+        self.validate()
+
+        # Laid out so forked workers keep sharing these pages (see model/shared_layout.py)
+        self.similarity = freeze_array(self.similarity)
+        categorize(self.books, ["Book-Title", "Book-Author", "Publisher"])
+
+        # Normalized titles for lookup, aligned with the similarity matrix rows
+        self.book_index_titles = string_array(self.book_titles.str.lower().str.strip())
+        self.title_positions = {t: pos for pos, t in reversed(list(enumerate(self.book_index_titles.tolist())))}
+
+        # ISBN -> row position of its first edition, for O(1) lookups by ISBN
+        isbns = self.books["ISBN"].astype(str).str.strip()
+        self.isbn_positions = {isbn: pos for pos, isbn in reversed(list(enumerate(isbns)))}
+
+        # Prebuilt response records: one per similarity row (first edition of each
+        # title) and the popular list, so requests only copy/project them
+        self.title_records = self.build_title_records()
+        self.popular_records = self.build_popular_records()
+
+    def validate(self):
+        """Reject artifact sets whose shapes or indexes do not line up"""
+        for name, frame in (("books", self.books), ("popular_books", self.popbooks)):
+            missing = [c for c in SERVING_COLUMNS[name] if c not in frame.columns]
+            if missing:
+                raise ArtifactError(f"{name} is missing columns: {', '.join(missing)}")
+
+        n = len(self.book_titles)
+        if getattr(self.similarity, "shape", None) != (n, n):
+            raise ArtifactError(
+                f"similarity_scores shape {getattr(self.similarity, 'shape', None)} "
+                f"does not match the {n} book titles"
+            )
+        if not np.isfinite(self.similarity).all():
+            raise ArtifactError("similarity_scores contains NaN or infinite values")
+
+        # Every similarity row must resolve to a catalog entry
+        unknown = set(self.book_titles) - set(self.books["Book-Title"])
+        if unknown:
+            raise ArtifactError(f"{len(unknown)} similarity matrix titles are not in the books table")
+
+    def find_title_index(self, norm_title):
+        """Similarity row for a normalized title: exact, then substring, then fuzzy match (None if no match)"""
+        pos = self.title_positions.get(norm_title)
+        if pos is not None:
+            return pos
+
+        substring_matches = np.flatnonzero(np.char.find(self.book_index_titles, norm_title) >= 0)
+        if len(substring_matches):
+            return int(substring_matches[0])
+
+        close = difflib.get_close_matches(norm_title, self.book_index_titles.tolist(), n=1, cutoff=0.6)
+        if close:
+            return self.title_positions[close[0]]
+        return None
+
+    def format_book_row(self, row):
+        """Format a row from the books data into a dictionary for API response."""
+        return {
+            "title": row["Book-Title"],
+            "author": row["Book-Author"],
+            "isbn": row["ISBN"],
+            "publishdate": row["Year-Of-Publication"],
+            "publisher": row["Publisher"],
+            "imageurl": row["Image-URL-L"]
+        }
+
+    def build_title_records(self):
+        """Book record for each similarity matrix row, aligned with book_titles"""
+        first_editions = ~self.books["Book-Title"].duplicated()
+        first_pos = dict(zip(self.books["Book-Title"][first_editions], np.flatnonzero(first_editions)))
+        rows = self.books.iloc[[first_pos[t] for t in self.book_titles]].to_dict("records")
+        return [self.format_book_row(row) for row in rows]
+
+    def build_popular_records(self):
         popular_titles = self.popbooks["Book-Title"].unique()[:15]
         popular_books_info = []
         
@@ -32,107 +105,66 @@ class BookRecommendModel:
                     "publishdate": book_info["Year-Of-Publication"].values[0],
                     "publisher": book_info["Publisher"].values[0],
                     "imageurl": book_info["Image-URL-L"].values[0],
-                    "num_rating": int(pop_info["num_rating"].values[0]),
-                    "avg_rating": round(float(pop_info["avg_rating"].values[0]), 2)
+                    "num_rating": pop_info["num_rating"].values[0],
+                    "avg_rating": round(pop_info["avg_rating"].values[0], 2)
                 })
 
+        return popular_books_info
+
+    def get_books_by_isbns(self, isbns):
+        """Batched catalog lookup: {isbn: book dict} for the ISBNs that exist"""
+        found = {}
+        for isbn in isbns:
+            pos = self.isbn_positions.get(str(isbn).strip())
+            if pos is not None:
+                found[isbn] = self.format_book_row(self.books.iloc[pos])
+        return found
+
+    def get_popular_book_title(self, fields=None):
+        popular_books_info = [project(book, fields) for book in self.popular_records]
         return make_response({"popular_books": popular_books_info}, 200)
 
-    def book_recommend_model(self, title):
+    def book_recommend_model(self, title, fields=None):
         norm_title = title.strip().lower()
 
-        # Exact match first
-        if norm_title in self.book_index_titles:
-            book_index = self.book_index_titles.index(norm_title)
-        else:
-            # Try substring match
-            substring_matches = [i for i, t in enumerate(self.book_index_titles) if norm_title in t]
-            if substring_matches:
-                book_index = substring_matches[0]
-            else:
-                # Fuzzy match using difflib
-                close = difflib.get_close_matches(norm_title, self.book_index_titles, n=1, cutoff=0.6)
-                if close:
-                    book_index = self.book_index_titles.index(close[0])
-                else:
-                    return make_response({"error": f"Book titled '{title}' not found"}, 404)
-
-        distances = self.similarity[book_index]
-        book_list = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:6]
+        with timer("title_resolution"):
+            book_index = self.find_title_index(norm_title)
+        if book_index is None:
+            return make_response({"error": f"Book titled '{title}' not found"}, 404)
 
-        recommendations = []
-        for i in book_list:
-            similar_title = self.book_user_matrix.index[i[0]]
-            similarity_score = i[1] * 100  # Convert to percentage
-
-            # Find full book info (title, author, ISBN) — drop duplicates to avoid multiple editions
-            book_info = self.books[self.books["Book-Title"] == similar_title].drop_duplicates("Book-Title")
+        with timer("similarity_topk"):
+            distances = self.similarity[book_index]
+            book_list = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:6]
 
-            if not book_info.empty:
-                recommendations.append({
-                    "title": book_info["Book-Title"].values[0],
-                    "author": book_info["Book-Author"].values[0],
-                    "isbn": book_info["ISBN"].values[0],
-                    "publishdate": book_info["Year-Of-Publication"].values[0],
-                    "publisher": book_info["Publisher"].values[0],
-                    "imageurl": book_info["Image-URL-L"].values[0],
-                    "similarity_score": f"{similarity_score:.2f} %"  # 2 decimal percentage
-                })
+        recommendations = []
+        with timer("hydration"):
+            for i in book_list:
+                # First edition of the similar title (prebuilt, see build_title_records)
+                book = project(self.title_records[i[0]], fields)
+                if wants(fields, "similarity_score"):
+                    similarity_score = i[1] * 100  # Convert to percentage
+                    book["similarity_score"] = f"{similarity_score:.2f} %"  # 2 decimal percentage
+                recommendations.append(book)
 
         return make_response({"recommendations": recommendations}, 200)
 
     
-    def get_book_by_isbn(self, isbn):
-        norm_isbn = str(isbn).strip()
-        book_info = self.books[self.books["ISBN"].astype(str).str.strip() == norm_isbn].drop_duplicates("Book-Title")
-        if book_info.empty:
+    def get_book_by_isbn(self, isbn, fields=None):
+        pos = self.isbn_positions.get(str(isbn).strip())
+        if pos is None:
             return make_response({"error": "Book not found"}, 404)
 
-        book = {
-            "title": book_info["Book-Title"].values[0],
-            "author": book_info["Book-Author"].values[0],
-            "isbn": book_info["ISBN"].values[0],
-            "publishdate": book_info["Year-Of-Publication"].values[0],
-            "publisher": book_info["Publisher"].values[0],
-            "imageurl": book_info["Image-URL-L"].values[0]
-        }
-
-        return make_response(book, 200)
+        return make_response(project(self.format_book_row(self.books.iloc[pos]), fields), 200)
 
-    def get_book_by_title(self, title: str):
+    def get_book_by_title(self, title: str, fields=None):
         if not title:
             return make_response({"error": "Title is required"}, 400)
 
         norm_title = str(title).strip().lower()
 
-        # Exact match against index titles
-        if norm_title in self.book_index_titles:
-            idx = self.book_index_titles.index(norm_title)
-        else:
-            # Substring match in index titles
-            matches = [i for i, t in enumerate(self.book_index_titles) if norm_title in t]
-            if matches:
-                idx = matches[0]
-            else:
-                # Fuzzy match
-                close = difflib.get_close_matches(norm_title, self.book_index_titles, n=1, cutoff=0.6)
-                if close:
-                    idx = self.book_index_titles.index(close[0])
-                else:
-                    return make_response({"error": "Book not found"}, 404)
-
-        resolved_title = self.book_user_matrix.index[idx]
-        book_info = self.books[self.books["Book-Title"] == resolved_title].drop_duplicates("Book-Title")
-        if book_info.empty:
+        with timer("title_resolution"):
+            idx = self.find_title_index(norm_title)
+        if idx is None:
             return make_response({"error": "Book not found"}, 404)
 
-        book = {
-            "title": book_info["Book-Title"].values[0],
-            "author": book_info["Book-Author"].values[0],
-            "isbn": book_info["ISBN"].values[0],
-            "publishdate": book_info["Year-Of-Publication"].values[0],
-            "publisher": book_info["Publisher"].values[0],
-            "imageurl": book_info["Image-URL-L"].values[0]
-        }
-
-        return make_response(book, 200)
\ No newline at end of file
+        return make_response(project(self.title_records[idx], fields), 200)
\ No newline at end of file
@@ -0,0 +1,51 @@
+import gzip
+
+from flask import request
+
+from configs.config import COMPRESS_MIN_BYTES, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY
+from model.metrics import timer
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# Server preference when the client accepts several equally
+ENCODINGS = ["br", "gzip"] if brotli else ["gzip"]
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response):
+    """
+    after_request: gzip or brotli (per Accept-Encoding) JSON and text bodies
+    of at least COMPRESS_MIN_BYTES. Recommendation payloads with cast, crew
+    and overviews shrink several-fold; small bodies are left as they are.
+    """
+    if COMPRESS_MIN_BYTES <= 0:
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers:
+        return response
+    if not response.mimetype or not response.mimetype.startswith(COMPRESSIBLE_TYPES):
+        return response
+    if response.calculate_content_length() < COMPRESS_MIN_BYTES:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+
+    with timer("compression"):
+        response.set_data(_compress(response.get_data(), encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
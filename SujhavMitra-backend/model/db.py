@@ -0,0 +1,289 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+from configs.config import (
+    dbconfig,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_CONNECT_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PING_INTERVAL,
+)
+
+from model.metrics import timer
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(PoolError):
+    """Raised when no pooled connection became free within the checkout timeout"""
+
+
+class TimedCursor:
+    """Cursor wrapper recording execute and fetch time under the db_query stage"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def execute(self, *args, **kwargs):
+        with timer("db_query"):
+            return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        with timer("db_query"):
+            return self._cursor.executemany(*args, **kwargs)
+
+    def fetchone(self):
+        with timer("db_query"):
+            return self._cursor.fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        with timer("db_query"):
+            return self._cursor.fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        with timer("db_query"):
+            return self._cursor.fetchall()
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a MySQL connection borrowed from the pool.
+    Calling close() hands the connection back to the pool instead of
+    tearing down the TCP session, so existing `connection.close()` calls
+    in the models keep working unchanged.
+    """
+
+    def __init__(self, pool, conn, created_at):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        self._pool.release(conn, self._created_at)
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe MySQL connection pool.
+
+    - At most `size` connections exist at any time; callers block for up
+      to `timeout` seconds waiting for one to be returned.
+    - Idle connections are pinged on checkout when they have not been used
+      for `ping_interval` seconds, and are reconnected if the ping fails.
+    - Connections older than `recycle` seconds are replaced so the server's
+      wait_timeout never bites us mid-request.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 connect_timeout=DB_CONNECT_TIMEOUT, recycle=DB_POOL_RECYCLE,
+                 ping_interval=DB_POOL_PING_INTERVAL, **connect_args):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self.connect_args = {
+            "host": dbconfig["host"],
+            "port": dbconfig["port"],
+            "user": dbconfig["user"],
+            "password": dbconfig["password"],
+            "database": dbconfig["database"],
+            "autocommit": True,
+            "connect_timeout": connect_timeout,
+            **connect_args,
+        }
+
+        # LIFO keeps the hottest connections in use and lets cold ones age out
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self.connect_args)
+        with self._lock:
+            self._created += 1
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _checkout_idle(self):
+        """Pop an idle connection that passes its health check, or None"""
+        now = time.monotonic()
+        while True:
+            try:
+                conn, created_at, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return None, None
+
+            if self.recycle and now - created_at > self.recycle:
+                self._discard(conn)
+                continue
+
+            if now - last_used > self.ping_interval:
+                try:
+                    conn.ping(reconnect=True, attempts=1, delay=0)
+                except mysql.connector.Error as err:
+                    logger.warning(f"Dropping stale pooled connection: {err}")
+                    self._discard(conn)
+                    continue
+
+            return conn, created_at
+
+    def acquire(self):
+        """Borrow a connection, waiting up to `timeout` seconds for a free slot"""
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(
+                f"No database connection available within {self.timeout}s "
+                f"(pool size {self.size})"
+            )
+        waited = time.monotonic() - start
+
+        try:
+            conn, created_at = self._checkout_idle()
+            if conn is None:
+                conn, created_at = self._connect(), time.monotonic()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            if waited > self._wait_max:
+                self._wait_max = waited
+
+        return PooledConnection(self, conn, created_at)
+
+    def release(self, conn, created_at):
+        """Return a connection to the pool; broken connections are dropped"""
+        try:
+            healthy = conn.is_connected()
+            if healthy and conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            healthy = False
+
+        if healthy:
+            self._idle.put((conn, created_at, time.monotonic()))
+        else:
+            self._discard(conn)
+
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def close_all(self):
+        """Close every idle connection (used on shutdown and in tests)"""
+        while True:
+            try:
+                conn, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        """Snapshot of pool utilization and wait-time metrics"""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "utilization": round(self._in_use / self.size, 4),
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_avg": round(self._wait_total / checkouts, 6) if checkouts else 0.0,
+                "wait_seconds_max": round(self._wait_max, 6),
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool, created on first use (and again in a forked child)"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                # Sockets inherited from a parent process must never be reused
+                _pool = ConnectionPool()
+                _pool_pid = os.getpid()
+                logger.info(f"Database pool initialized (size={_pool.size})")
+    return _pool
+
+
+def existing_pool():
+    """This process's pool if it has been created (metrics must not open one)"""
+    return _pool if _pool_pid == os.getpid() else None
+
+
+def get_connection():
+    """
+    Borrow a pooled connection. Use it as a context manager or call
+    close() to give it back.
+    """
+    return get_pool().acquire()
+
+
+def pool_stats():
+    return get_pool().stats()
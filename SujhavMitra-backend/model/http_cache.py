@@ -0,0 +1,65 @@
+import hashlib
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from configs.config import HTTP_CACHE_MAX_AGE, HTTP_CACHE_STALE_WHILE_REVALIDATE
+
+_PUBLIC = f"public, max-age={HTTP_CACHE_MAX_AGE}, stale-while-revalidate={HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+
+# Cache-Control per blueprint. Book and movie responses depend only on the
+# model artifacts and the URL, so browsers and a CDN may keep them (only
+# those carrying an ETag, see conditional()); everything else is per user.
+CACHE_POLICIES = {
+    "book": _PUBLIC,
+    "movie": _PUBLIC,
+    "rating": "private, no-store",
+    "wishlist": "private, no-store",
+    "user": "private, no-store",
+    "admin": "no-store",
+}
+
+
+def request_etag(model):
+    """Weak ETag for the current URL as served by `model`'s artifacts"""
+    digest = hashlib.sha256(model.fingerprint.encode("utf-8"))
+    digest.update(request.path.encode("utf-8"))
+    for name, value in sorted(request.args.items(multi=True)):
+        digest.update(f"\0{name}={value}".encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def conditional(get_model):
+    """
+    Give a model-backed GET view an ETag and answer If-None-Match with 304
+    before the view runs, so a revalidation costs neither the computation
+    nor the serialization. The ETag changes whenever the artifacts do.
+    Weak, because the same body may be sent compressed or not.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = request_etag(get_model())
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def apply_cache_policy(response):
+    """after_request: the blueprint's Cache-Control, unless the view set its own"""
+    policy = CACHE_POLICIES.get(request.blueprint)
+    if policy is None or "Cache-Control" in response.headers:
+        return response
+    # Public caching only for validated (ETag-carrying) responses, never for errors
+    if policy.startswith("public") and response.get_etag()[0] is None:
+        return response
+    response.headers["Cache-Control"] = policy
+    return response
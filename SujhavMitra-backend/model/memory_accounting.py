@@ -0,0 +1,343 @@
+"""
+Where this worker's memory goes, broken down by model artifact and cache.
+
+- ndarrays: `nbytes`, and whether the buffer is memory-mapped from an .npy
+  file (page cache, shared by every process mapping it) or on the heap;
+- sparse matrices: data + indices + indptr storage;
+- DataFrames and Index labels: pandas deep memory usage, per column;
+- dicts, lists and sets built at load time (lookup tables, prebuilt
+  response records): an estimate that walks the containers and counts
+  each object once per artifact;
+- caches: the byte estimates the caches keep themselves.
+
+Artifacts are immutable once a model is built, so the breakdown is
+computed once per model instance and reused by /admin/memory, /metrics and
+the startup log line. The process totals (RSS, PSS, USS) come from
+/proc/self/smaps_rollup where available.
+
+Allocation growth is measured with tracemalloc snapshots taken through
+/admin/memory/tracemalloc/*. Tracing slows allocation-heavy code down
+noticeably, so it only runs between start and stop.
+"""
+import logging
+import mmap
+import os
+import sys
+import threading
+import tracemalloc
+import weakref
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from configs.config import TRACEMALLOC_FRAMES, TRACEMALLOC_MAX_SNAPSHOTS
+
+logger = logging.getLogger(__name__)
+
+# Artifact attributes of each model component (attribute -> reported name)
+MODEL_ARTIFACTS = {
+    "book_model": {
+        "books": "books",
+        "popbooks": "popular_books",
+        "similarity": "similarity_scores",
+        "book_titles": "book_titles",
+        "book_index_titles": "book_index_titles",
+        "title_positions": "title_positions",
+        "isbn_positions": "isbn_positions",
+        "title_records": "title_records",
+        "popular_records": "popular_records",
+    },
+    "movie_model": {
+        "movies": "movies",
+        "similarity": "similarity_movies",
+        "vectors": "tfidf_vectors",
+        "feature_names": "tfidf_features",
+        "movie_homepage_link": "movie_homepage_link",
+        "cast_lookup": "cast_lookup",
+        "crew_lookup": "crew_lookup",
+        "movie_titles": "movie_titles",
+        "movie_positions": "movie_positions",
+        "records": "records",
+    },
+}
+
+_SPARSE_BUFFERS = ("data", "indices", "indptr", "row", "col", "offsets")
+
+# Model instance -> its artifact breakdown
+_breakdowns = weakref.WeakKeyDictionary()
+_breakdowns_lock = threading.Lock()
+
+
+def _is_mmap(array):
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def deep_sizeof(obj):
+    """Estimated bytes held by a container and everything it references (each object counted once)"""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        # ndarrays report their own buffer (when they own it) in getsizeof
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+def describe(value):
+    """Size and storage of one artifact"""
+    if isinstance(value, np.ndarray):
+        return {
+            "kind": "ndarray",
+            "bytes": int(value.nbytes),
+            "storage": "mmap" if _is_mmap(value) else "heap",
+            "shape": list(value.shape),
+            "dtype": str(value.dtype),
+        }
+    if hasattr(value, "tocsr") and hasattr(value, "nnz"):
+        buffers = [getattr(value, b) for b in _SPARSE_BUFFERS if isinstance(getattr(value, b, None), np.ndarray)]
+        return {
+            "kind": f"sparse ({value.format})",
+            "bytes": int(sum(b.nbytes for b in buffers)),
+            "storage": "mmap" if buffers and all(_is_mmap(b) for b in buffers) else "heap",
+            "shape": list(value.shape),
+            "dtype": str(value.dtype),
+            "nnz": int(value.nnz),
+        }
+    if isinstance(value, pd.DataFrame):
+        usage = value.memory_usage(deep=True)
+        return {
+            "kind": "DataFrame",
+            "bytes": int(usage.sum()),
+            "storage": "heap",
+            "shape": list(value.shape),
+            "columns": {str(column): int(size) for column, size in usage.items()},
+        }
+    if isinstance(value, pd.Index):
+        return {
+            "kind": type(value).__name__,
+            "bytes": int(value.memory_usage(deep=True)),
+            "storage": "heap",
+            "shape": [len(value)],
+        }
+    report = {"kind": type(value).__name__, "bytes": deep_sizeof(value), "storage": "heap", "estimated": True}
+    if hasattr(value, "__len__"):
+        report["shape"] = [len(value)]
+    return report
+
+
+def model_breakdown(name, instance):
+    """Artifact sizes of a built model, computed once per instance"""
+    with _breakdowns_lock:
+        cached = _breakdowns.get(instance)
+    if cached is not None:
+        return cached
+
+    artifacts = {}
+    for attribute, label in MODEL_ARTIFACTS[name].items():
+        value = getattr(instance, attribute, None)
+        if value is not None:
+            artifacts[label] = describe(value)
+    breakdown = {
+        "version": getattr(instance, "version", None),
+        "heap_bytes": sum(a["bytes"] for a in artifacts.values() if a["storage"] == "heap"),
+        "mmap_bytes": sum(a["bytes"] for a in artifacts.values() if a["storage"] == "mmap"),
+        "artifacts": artifacts,
+    }
+    with _breakdowns_lock:
+        _breakdowns[instance] = breakdown
+    return breakdown
+
+
+def cache_sizes():
+    """Entries and estimated bytes of the in-process caches"""
+    from model import registry
+    from model.auth_model import token_cache
+    from model.response_cache import get_response_cache
+
+    response = get_response_cache().stats()
+    caches = {
+        "response": {"entries": response["entries"], "bytes": response["bytes"], "max_bytes": response["max_bytes"]},
+        "token": {"entries": token_cache.stats()["size"]},
+    }
+    wishlist = registry.loaded_instance("wishlist_model")
+    if wishlist is not None:
+        stats = wishlist.cache.stats()
+        caches["wishlist"] = {"entries": stats["users"], "bytes": stats["bytes"], "max_bytes": stats["max_bytes"]}
+    return caches
+
+
+def process_memory():
+    """RSS/PSS/USS of this process in KiB (Linux), or None"""
+    counters = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:", "Shared_Clean:", "Shared_Dirty:"):
+                    counters[parts[0].rstrip(":")] = int(parts[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return {
+        "rss_kb": counters.get("Rss", 0),
+        "pss_kb": counters.get("Pss", 0),
+        "uss_kb": counters.get("Private_Clean", 0) + counters.get("Private_Dirty", 0),
+        "shared_kb": counters.get("Shared_Clean", 0) + counters.get("Shared_Dirty", 0),
+    }
+
+
+def report():
+    """Memory breakdown of this worker: process totals, loaded model artifacts and caches"""
+    from model import registry
+
+    components = {}
+    for name in MODEL_ARTIFACTS:
+        instance = registry.loaded_instance(name)
+        if instance is not None:
+            components[name] = model_breakdown(name, instance)
+    caches = cache_sizes()
+    return {
+        "pid": os.getpid(),
+        "process": process_memory(),
+        "components": components,
+        "caches": caches,
+        "totals": {
+            "artifact_heap_bytes": sum(c["heap_bytes"] for c in components.values()),
+            "artifact_mmap_bytes": sum(c["mmap_bytes"] for c in components.values()),
+            "cache_bytes": sum(c.get("bytes", 0) for c in caches.values()),
+        },
+        "tracemalloc": get_tracemalloc_session().status(),
+    }
+
+
+def _mb(size):
+    return f"{size / 2 ** 20:.1f}MB"
+
+
+def log_report():
+    """One log line per loaded model with its largest artifacts (startup report)"""
+    try:
+        result = report()
+    except Exception as e:
+        logger.warning(f"Memory report failed: {e}")
+        return None
+    for name, component in result["components"].items():
+        largest = sorted(component["artifacts"].items(), key=lambda item: item[1]["bytes"], reverse=True)
+        parts = ", ".join(f"{label}={_mb(a['bytes'])}{' (mmap)' if a['storage'] == 'mmap' else ''}"
+                          for label, a in largest)
+        logger.info(f"{name} {component['version']}: heap {_mb(component['heap_bytes'])}, "
+                    f"mmap {_mb(component['mmap_bytes'])} [{parts}]")
+    if result["process"]:
+        process = result["process"]
+        logger.info(f"pid {result['pid']}: RSS {process['rss_kb'] / 1024:.1f}MB, USS {process['uss_kb'] / 1024:.1f}MB")
+    return result
+
+
+class TracemallocSession:
+    """Named tracemalloc snapshots of this process, diffed on demand"""
+
+    def __init__(self, max_snapshots=TRACEMALLOC_MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots = {}  # label -> (taken at, Snapshot), oldest first
+        self._lock = threading.Lock()
+        self._started_here = False
+
+    def start(self, frames=TRACEMALLOC_FRAMES):
+        if not 1 <= frames <= 100:
+            raise ValueError("frames must be between 1 and 100")
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._started_here = True
+            self._snapshots.clear()
+
+    def stop(self):
+        with self._lock:
+            self._snapshots.clear()
+            if self._started_here:
+                tracemalloc.stop()
+                self._started_here = False
+
+    def snapshot(self, label=None):
+        """Take a snapshot (tracing must be running). Returns its label."""
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not running; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        label = str(label or f"s{len(self._snapshots) + 1}")
+        with self._lock:
+            self._snapshots.pop(label, None)
+            self._snapshots[label] = (datetime.now().isoformat(timespec="seconds"), snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.pop(next(iter(self._snapshots)))
+        return label
+
+    def diff(self, before, after, top=20, group_by="lineno"):
+        """Allocation growth between two snapshots, largest first"""
+        if group_by not in ("lineno", "filename", "traceback"):
+            raise ValueError("group_by must be lineno, filename or traceback")
+        with self._lock:
+            try:
+                old, new = self._snapshots[before][1], self._snapshots[after][1]
+            except KeyError as e:
+                raise ValueError(f"Unknown snapshot {e.args[0]}; taken: {', '.join(self._snapshots) or 'none'}")
+        stats = new.compare_to(old, group_by)
+        return {
+            "from": before,
+            "to": after,
+            "size_diff_bytes": sum(s.size_diff for s in stats),
+            "count_diff": sum(s.count_diff for s in stats),
+            "top": [
+                {
+                    "location": [f"{frame.filename}:{frame.lineno}" for frame in s.traceback],
+                    "size_diff_bytes": s.size_diff,
+                    "size_bytes": s.size,
+                    "count_diff": s.count_diff,
+                    "count": s.count,
+                }
+                for s in stats[:top]
+            ],
+        }
+
+    def status(self):
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self._lock:
+            snapshots = [{"label": label, "taken_at": taken} for label, (taken, _) in self._snapshots.items()]
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "snapshots": snapshots,
+        }
+
+
+_tracemalloc_session = None
+_tracemalloc_lock = threading.Lock()
+
+
+def get_tracemalloc_session():
+    """Process-wide tracemalloc session"""
+    global _tracemalloc_session
+    if _tracemalloc_session is None:
+        with _tracemalloc_lock:
+            if _tracemalloc_session is None:
+                _tracemalloc_session = TracemallocSession()
+    return _tracemalloc_session
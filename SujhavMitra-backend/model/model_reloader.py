@@ -0,0 +1,163 @@
+"""
+Hot reload of versioned model artifacts.
+
+A reload builds new book and movie model instances from the requested
+artifact version on a background thread while the current ones keep
+serving, validates them, and only then swaps both into the registry. If
+anything fails the old version stays active and the error is reported by
+GET /admin/models. A version requested through the admin endpoint is
+written to models/CURRENT only after it has been swapped in here.
+
+Each worker process runs a ModelWatcher that polls models/CURRENT, so
+activating a version (admin endpoint or `python -m model.artifacts
+activate`) reaches every gunicorn worker. Models loaded this way are
+private to the worker; restart gunicorn to share a new version
+copy-on-write again.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+from configs.config import MODEL_WATCH_INTERVAL
+from model import registry
+from model.artifacts import ArtifactStore
+
+logger = logging.getLogger(__name__)
+
+
+class ModelReloader:
+    def __init__(self, store=None):
+        self.store = store or ArtifactStore()
+        self._lock = threading.Lock()  # one reload at a time
+        self.loading_version = None
+        self.last_error = None
+        self.last_reload_at = None
+        self.last_reload_seconds = None
+        self.reloads = 0
+        self.failures = 0
+
+    def is_reloading(self):
+        return self._lock.locked()
+
+    def reload(self, version=None, force=False, activate=False):
+        """
+        Load, validate and swap in `version` (default: the one named by
+        models/CURRENT). With `activate`, models/CURRENT is pointed at it
+        once the swap succeeded, so other workers and restarts follow.
+        Returns True if new models were swapped in.
+        """
+        with self._lock:
+            version = version or self.store.current_version()
+            if not force and set(registry.loaded_versions().values()) == {version}:
+                if activate:
+                    self._activate(version)
+                return False
+
+            self.loading_version = version
+            start = time.perf_counter()
+            try:
+                from model.book_recommend_model import BookRecommendModel
+                from model.movie_recommend_model import MovieRecommendModel
+
+                self.store.verify(version)
+                directory = self.store.path_for(version)
+                book_model = BookRecommendModel(directory, version)
+                movie_model = MovieRecommendModel(directory, version)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{version}: {e}"
+                logger.error(f"Model reload to {version} failed, keeping the current version: {e}")
+                return False
+            finally:
+                self.loading_version = None
+
+            registry.swap({"book_model": book_model, "movie_model": movie_model})
+            if activate:
+                self._activate(version)
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload_at = datetime.now().isoformat()
+            self.last_reload_seconds = round(time.perf_counter() - start, 3)
+            logger.info(f"Swapped in model version {version} ({self.last_reload_seconds}s)")
+            return True
+
+    def _activate(self, version):
+        if self.store.current_version() == version:
+            return
+        try:
+            self.store.activate(version)
+        except Exception as e:
+            self.last_error = f"{version}: loaded in this worker but not activated: {e}"
+            logger.error(f"Could not activate model version {version}: {e}")
+
+    def reload_async(self, version=None, force=False, activate=False):
+        """Start a reload on a background thread. Returns False if one is already running."""
+        if self.is_reloading():
+            return False
+        threading.Thread(target=self.reload, args=(version, force, activate), name="model-reload",
+                         daemon=True).start()
+        return True
+
+    def stats(self):
+        return {
+            "loaded": registry.loaded_versions(),
+            "current": self.store.current_version(),
+            "loading": self.loading_version,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_reload_at": self.last_reload_at,
+            "last_reload_seconds": self.last_reload_seconds,
+        }
+
+
+class ModelWatcher:
+    """Polls models/CURRENT every `interval` seconds and reloads when it names a new version"""
+
+    def __init__(self, reloader, interval=MODEL_WATCH_INTERVAL):
+        self.reloader = reloader
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._failed_version = None
+
+    def check(self):
+        loaded = registry.loaded_versions()
+        if None in loaded.values():
+            return  # still warming up; warm-up loads CURRENT itself
+        version = self.reloader.store.current_version()
+        if set(loaded.values()) == {version} or version == self._failed_version:
+            return
+        if not self.reloader.reload(version):
+            # Do not retry a broken version every poll; wait for CURRENT to change
+            self._failed_version = version
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model watcher check failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_reloader = None
+_reloader_lock = threading.Lock()
+
+
+def get_model_reloader():
+    global _reloader
+    if _reloader is None:
+        with _reloader_lock:
+            if _reloader is None:
+                _reloader = ModelReloader()
+    return _reloader
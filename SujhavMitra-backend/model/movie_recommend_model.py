@@ -1,25 +1,27 @@
-import pickle
 from flask import make_response
 import numpy as np
 import ast
 import pandas as pd
+from model.artifacts import ArtifactError, UNVERSIONED, MOVIE_ARTIFACTS, artifact_fingerprint
+from model.artifact_io import load_table, load_array, load_labels
+from model.shared_layout import freeze_array, categorize
+from model.projection import project, wants
+from model.metrics import timer
 
 
 class MovieRecommendModel:
-    def __init__(self):
+    def __init__(self, artifact_dir="models", version=UNVERSIONED):
+        self.version = version
+        self.fingerprint = artifact_fingerprint(artifact_dir, version, MOVIE_ARTIFACTS)
+
         # Load data
-        with open("models/movie_list.pkl", "rb") as f:
-            self.movies = pickle.load(f)
-        with open("models/movie_homepage_link.pkl", "rb") as f:
-            homepage_df = pickle.load(f)
-        with open("models/similarity_movies.pkl", "rb") as f:
-            self.similarity = pickle.load(f)
+        self.movies = load_table(artifact_dir, "movies")
+        homepage_df = load_table(artifact_dir, "movie_links")
+        self.similarity = load_array(artifact_dir, "similarity_movies")
         
-        # Load TF-IDF vectorizer and vectors
-        with open("models/tfidf_vectorizer.pkl", "rb") as f:
-            self.vectorizer = pickle.load(f)
-        with open("models/tfidf_vectors.pkl", "rb") as f:
-            self.vectors = pickle.load(f)
+        # TF-IDF vocabulary and vectors
+        self.feature_names = load_labels(artifact_dir, "tfidf_features")
+        self.vectors = load_array(artifact_dir, "tfidf_vectors")
 
         homepage_df["movie_id"] = homepage_df["movie_id"].astype(int)
         self.movies["movie_id"] = self.movies["movie_id"].astype(int)
@@ -31,9 +33,36 @@ class MovieRecommendModel:
         # Preprocess and cache normalized titles
         self.movies["normalized_title"] = self.movies["title"].str.lower().str.strip()
         self.movie_titles = set(self.movies["normalized_title"])
-        
-        # Get feature names from vectorizer
-        self.feature_names = self.vectorizer.get_feature_names_out()
+
+        # Laid out so forked workers keep sharing these pages (see model/shared_layout.py)
+        self.similarity = freeze_array(self.similarity)
+        self.vectors = freeze_array(self.vectors)
+        categorize(self.movies, ["normalized_title"])
+
+        # movie_id -> row position, for O(1) lookups by ID
+        self.movie_positions = {movie_id: pos for pos, movie_id in reversed(list(enumerate(self.movies["movie_id"])))}
+        self.validate()
+
+        # Prebuilt response record per movie row (genres parsed once), copied/projected per request
+        self.records = [self.format_movie_row(row) for row in self.movies.to_dict("records")]
+
+    def validate(self):
+        """Reject artifact sets whose shapes do not line up with the movie list"""
+        n = len(self.movies)
+        if getattr(self.similarity, "shape", None) != (n, n):
+            raise ArtifactError(
+                f"similarity_movies shape {getattr(self.similarity, 'shape', None)} "
+                f"does not match the {n} movies in movie_list"
+            )
+        if self.vectors.shape[0] != n:
+            raise ArtifactError(f"tfidf_vectors has {self.vectors.shape[0]} rows for {n} movies")
+        if self.vectors.shape[1] != len(self.feature_names):
+            raise ArtifactError(
+                f"tfidf_vectors has {self.vectors.shape[1]} columns but the vectorizer "
+                f"has {len(self.feature_names)} features"
+            )
+        if not np.isfinite(self.similarity).all():
+            raise ArtifactError("similarity_movies contains NaN or infinite values")
 
     def safe_parse_list(self, val):
         """Safely parse a string representation of a Python list into a real list."""
@@ -54,7 +83,7 @@ class MovieRecommendModel:
         
         # Get non-zero TF-IDF scores
         non_zero_indices = np.where(movie_vector > 0)[0]
-        tfidf_scores = [(self.feature_names[i], float(movie_vector[i])) 
+        tfidf_scores = [(self.feature_names[i], movie_vector[i])
                        for i in non_zero_indices]
         tfidf_scores_sorted = sorted(tfidf_scores, key=lambda x: x[1], reverse=True)
         
@@ -74,8 +103,8 @@ class MovieRecommendModel:
         common_features = []
         for idx in common_indices:
             feature = self.feature_names[idx]
-            score1 = float(vector1[idx])
-            score2 = float(vector2[idx])
+            score1 = vector1[idx]
+            score2 = vector2[idx]
             # Combined score (product shows contribution to similarity)
             combined = score1 * score2
             common_features.append({
@@ -123,22 +152,20 @@ class MovieRecommendModel:
                 break
 
         # Add popularity and vote_average
-        movie["popularity"] = float(row["popularity"]) if "popularity" in row and not np.isnan(row["popularity"]) else None
-        movie["vote_average"] = float(row["vote_average"]) if "vote_average" in row and not np.isnan(row["vote_average"]) else None
+        movie["popularity"] = row["popularity"] if "popularity" in row and not np.isnan(row["popularity"]) else None
+        movie["vote_average"] = row["vote_average"] if "vote_average" in row and not np.isnan(row["vote_average"]) else None
 
         return movie
 
-    def get_all_movie_titles(self):
+    def get_all_movie_titles(self, fields=None):
         """Get the first 15 unique movies"""
-        unique_titles = self.movies.drop_duplicates("title")[:15]
+        positions = np.flatnonzero(~self.movies["title"].duplicated())[:15]
 
-        movie_titles_info = []
-        for _, row in unique_titles.iterrows():
-            movie_titles_info.append(self.format_movie_row(row))
+        movie_titles_info = [project(self.records[pos], fields) for pos in positions]
 
         return make_response({"popular_movie": movie_titles_info}, 200)
 
-    def get_popular_movies(self):
+    def get_popular_movies(self, fields=None):
         """Get top 10 popular movies based on 'popularity' or 'vote_average'"""
         if (
             "popularity" in self.movies.columns
@@ -159,13 +186,12 @@ class MovieRecommendModel:
                 {"error": "No popularity or vote data available."}, 400
             )
 
-        popular_movie_titles_info = []
-        for _, row in sorted_df.iterrows():
-            popular_movie_titles_info.append(self.format_movie_row(row))
+        positions = self.movies.index.get_indexer(sorted_df.index)
+        popular_movie_titles_info = [project(self.records[pos], fields) for pos in positions]
 
         return make_response({"popular_movie": popular_movie_titles_info}, 200)
 
-    def movie_recommend_model(self, title, include_tfidf=False, top_features=10):
+    def movie_recommend_model(self, title, include_tfidf=False, top_features=10, fields=None):
         """
         Recommend similar movies based on similarity index.
         
@@ -173,41 +199,48 @@ class MovieRecommendModel:
             title: Movie title to find recommendations for
             include_tfidf: If True, include TF-IDF analysis in response
             top_features: Number of top TF-IDF features to include
+            fields: Keys to return per recommendation (None = all)
         """
         normalized_title = title.lower().strip()
 
-        if normalized_title not in self.movie_titles:
-            return make_response({"error": "Movie not found"}, 404)
+        with timer("title_resolution"):
+            if normalized_title not in self.movie_titles:
+                return make_response({"error": "Movie not found"}, 404)
 
-        # Get index of the matched movie
-        index = self.movies[self.movies["normalized_title"] == normalized_title].index[0]
-        distances = self.similarity[index]
+            # Get index of the matched movie
+            index = self.movies[self.movies["normalized_title"] == normalized_title].index[0]
 
-        # Get top 10 similar movies (excluding itself)
-        top_indices = np.argsort(-distances)[1:11]
+        with timer("similarity_topk"):
+            distances = self.similarity[index]
+
+            # Get top 10 similar movies (excluding itself)
+            top_indices = np.argsort(-distances)[1:11]
 
         recommendations = []
-        for i in top_indices:
-            row = self.movies.iloc[i]
-            movie_data = self.format_movie_row(row)
-
-            # Calculate similarity percentage
-            similarity_percent = round(float(distances[i]) * 100, 2)
-            movie_data["similarity"] = f"{similarity_percent}%"
-            
-            # Add TF-IDF analysis if requested
-            if include_tfidf:
-                # Get common features between query movie and this recommendation
-                common_features = self.get_common_features(index, i, top_n=top_features)
-                movie_data["common_features"] = common_features
-
-            recommendations.append(movie_data)
+        with timer("hydration"):
+            for i in top_indices:
+                movie_data = project(self.records[i], fields)
+
+                # Calculate similarity percentage
+                if wants(fields, "similarity"):
+                    similarity_percent = round(float(distances[i]) * 100, 2)
+                    movie_data["similarity"] = f"{similarity_percent}%"
+
+                recommendations.append(movie_data)
+
+        # Add TF-IDF analysis if requested
+        if include_tfidf and wants(fields, "common_features"):
+            with timer("tfidf_features"):
+                # Get common features between query movie and each recommendation
+                for i, movie_data in zip(top_indices, recommendations):
+                    movie_data["common_features"] = self.get_common_features(index, i, top_n=top_features)
 
         response_data = {"recommendations": recommendations}
         
         # Add TF-IDF scores for the query movie if requested
         if include_tfidf:
-            query_tfidf = self.get_tfidf_scores(index, top_n=top_features)
+            with timer("tfidf_features"):
+                query_tfidf = self.get_tfidf_scores(index, top_n=top_features)
             response_data["query_movie_tfidf"] = [
                 {"feature": feat, "score": round(score, 4)} 
                 for feat, score in query_tfidf
@@ -216,43 +249,56 @@ class MovieRecommendModel:
 
         return make_response(response_data, 200)
 
-    def get_movie_tfidf_analysis(self, title, top_n=20):
+    def get_movie_tfidf_analysis(self, title, top_n=20, fields=None):
         """
         Get detailed TF-IDF analysis for a specific movie.
         
         Args:
             title: Movie title
             top_n: Number of top features to return
+            fields: Keys to return for the movie (None = all)
         """
         normalized_title = title.lower().strip()
 
-        if normalized_title not in self.movie_titles:
-            return make_response({"error": "Movie not found"}, 404)
+        with timer("title_resolution"):
+            if normalized_title not in self.movie_titles:
+                return make_response({"error": "Movie not found"}, 404)
 
-        index = self.movies[self.movies["normalized_title"] == normalized_title].index[0]
-        row = self.movies.iloc[index]
+            index = self.movies[self.movies["normalized_title"] == normalized_title].index[0]
         
         # Get TF-IDF scores
-        tfidf_scores = self.get_tfidf_scores(index, top_n=top_n)
+        with timer("tfidf_features"):
+            tfidf_scores = self.get_tfidf_scores(index, top_n=top_n)
         
         response = {
-            "movie": self.format_movie_row(row),
+            "movie": project(self.records[index], fields),
             "tfidf_features": [
                 {"feature": feat, "score": round(score, 4)} 
                 for feat, score in tfidf_scores
             ],
-            "total_features": int(np.sum(self.vectors[index] > 0))
+            "total_features": np.count_nonzero(self.vectors[index] > 0)
         }
         
         return make_response(response, 200)
 
-    def get_movie_by_id(self, movie_id: int):
+    def get_movies_by_ids(self, movie_ids):
+        """Batched catalog lookup: {movie_id: movie dict} for the IDs that exist"""
+        found = {}
+        for movie_id in movie_ids:
+            try:
+                pos = self.movie_positions.get(int(movie_id))
+            except (TypeError, ValueError):
+                continue
+            if pos is not None:
+                found[movie_id] = project(self.records[pos])
+        return found
+
+    def get_movie_by_id(self, movie_id: int, fields=None):
         """Get single movie by ID"""
         try:
-            matched = self.movies[self.movies["movie_id"].astype(int) == int(movie_id)]
-            if matched.empty:
+            pos = self.movie_positions.get(int(movie_id))
+            if pos is None:
                 return make_response({"error": "Movie not found"}, 404)
-            row = matched.iloc[0]
-            return make_response(self.format_movie_row(row), 200)
+            return make_response(project(self.records[pos], fields), 200)
         except Exception:
             return make_response({"error": "Failed to fetch movie"}, 500)
\ No newline at end of file
@@ -0,0 +1,193 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+from configs.config import (
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordServiceBusy(Exception):
+    """Raised when too many hash/verify jobs are already queued (load shedding)"""
+
+
+# Module-level so they can be pickled into the worker processes
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify_password(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+class PasswordService:
+    """
+    Runs bcrypt in a bounded process pool so a login/signup burst cannot
+    tie up every Flask worker thread for the bcrypt cost time.
+
+    At most `max_pending` jobs may be queued or running; beyond that calls
+    fail fast with PasswordServiceBusy instead of piling up. A job that
+    timed out keeps its slot until it leaves the pool. If a hashing process
+    dies, the broken pool is replaced and the call retried once. With
+    `workers=0` bcrypt runs inline on the calling thread (local development).
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING,
+                 timeout=PASSWORD_HASH_TIMEOUT, rounds=BCRYPT_ROUNDS):
+        self.workers = workers
+        self.timeout = timeout
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.restarts = 0
+        self.rehashed = 0
+
+    def _get_executor(self):
+        # One pool per process: a forked app worker must not reuse its parent's pool
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _replace_broken_executor(self, broken):
+        """A dead hashing process breaks the whole pool; start a new one (once per breakage)"""
+        with self._lock:
+            if self._executor is broken:
+                logger.error("Password hashing pool is broken, starting a new one")
+                self._executor = None
+                self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def _run_in_pool(self, fn, args):
+        """Run with a slot held; the slot is released once the job has left the pool"""
+        handed_off = False
+        try:
+            for _ in range(2):
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(fn, *args)
+                    return future.result(timeout=self.timeout)
+                except BrokenProcessPool:
+                    # A dead hashing process breaks the whole pool: start a new one and retry once
+                    self._replace_broken_executor(executor)
+                except FutureTimeout:
+                    # Drops the job if it has not started; a running one keeps the slot until it ends
+                    future.cancel()
+                    future.add_done_callback(self._release)
+                    handed_off = True
+                    with self._lock:
+                        self.timed_out += 1
+                    raise PasswordServiceBusy("Password hashing timed out")
+            raise PasswordServiceBusy("Password hashing pool is unavailable")
+        finally:
+            if not handed_off:
+                self._release()
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordServiceBusy("Password hashing queue is full")
+        with self._lock:
+            self.pending += 1
+
+        if not self.workers:
+            try:
+                result = fn(*args)
+            finally:
+                self._release()
+        else:
+            result = self._run_in_pool(fn, args)
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def hash(self, password):
+        """bcrypt hash (as str) using the configured cost"""
+        return self._submit(_hash_password, password, self.rounds)
+
+    def verify(self, password, hashed):
+        # Accept hashed as str or bytes
+        if isinstance(hashed, bytes):
+            hashed = hashed.decode('utf-8')
+        return self._submit(_verify_password, password, hashed)
+
+    def needs_rehash(self, hashed):
+        """True if the stored hash was made with a different cost than BCRYPT_ROUNDS"""
+        if isinstance(hashed, bytes):
+            hashed = hashed.decode('utf-8')
+        try:
+            # Format: $2b$<cost>$<salt+hash>
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def rehash_async(self, password, on_done):
+        """
+        Hash `password` with the current cost in the background and pass the
+        new hash to `on_done`. Best effort: skipped when the pool is busy.
+        """
+        def run():
+            try:
+                new_hash = self.hash(password)
+                on_done(new_hash)
+                with self._lock:
+                    self.rehashed += 1
+            except PasswordServiceBusy:
+                logger.info("Skipping password rehash, hashing pool is busy")
+            except Exception as e:
+                logger.error(f"Password rehash failed: {e}")
+
+        threading.Thread(target=run, name="password-rehash", daemon=True).start()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "pool_restarts": self.restarts,
+            "rehashed": self.rehashed,
+        }
+
+
+_password_service = None
+_password_lock = threading.Lock()
+
+
+def get_password_service():
+    """Process-wide password hashing service"""
+    global _password_service
+    if _password_service is None:
+        with _password_lock:
+            if _password_service is None:
+                _password_service = PasswordService()
+    return _password_service
@@ -0,0 +1,238 @@
+"""
+On-demand sampling profiler for live workers.
+
+While a profiling session is active, a fraction of requests (`rate`), and
+any request sent with `X-Profile: 1` and an admin token, are marked for
+profiling. A
+background thread samples the Python stack of the threads serving those
+requests every `interval_ms` via sys._current_frames(). Unprofiled
+requests pay only a dict lookup, and nothing runs outside a session.
+
+Samples are aggregated per worker into flamegraph-compatible collapsed
+stacks (`route;outer;...;inner count`, one line per distinct stack) in
+PROFILE_DIR/profile-<session>-<pid>.collapsed, rewritten every few
+seconds and when the session ends:
+
+    flamegraph.pl profile-*.collapsed > flame.svg    # or load into speedscope
+
+Sessions are started and stopped through /admin/profile/*. The settings
+are written to PROFILE_DIR/control.json, which every worker checks at
+most once per PROFILE_SYNC_SECONDS, so all gunicorn workers join the
+same session.
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import request
+
+from configs.config import PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_MAX_SECONDS
+from model.auth_model import request_is_admin
+
+logger = logging.getLogger(__name__)
+
+CONTROL_FILE = "control.json"
+PROFILE_SYNC_SECONDS = 2
+FLUSH_SECONDS = 10
+
+
+def _frame_label(code):
+    # One node per function (not per line) keeps flamegraphs readable
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    def __init__(self, directory=PROFILE_DIR):
+        self.directory = directory
+        self.session = None
+        self.rate = 0.0
+        self.interval = PROFILE_INTERVAL_MS / 1000
+        self.until = 0.0  # wall-clock end of the session
+        self._threads = {}  # thread ident -> route, while it serves a profiled request
+        self._stacks = Counter()
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._control_mtime = None
+        self._next_sync = 0.0
+        self.samples = 0
+        self.profiled_requests = 0
+
+    @property
+    def active(self):
+        return self.session is not None and time.time() < self.until
+
+    # -- control -------------------------------------------------------------
+
+    def _control_path(self):
+        return os.path.join(self.directory, CONTROL_FILE)
+
+    def _write_control(self, control):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self._control_path()}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(control, f)
+        os.replace(tmp, self._control_path())
+
+    def start(self, rate, duration, interval_ms=PROFILE_INTERVAL_MS):
+        """Start a session for every worker. Returns its settings."""
+        if not 0 <= rate <= 1:
+            raise ValueError("rate must be between 0 and 1")
+        if not 0 < duration <= PROFILE_MAX_SECONDS:
+            raise ValueError(f"duration must be between 0 and {PROFILE_MAX_SECONDS} seconds")
+        if not 1 <= interval_ms <= 1000:
+            raise ValueError("interval_ms must be between 1 and 1000")
+        control = {
+            "session": datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3],
+            "rate": rate,
+            "interval_ms": interval_ms,
+            "until": time.time() + duration,
+        }
+        self._write_control(control)
+        self._apply(control)
+        return control
+
+    def stop(self):
+        """End the session in every worker (this one flushes immediately)"""
+        self._write_control({"session": None, "rate": 0, "interval_ms": PROFILE_INTERVAL_MS, "until": 0})
+        session = self.session
+        self._apply({"session": None})
+        return session
+
+    def _sync(self):
+        """Pick up sessions started or stopped through another worker"""
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        self._next_sync = now + PROFILE_SYNC_SECONDS
+        try:
+            mtime = os.stat(self._control_path()).st_mtime_ns
+            if mtime == self._control_mtime:
+                return
+            with open(self._control_path()) as f:
+                control = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._control_mtime = mtime
+        if control.get("session") != self.session:
+            self._apply(control)
+
+    def _apply(self, control):
+        with self._lock:
+            if self.session is not None:
+                self._flush_locked()
+            self.session = control.get("session")
+            self.rate = control.get("rate", 0.0)
+            self.interval = control.get("interval_ms", PROFILE_INTERVAL_MS) / 1000
+            self.until = control.get("until", 0.0)
+            self._stacks = Counter()
+            self.samples = 0
+            self.profiled_requests = 0
+            if self.active and (self._sampler is None or not self._sampler.is_alive()):
+                self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._sampler.start()
+        if self.session:
+            logger.info(f"Profiling session {self.session} (rate={self.rate}, interval={self.interval * 1000:.0f}ms)")
+
+    # -- per request ---------------------------------------------------------
+
+    def begin_request(self):
+        """before_request: mark this thread for sampling if the request is selected"""
+        self._sync()
+        if not self.active:
+            return
+        # Only admins may force profiling; anyone else could raise the overhead at will
+        forced = request.headers.get("X-Profile") == "1" and request_is_admin()
+        if forced or random.random() < self.rate:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            self._threads[threading.get_ident()] = f"{request.method} {route}".replace(";", ":")
+            self.profiled_requests += 1
+
+    def end_request(self, exc=None):
+        """teardown_request: stop sampling this thread"""
+        if self._threads:
+            self._threads.pop(threading.get_ident(), None)
+
+    # -- sampling ------------------------------------------------------------
+
+    def _sample(self):
+        frames = sys._current_frames()
+        for ident, route in list(self._threads.items()):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(route)
+            stack.reverse()
+            with self._lock:
+                self._stacks[";".join(stack)] += 1
+                self.samples += 1
+
+    def _run(self):
+        next_flush = time.monotonic() + FLUSH_SECONDS
+        while self.active:
+            time.sleep(self.interval)
+            self._sample()
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + FLUSH_SECONDS
+        self.flush()
+
+    def output_path(self, session=None):
+        return os.path.join(self.directory, f"profile-{session or self.session}-{os.getpid()}.collapsed")
+
+    def _flush_locked(self):
+        if not self._stacks:
+            return
+        path = self.output_path()
+        tmp = path + ".tmp"
+        os.makedirs(self.directory, exist_ok=True)
+        with open(tmp, "w") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp, path)
+
+    def flush(self):
+        """Write this worker's collapsed stacks for the current session"""
+        with self._lock:
+            if self.session is not None:
+                self._flush_locked()
+
+    def status(self):
+        files = []
+        if os.path.isdir(self.directory):
+            files = sorted(f for f in os.listdir(self.directory) if f.endswith(".collapsed"))
+        return {
+            "active": self.active,
+            "session": self.session,
+            "rate": self.rate,
+            "interval_ms": round(self.interval * 1000, 3),
+            "seconds_left": max(0, round(self.until - time.time(), 1)) if self.session else 0,
+            "profiled_requests": self.profiled_requests,
+            "samples": self.samples,
+            "distinct_stacks": len(self._stacks),
+            "directory": self.directory,
+            "files": files,
+        }
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    """Process-wide profiler"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = SamplingProfiler()
+    return _profiler
@@ -0,0 +1,40 @@
+"""
+`fields=` projection for the book and movie endpoints.
+
+The models keep one prebuilt response record per catalog row; a request
+copies only the keys it asks for (`?fields=id,title,image`), so list views
+skip serializing overviews, cast and crew.
+"""
+
+# Keys a book or movie record (or a recommendation built from one) may carry
+BOOK_FIELDS = ("title", "author", "isbn", "publishdate", "publisher", "imageurl",
+               "similarity_score", "num_rating", "avg_rating")
+MOVIE_FIELDS = ("id", "title", "overview", "genres", "cast", "crew", "homepage", "image",
+                "popularity", "vote_average", "similarity", "common_features")
+
+
+class InvalidFields(ValueError):
+    """The fields parameter names something the endpoint does not return"""
+
+
+def parse_fields(raw, allowed):
+    """Tuple of requested field names (duplicates dropped, order kept), or None for all fields"""
+    if raw is None or not raw.strip():
+        return None
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+
+def project(record, fields=None):
+    """Copy of a prebuilt record with only `fields` (all of them when None)"""
+    if fields is None:
+        return dict(record)
+    return {f: record[f] for f in fields if f in record}
+
+
+def wants(fields, name):
+    """Whether an optional, costly field has been requested"""
+    return fields is None or name in fields
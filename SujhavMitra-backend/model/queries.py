@@ -0,0 +1,36 @@
+"""
+SQL of the hot queries, shared by the models that run them and the EXPLAIN
+check in migrations/runner.py. Kept free of imports so the migration runner
+does not load the app to read them.
+"""
+
+USER_RATINGS_QUERY = """
+    SELECT id, isbn, book_title, rating, created_at, updated_at
+    FROM sm_user_ratings
+    WHERE user_id = %s
+    ORDER BY updated_at DESC
+"""
+
+WISHLIST_QUERY = """
+    SELECT id, item_type, item_id, title, data, added_at
+    FROM sm_wishlist
+    WHERE user_id = %s
+    ORDER BY added_at DESC
+"""
+
+USER_ACTIVITY_QUERY = """
+    SELECT id, user_id, action, timestamp
+    FROM sm_user_activity
+    WHERE user_id = %s
+    ORDER BY timestamp DESC
+    LIMIT %s
+"""
+
+RECENT_ACTIVITY_QUERY = """
+    SELECT user_id, activity_date, action_type, event_count
+    FROM sm_user_activity_daily
+    ORDER BY activity_date DESC
+    LIMIT %s
+"""
+
+LOGIN_QUERY = "SELECT id, role_id, email, name, phone, password FROM sm_users WHERE email = %s"
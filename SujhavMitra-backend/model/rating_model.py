@@ -1,37 +1,41 @@
 from flask import make_response, jsonify
 import mysql.connector
 from mysql.connector import Error
-import pickle
 import numpy as np
 from collections import defaultdict
+from model import db
+from model.registry import get_book_model
+from model.activity_logger import log_activity
+from model.metrics import timer
+from model.queries import USER_RATINGS_QUERY
 
 class RatingModel:
     def __init__(self):
-        # Load the collaborative filtering model components
-        with open("models/books.pkl", "rb") as f:
-            self.books = pickle.load(f)
-        with open("models/similarity_scores.pkl", "rb") as f:
-            self.similarity = pickle.load(f)
-        with open("models/book_user_matrix.pkl", "rb") as f:
-            self.book_user_matrix = pickle.load(f)
-        
-        # Normalize titles for lookup
-        self.book_index_titles = list(self.book_user_matrix.index.str.lower().str.strip())
+        # Make sure the book artifacts are loaded before this is reported ready
+        get_book_model()
+
+    @property
+    def book_model(self):
+        # Reuse the collaborative filtering artifacts already loaded by the
+        # book recommender (and follow it across hot reloads)
+        return get_book_model()
+
+    @property
+    def books(self):
+        return self.book_model.books
+
+    @property
+    def similarity(self):
+        return self.book_model.similarity
+
+    @property
+    def book_titles(self):
+        return self.book_model.book_titles
         
     def get_db_connection(self):
-        """Create database connection - creates new connection each time to avoid timeout issues"""
+        """Borrow a connection from the shared pool; close() returns it"""
         try:
-            from configs.config import dbconfig
-            connection = mysql.connector.connect(
-                host=dbconfig["host"],
-                database=dbconfig["database"],
-                user=dbconfig["user"],
-                password=dbconfig["password"],
-                port=dbconfig["port"],
-                autocommit=True,
-                connect_timeout= 10
-            )
-            return connection
+            return db.get_connection()
         except Error as e:
             print(f"Error connecting to database: {e}")
             return None
@@ -45,47 +49,43 @@ class RatingModel:
         try:
             cursor = connection.cursor(dictionary=True)
             
-            # Check if user exists
-            cursor.execute("SELECT id FROM sm_users WHERE id = %s", (user_id,))
-            if not cursor.fetchone():
+            # Check if user exists, and whether they already rated this book, in one round trip.
+            # The upsert's rowcount cannot tell: with CLIENT_FOUND_ROWS (mysql-connector's
+            # default) an update that changes nothing also reports 1, like an insert.
+            cursor.execute(
+                """SELECT u.id AS user_id, r.id AS rating_id
+                   FROM sm_users u
+                   LEFT JOIN sm_user_ratings r ON r.user_id = u.id AND r.isbn = %s
+                   WHERE u.id = %s""",
+                (isbn, user_id)
+            )
+            existing = cursor.fetchone()
+            if not existing:
                 return make_response({"error": "User not found"}, 404)
             
-            # Check if rating already exists
+            # Single-statement upsert on the (user_id, isbn) unique key.
+            # LAST_INSERT_ID(id) makes lastrowid return the existing row's id on update.
             cursor.execute(
-                "SELECT id FROM sm_user_ratings WHERE user_id = %s AND isbn = %s",
-                (user_id, isbn)
+                """INSERT INTO sm_user_ratings (user_id, isbn, book_title, rating) 
+                   VALUES (%s, %s, %s, %s)
+                   ON DUPLICATE KEY UPDATE
+                       id = LAST_INSERT_ID(id),
+                       rating = VALUES(rating),
+                       book_title = VALUES(book_title),
+                       updated_at = CURRENT_TIMESTAMP""",
+                (user_id, isbn, book_title, rating)
             )
-            existing_rating = cursor.fetchone()
-            
-            if existing_rating:
-                # Update existing rating
-                cursor.execute(
-                    """UPDATE sm_user_ratings 
-                       SET rating = %s, book_title = %s, updated_at = CURRENT_TIMESTAMP 
-                       WHERE id = %s""",
-                    (rating, book_title, existing_rating['id'])
-                )
-                message = "Rating updated successfully"
-                rating_id = existing_rating['id']
-            else:
-                # Insert new rating
-                cursor.execute(
-                    """INSERT INTO sm_user_ratings (user_id, isbn, book_title, rating) 
-                       VALUES (%s, %s, %s, %s)""",
-                    (user_id, isbn, book_title, rating)
-                )
-                rating_id = cursor.lastrowid
-                message = "Rating added successfully"
-                
-                # Log activity
-                cursor.execute(
-                    """INSERT INTO sm_user_activity (user_id, action) 
-                       VALUES (%s, %s)""",
-                    (user_id, f"Rated book '{book_title}' with {rating}/10")
-                )
+            rating_id = cursor.lastrowid
+            # A concurrent first rating of the same book may also count as created;
+            # the unique key still leaves a single row
+            created = existing['rating_id'] is None
+            message = "Rating added successfully" if created else "Rating updated successfully"
             
             connection.commit()
             
+            if created:
+                log_activity(user_id, f"Rated book '{book_title}' with {rating}/10")
+            
             return make_response({
                 "message": message,
                 "rating_id": rating_id,
@@ -111,26 +111,20 @@ class RatingModel:
         try:
             cursor = connection.cursor(dictionary=True)
             
-            cursor.execute(
-                """SELECT id, isbn, book_title, rating, created_at, updated_at
-                   FROM sm_user_ratings
-                   WHERE user_id = %s
-                   ORDER BY updated_at DESC""",
-                (user_id,)
-            )
+            cursor.execute(USER_RATINGS_QUERY, (user_id,))
             
             ratings = cursor.fetchall()
             
             # Enrich with book data from pickle file
             for rating in ratings:
-                isbn = rating['isbn']
-                book_info = self.books[self.books["ISBN"].astype(str).str.strip() == str(isbn).strip()]
+                pos = self.book_model.isbn_positions.get(str(rating['isbn']).strip())
                 
-                if not book_info.empty:
-                    rating['author'] = book_info["Book-Author"].values[0]
-                    rating['publisher'] = book_info["Publisher"].values[0]
-                    rating['publishdate'] = int(book_info["Year-Of-Publication"].values[0])
-                    rating['imageurl'] = book_info["Image-URL-L"].values[0]
+                if pos is not None:
+                    book_info = self.books.iloc[pos]
+                    rating['author'] = book_info["Book-Author"]
+                    rating['publisher'] = book_info["Publisher"]
+                    rating['publishdate'] = int(book_info["Year-Of-Publication"])
+                    rating['imageurl'] = book_info["Image-URL-L"]
                 else:
                     rating['author'] = None
                     rating['publisher'] = None
@@ -184,15 +178,10 @@ class RatingModel:
                 (new_rating, rating_id)
             )
             
-            # Log activity
-            cursor.execute(
-                """INSERT INTO sm_user_activity (user_id, action) 
-                   VALUES (%s, %s)""",
-                (rating['user_id'], f"Updated rating for '{rating['book_title']}' to {new_rating}/10")
-            )
-            
             connection.commit()
             
+            log_activity(rating['user_id'], f"Updated rating for '{rating['book_title']}' to {new_rating}/10")
+            
             return make_response({
                 "message": "Rating updated successfully",
                 "rating_id": rating_id,
@@ -229,15 +218,10 @@ class RatingModel:
             # Delete rating
             cursor.execute("DELETE FROM sm_user_ratings WHERE id = %s", (rating_id,))
             
-            # Log activity
-            cursor.execute(
-                """INSERT INTO sm_user_activity (user_id, action) 
-                   VALUES (%s, %s)""",
-                (rating['user_id'], f"Deleted rating for '{rating['book_title']}'")
-            )
-            
             connection.commit()
             
+            log_activity(rating['user_id'], f"Deleted rating for '{rating['book_title']}'")
+            
             return make_response({
                 "message": "Rating deleted successfully",
                 "rating_id": rating_id
@@ -279,46 +263,46 @@ class RatingModel:
             book_sources = defaultdict(list)  # Track which books contributed to each recommendation
             rated_books = set()
             
-            for rated_book in user_ratings:
-                title = rated_book['book_title']
-                user_rating = rated_book['rating']
-                rated_books.add(title.lower().strip())
-                
-                # Find this book in the model
-                norm_title = title.lower().strip()
-                if norm_title not in self.book_index_titles:
-                    continue
+            with timer("similarity_topk"):
+                for rated_book in user_ratings:
+                    title = rated_book['book_title']
+                    user_rating = rated_book['rating']
+                    rated_books.add(title.lower().strip())
                 
-                book_index = self.book_index_titles.index(norm_title)
+                    # Find this book in the model
+                    norm_title = title.lower().strip()
+                    book_index = self.book_model.title_positions.get(norm_title)
+                    if book_index is None:
+                        continue
                 
-                # Get similar books
-                distances = self.similarity[book_index]
-                similar_books = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:21]
+                    # Get similar books
+                    distances = self.similarity[book_index]
+                    similar_books = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:21]
                 
-                # Apply exponential weighting to emphasize high ratings and suppress low ones
-                # This makes 4/10 have much less influence than 7/10
-                normalized_rating = user_rating / 10.0
-                exponential_weight = normalized_rating ** 2  # Square it for exponential effect
-                # 4/10 → 0.4² = 0.16 (much weaker)
-                # 7/10 → 0.7² = 0.49
-                # 9/10 → 0.9² = 0.81
+                    # Apply exponential weighting to emphasize high ratings and suppress low ones
+                    # This makes 4/10 have much less influence than 7/10
+                    normalized_rating = user_rating / 10.0
+                    exponential_weight = normalized_rating ** 2  # Square it for exponential effect
+                    # 4/10 → 0.4² = 0.16 (much weaker)
+                    # 7/10 → 0.7² = 0.49
+                    # 9/10 → 0.9² = 0.81
                 
-                # Accumulate scores weighted by user's rating
-                for idx, similarity_score in similar_books:
-                    similar_title = self.book_user_matrix.index[idx]
-                    if similar_title.lower().strip() not in rated_books:
-                        # Use exponential weighting instead of linear
-                        weighted_score = similarity_score * exponential_weight
-                        recommendation_scores[similar_title] += weighted_score
-                        book_counts[similar_title] += 1
+                    # Accumulate scores weighted by user's rating
+                    for idx, similarity_score in similar_books:
+                        similar_title = self.book_titles[idx]
+                        if similar_title.lower().strip() not in rated_books:
+                            # Use exponential weighting instead of linear
+                            weighted_score = similarity_score * exponential_weight
+                            recommendation_scores[similar_title] += weighted_score
+                            book_counts[similar_title] += 1
                         
-                        # Track the source and similarity
-                        book_sources[similar_title].append({
-                            'source_book': title,
-                            'user_rating': user_rating,
-                            'similarity': similarity_score,
-                            'weighted_contribution': weighted_score
-                        })
+                            # Track the source and similarity
+                            book_sources[similar_title].append({
+                                'source_book': title,
+                                'user_rating': user_rating,
+                                'similarity': similarity_score,
+                                'weighted_contribution': weighted_score
+                            })
             
             # Calculate average scores and sort
             recommendations = []
@@ -330,39 +314,35 @@ class RatingModel:
             recommendations = recommendations[:limit]
             
             # Get full book information
-            result = []
-            for book_title, score, sources in recommendations:
-                book_info = self.books[self.books["Book-Title"] == book_title].drop_duplicates("Book-Title")
+            with timer("hydration"):
+                result = []
+                for book_title, score, sources in recommendations:
+                    book_info = self.books[self.books["Book-Title"] == book_title].drop_duplicates("Book-Title")
                 
-                if not book_info.empty:
-                    # Format the sources to show why this book was recommended
-                    similar_to = []
-                    for source in sorted(sources, key=lambda x: x['weighted_contribution'], reverse=True)[:3]:  # Top 3 sources
-                        similar_to.append({
-                            'book': source['source_book'],
-                            'your_rating': f"{source['user_rating']}/10",
-                            'similarity': f"{source['similarity'] * 100:.1f}%",
-                            'contribution': f"{source['weighted_contribution'] * 100:.1f}%"
-                        })
+                    if not book_info.empty:
+                        # Format the sources to show why this book was recommended
+                        similar_to = []
+                        for source in sorted(sources, key=lambda x: x['weighted_contribution'], reverse=True)[:3]:  # Top 3 sources
+                            similar_to.append({
+                                'book': source['source_book'],
+                                'your_rating': f"{source['user_rating']}/10",
+                                'similarity': f"{source['similarity'] * 100:.1f}%",
+                                'contribution': f"{source['weighted_contribution'] * 100:.1f}%"
+                            })
                     
-                    result.append({
-                        "title": book_info["Book-Title"].values[0],
-                        "author": book_info["Book-Author"].values[0],
-                        "isbn": book_info["ISBN"].values[0],
-                        "publishdate": book_info["Year-Of-Publication"].values[0],
-                        "publisher": book_info["Publisher"].values[0],
-                        "imageurl": book_info["Image-URL-L"].values[0],
-                        "recommendation_score": f"{score * 100:.2f}%",
-                        "similar_to": similar_to
-                    })
-            
-            # Log activity
-            cursor.execute(
-                """INSERT INTO sm_user_activity (user_id, action) 
-                   VALUES (%s, %s)""",
-                (user_id, "Viewed personalized recommendations")
-            )
-            connection.commit()
+                        result.append({
+                            "title": book_info["Book-Title"].values[0],
+                            "author": book_info["Book-Author"].values[0],
+                            "isbn": book_info["ISBN"].values[0],
+                            "publishdate": book_info["Year-Of-Publication"].values[0],
+                            "publisher": book_info["Publisher"].values[0],
+                            "imageurl": book_info["Image-URL-L"].values[0],
+                            "recommendation_score": f"{score * 100:.2f}%",
+                            "similar_to": similar_to
+                        })
+            
+            # Log activity (queued, no extra round trip)
+            log_activity(user_id, "Viewed personalized recommendations")
             
             return make_response({
                 "user_id": user_id,
@@ -0,0 +1,339 @@
+"""
+Lazily created, process-wide model instances with readiness tracking.
+
+Nothing is loaded at import time. Each component is built on first use
+(or by the background warm-up thread started by the app factory), exactly
+once per process, and its state is reported by /readyz. Components with a
+health check (the database) are re-checked by /readyz every
+READINESS_CHECK_INTERVAL seconds, so readiness drops while they are down.
+A component that failed to load is not tried again for
+COMPONENT_RETRY_INTERVAL seconds; /readyz starts a background load of
+whatever is missing, so a worker without warm-up still becomes ready.
+
+Model components can be replaced at runtime by swap() (see
+model/model_reloader.py). Within a request the accessors keep returning the
+instance the request first used, so a request that started before a swap
+finishes on the old version.
+"""
+import logging
+import threading
+import time
+
+from flask import g, has_request_context
+
+from configs.config import COMPONENT_RETRY_INTERVAL, READINESS_CHECK_INTERVAL
+from model.metrics import timer
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentUnavailable(Exception):
+    """A component failed to load; the app answers 503 instead of crashing"""
+
+    def __init__(self, name, error):
+        super().__init__(f"{name} is unavailable: {error}")
+        self.name = name
+        self.error = error
+
+
+class _Component:
+    def __init__(self, name, factory, required=True, check=None):
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.check = check  # re-run on a loaded instance by revalidate()
+        self.instance = None
+        self.state = "pending"  # pending -> loading -> ready | failed; ready <-> unavailable
+        self.error = None
+        self.load_seconds = None
+        self.checked_at = None
+        self.retry_at = 0.0  # monotonic time before which a failed load is not retried
+        self.lock = threading.Lock()
+        self.check_lock = threading.Lock()
+
+    def _raise_if_backing_off(self):
+        if self.state == "failed" and time.monotonic() < self.retry_at:
+            raise ComponentUnavailable(self.name, self.error)
+
+    def retry_due(self):
+        """True if get() would attempt a load now"""
+        return self.instance is None and not (self.state == "failed" and time.monotonic() < self.retry_at)
+
+    def get(self):
+        if self.instance is not None:
+            return self.instance
+        self._raise_if_backing_off()
+        # Requests arriving during warm-up wait for the in-progress load
+        with self.lock:
+            if self.instance is None:
+                # A load that failed while this caller waited is not repeated at once
+                self._raise_if_backing_off()
+                self.state = "loading"
+                start = time.perf_counter()
+                try:
+                    with timer("model_load"):
+                        self.instance = self.factory()
+                except Exception as e:
+                    self.state = "failed"
+                    self.error = str(e)
+                    self.retry_at = time.monotonic() + COMPONENT_RETRY_INTERVAL
+                    logger.error(f"Failed to load {self.name}: {e}")
+                    raise ComponentUnavailable(self.name, e)
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                self.state = "ready"
+                self.error = None
+                logger.info(f"Loaded {self.name} in {self.load_seconds}s")
+        return self.instance
+
+    def replace(self, instance):
+        # A single reference assignment: new callers see the new instance,
+        # callers already holding the old one keep using it until they finish
+        with self.lock:
+            self.instance = instance
+            self.state = "ready"
+            self.error = None
+
+    def revalidate(self, interval):
+        """
+        Re-run the health check of a loaded component, at most once per
+        `interval` seconds; concurrent callers keep the last result.
+        """
+        if self.check is None or self.instance is None or self.state not in ("ready", "unavailable"):
+            return
+        if self.checked_at is not None and time.monotonic() - self.checked_at < interval:
+            return
+        if not self.check_lock.acquire(blocking=False):
+            return
+        try:
+            self.check(self.instance)
+        except Exception as e:
+            if self.state == "ready":
+                logger.error(f"{self.name} health check failed: {e}")
+            self.state = "unavailable"
+            self.error = str(e)
+        else:
+            if self.state == "unavailable":
+                logger.info(f"{self.name} is available again")
+            self.state = "ready"
+            self.error = None
+        finally:
+            self.checked_at = time.monotonic()
+            self.check_lock.release()
+
+    def status(self):
+        return {
+            "state": self.state,
+            "required": self.required,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+
+def _book_model():
+    from model.book_recommend_model import BookRecommendModel
+    from model.artifacts import ArtifactStore
+    store = ArtifactStore()
+    version = store.current_version()
+    return BookRecommendModel(store.path_for(version), version)
+
+
+def _movie_model():
+    from model.movie_recommend_model import MovieRecommendModel
+    from model.artifacts import ArtifactStore
+    store = ArtifactStore()
+    version = store.current_version()
+    return MovieRecommendModel(store.path_for(version), version)
+
+
+def _rating_model():
+    from model.rating_model import RatingModel
+    return RatingModel()
+
+
+def _wishlist_model():
+    from model.wishlist_model import WishlistModel
+    return WishlistModel()
+
+
+def _user_model():
+    from model.user_model import user_model
+    return user_model()
+
+
+def _acl():
+    from model.acl_cache import get_acl_cache
+    acl = get_acl_cache()
+    if not acl.is_loaded() and not acl.load():
+        raise RuntimeError("endpoint ACL could not be loaded from the database")
+    return acl
+
+
+def _ping_database(pool=None):
+    from model import db
+    # A checkout health-checks (and if needed reconnects) a pooled connection
+    try:
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+    except db.PoolTimeout:
+        # As a health check of the loaded pool (pool given), every connection
+        # being busy serving queries means saturated, not down
+        if pool is None:
+            raise
+
+
+def _database():
+    from model import db
+    _ping_database()
+    return db.get_pool()
+
+
+_components = {
+    "book_model": _Component("book_model", _book_model),
+    "movie_model": _Component("movie_model", _movie_model),
+    "rating_model": _Component("rating_model", _rating_model),
+    "wishlist_model": _Component("wishlist_model", _wishlist_model, required=False),
+    "user_model": _Component("user_model", _user_model, required=False),
+    "database": _Component("database", _database, check=_ping_database),
+    "acl": _Component("acl", _acl),
+}
+
+# Loaded by the warm-up thread: cheap dependencies first, then the model artifacts
+WARMUP_ORDER = ["database", "acl", "book_model", "movie_model", "rating_model"]
+
+# Read-only artifacts loaded in the gunicorn master and shared copy-on-write by
+# the workers. Anything holding sockets or threads is created after the fork.
+PRELOAD_COMPONENTS = ["book_model", "movie_model", "rating_model"]
+
+
+# Components whose instances come from the versioned artifacts and can be hot swapped
+MODEL_COMPONENTS = ["book_model", "movie_model"]
+
+
+def _get(name):
+    component = _components[name]
+    if not has_request_context():
+        return component.get()
+    # Pin the instance for the rest of the request
+    pinned = g.setdefault("_pinned_models", {})
+    instance = pinned.get(name)
+    if instance is None:
+        instance = pinned[name] = component.get()
+    return instance
+
+
+def get_book_model():
+    return _get("book_model")
+
+
+def get_movie_model():
+    return _get("movie_model")
+
+
+def get_rating_model():
+    return _components["rating_model"].get()
+
+
+def get_wishlist_model():
+    return _components["wishlist_model"].get()
+
+
+def get_user_model():
+    return _components["user_model"].get()
+
+
+def loaded_instance(name):
+    """The component's instance if it has been built, without loading it"""
+    return _components[name].instance
+
+
+def swap(instances):
+    """Replace already-built model instances, e.g. {"book_model": new_model}"""
+    for name, instance in instances.items():
+        _components[name].replace(instance)
+
+
+def loaded_versions():
+    """{component: artifact version} for the model components (None if not loaded yet)"""
+    return {name: getattr(_components[name].instance, "version", None) for name in MODEL_COMPONENTS}
+
+
+def model_version():
+    """
+    Artifact version serving the current request (the version of the models
+    it used), or of the loaded models outside a request. None if none is loaded.
+    """
+    if has_request_context() and g.get("_pinned_models"):
+        versions = {getattr(i, "version", None) for i in g._pinned_models.values()}
+    else:
+        versions = set(loaded_versions().values())
+    return ",".join(sorted(versions - {None})) or None
+
+
+def warm_up(names=None):
+    """Load components in order; failures are recorded, not raised"""
+    for name in names or WARMUP_ORDER:
+        try:
+            _components[name].get()
+        except ComponentUnavailable:
+            pass
+
+
+def _report_memory():
+    from configs.config import MEMORY_REPORT_ON_STARTUP
+    if MEMORY_REPORT_ON_STARTUP:
+        from model.memory_accounting import log_report
+        log_report()
+
+
+def _warm_up_and_report(names=None):
+    warm_up(names)
+    _report_memory()
+
+
+def preload(names=None):
+    """Synchronously load the shareable components, then freeze the heap for forking"""
+    from model.shared_layout import freeze_heap
+    warm_up(names or PRELOAD_COMPONENTS)
+    _report_memory()
+    freeze_heap()
+
+
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+
+
+def start_warm_up(names=None):
+    global _warm_up_thread
+    with _warm_up_lock:
+        thread = threading.Thread(target=_warm_up_and_report, args=(names,), name="model-warmup", daemon=True)
+        thread.start()
+        _warm_up_thread = thread
+    return thread
+
+
+def _load_missing():
+    # Without warm-up (or after a failed one) nothing would load required
+    # components until a request needed them, and an orchestrator waiting on
+    # /readyz never sends that request
+    global _warm_up_thread
+    missing = [name for name in WARMUP_ORDER if _components[name].retry_due()]
+    if not missing:
+        return
+    with _warm_up_lock:
+        if _warm_up_thread is not None and _warm_up_thread.is_alive():
+            return
+        _warm_up_thread = threading.Thread(target=warm_up, args=(missing,), name="model-warmup", daemon=True)
+        _warm_up_thread.start()
+
+
+def readiness():
+    """(all required components ready, per-component status)"""
+    _load_missing()
+    for component in _components.values():
+        component.revalidate(READINESS_CHECK_INTERVAL)
+    report = {name: component.status() for name, component in _components.items()}
+    ready = all(c.state == "ready" for c in _components.values() if c.required)
+    return ready, report
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, make_response
+
+from configs.config import RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_NEGATIVE_TTL
+from model.single_flight import get_single_flight
+
+# Fixed per-entry overhead (key tuple, entry object, OrderedDict slot)
+ENTRY_OVERHEAD = 300
+
+
+class _CachedResponse:
+    __slots__ = ("body", "status", "mimetype", "size", "expires_at")
+
+    def __init__(self, response, expires_at=None):
+        self.body = response.get_data()
+        self.status = response.status_code
+        self.mimetype = response.mimetype
+        self.size = len(self.body) + ENTRY_OVERHEAD
+        self.expires_at = expires_at
+
+    def to_response(self):
+        return Response(self.body, status=self.status, mimetype=self.mimetype)
+
+
+class ResponseCache:
+    """
+    Serialized recommendation responses keyed on (endpoint, artifact
+    fingerprint, normalized query).
+
+    Successful responses never go stale on their own: the key changes when
+    the model artifacts do, and entries are evicted least-recently-used once
+    the bodies exceed `max_bytes`. 404s (unknown titles, the slow difflib
+    path) are cached too, for `negative_ttl` seconds.
+    """
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES, negative_ttl=RESPONSE_CACHE_NEGATIVE_TTL):
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._by_namespace = {}
+
+    def _count(self, namespace, field):
+        counts = self._by_namespace.setdefault(namespace, {"hits": 0, "misses": 0})
+        counts[field] += 1
+
+    def get(self, key):
+        """Cached entry for `key` (key[0] is the endpoint namespace), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and time.monotonic() > entry.expires_at:
+                del self._entries[key]
+                self._bytes -= entry.size
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                self._count(key[0], "misses")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if entry.status == 404:
+                self.negative_hits += 1
+            self._count(key[0], "hits")
+            return entry
+
+    def snapshot(self, response):
+        """Serialized copy of a response, with the expiry this cache would give it"""
+        expires_at = None
+        if response.status_code == 404:
+            expires_at = time.monotonic() + self.negative_ttl
+        return _CachedResponse(response, expires_at)
+
+    def put(self, key, entry):
+        """Cache a 200 (until evicted) or a 404 (for negative_ttl); anything else is skipped"""
+        if entry.status == 404:
+            if self.negative_ttl <= 0:
+                return
+        elif entry.status != 200:
+            return
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "by_endpoint": {
+                    name: {**c, "hit_rate": round(c["hits"] / (c["hits"] + c["misses"]), 4)}
+                    for name, c in self._by_namespace.items()
+                },
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide response cache"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
+
+
+def cached_response(namespace, model, params, compute):
+    """
+    Serve `compute()` (a view-style callable returning a Flask response)
+    through the response cache. `params` must be the normalized query, so
+    equivalent requests share an entry; `model.fingerprint` ties the entry
+    to the artifacts that produced it.
+
+    On a miss, concurrent identical requests are coalesced: one of them
+    computes, the others wait for its serialized result (X-Cache: COALESCED).
+    """
+    cache = get_response_cache()
+    enabled = cache.max_bytes > 0
+    key = (namespace, model.fingerprint, params)
+
+    if enabled:
+        entry = cache.get(key)
+        if entry is not None:
+            response = entry.to_response()
+            response.headers["X-Cache"] = "HIT"
+            return response
+
+    def compute_entry():
+        # Share the serialized body, never the Response object: each request
+        # gets its own, since after_request hooks modify it
+        entry = cache.snapshot(make_response(compute()))
+        if enabled:
+            cache.put(key, entry)
+        return entry
+
+    entry, shared = get_single_flight().do(key, compute_entry)
+    response = entry.to_response()
+    response.headers["X-Cache"] = "COALESCED" if shared else "MISS"
+    return response
@@ -0,0 +1,74 @@
+"""
+JSON serialization for API responses.
+
+create_app() installs the provider picked by JSON_BACKEND: orjson when it
+is installed ("auto"), otherwise Flask's standard-library encoder. Both
+accept NumPy scalars and arrays as they come out of pandas and the
+similarity matrices, and keep keys in insertion order.
+"""
+import numpy as np
+from flask.json.provider import DefaultJSONProvider, _default
+
+from configs.config import JSON_BACKEND
+from model.metrics import timer
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library
+    orjson = None
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, plus NumPy types"""
+
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.floating):
+            # float32 scores: shortest repr (0.1235), not the widened double (0.12349999...)
+            return float(str(o))
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return _default(o)
+
+    def response(self, *args, **kwargs):
+        with timer("serialization"):
+            return super().response(*args, **kwargs)
+
+
+class OrjsonProvider(NumpyJSONProvider):
+    """
+    orjson-backed provider: serializes NumPy natively, writes NaN as null and
+    builds response bodies as bytes without a str round trip. Dates still go
+    through Flask's default (HTTP date format), so payloads are unchanged.
+    """
+
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def dumps_bytes(self, obj, indent=False):
+        option = self.OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        with timer("serialization"):
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def json_provider(app, backend=JSON_BACKEND):
+    """JSON provider instance for `app` ("auto", "orjson" or "stdlib")"""
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+    if backend in ("auto", "orjson") and orjson is not None:
+        return OrjsonProvider(app)
+    return NumpyJSONProvider(app)
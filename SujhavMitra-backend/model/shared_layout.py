@@ -0,0 +1,57 @@
+"""
+Memory layout helpers for model artifacts shared between forked workers.
+
+Under `gunicorn -c gunicorn.conf.py` the artifacts are loaded once in the
+master and inherited copy-on-write by every worker. A page stays shared only
+as long as nothing writes to it, and CPython writes to an object whenever its
+reference count changes or the garbage collector walks it. So:
+
+- big arrays are made C-contiguous and read-only: a single data buffer with
+  no per-element Python objects, which no request can modify in place;
+- repetitive string columns become categoricals, so a filter compares an
+  integer code array instead of touching every string object;
+- after preloading, gc.freeze() moves every object into the permanent
+  generation so collections in the workers leave the inherited heap alone.
+"""
+import gc
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def freeze_array(array):
+    """C-contiguous, read-only ndarray (sparse matrices are returned unchanged)"""
+    if not isinstance(array, np.ndarray):
+        if hasattr(array, "tocsr"):
+            return array
+        array = np.asarray(array)
+    array = np.ascontiguousarray(array)
+    array.setflags(write=False)
+    return array
+
+
+def string_array(values):
+    """Fixed-width unicode array: one buffer instead of a list of str objects"""
+    return freeze_array(np.asarray(list(values), dtype=str))
+
+
+def categorize(frame, columns):
+    """Store the given object/string columns of `frame` as categoricals, in place"""
+    for column in columns:
+        if column in frame.columns and not isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype("category")
+    return frame
+
+
+def freeze_heap():
+    """
+    Collect garbage, then exempt everything allocated so far from future
+    collections. Call once in the gunicorn master after preloading, just
+    before the workers are forked.
+    """
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Froze {gc.get_freeze_count()} objects before fork")
@@ -0,0 +1,103 @@
+import threading
+
+from configs.config import SINGLE_FLIGHT_TIMEOUT
+from model.metrics import timer
+
+
+class SingleFlightTimeout(Exception):
+    """A coalesced request gave up waiting for the in-flight computation"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical computations: the first caller for a key
+    runs the function, callers arriving while it is still running wait for
+    and share its result (or its exception). Nothing is kept once the call
+    finishes; caching is the response cache's job.
+
+    Waiters give up after `timeout` seconds with SingleFlightTimeout; the
+    computation itself keeps running for the caller that started it.
+    """
+
+    def __init__(self, timeout=SINGLE_FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with `key`. Returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            with timer("single_flight_wait"):
+                finished = call.done.wait(self.timeout)
+            if not finished:
+                with self._lock:
+                    self.timeouts += 1
+                raise SingleFlightTimeout(f"Timed out after {self.timeout}s waiting for an identical request")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            # Later callers start a fresh computation (or hit the cache)
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting": sum(c.waiters for c in self._calls.values()),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "timeout_seconds": self.timeout,
+            }
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Process-wide coalescing group for the recommendation endpoints"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class VerifiedTokenCache:
+    """
+    Small LRU of recently verified JWTs -> decoded claims.
+
+    A hit skips the HMAC verification entirely, so entries are only kept
+    until the token's own `exp`; tokens without an expiry are never cached.
+    A size of 0 disables the cache.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token):
+        if not self.max_size:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, exp = entry
+            if exp <= time.time():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token, claims):
+        exp = claims.get("exp")
+        if not self.max_size or not isinstance(exp, (int, float)):
+            return
+        with self._lock:
+            self._entries[token] = (claims, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
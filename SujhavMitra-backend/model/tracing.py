@@ -0,0 +1,110 @@
+"""
+Per-request stage timings.
+
+Every timer() from model/metrics.py that runs inside a request is added
+to that request's trace, which is reported in two ways:
+
+- a `Server-Timing` header, so browser dev tools show where the time
+  went: auth, title_resolution, similarity_topk, hydration, db_query,
+  serialization, ...
+- one JSON log line on the `sujhavmitra.trace` logger for a sampled
+  fraction of requests (TRACE_SAMPLE_RATE), for every request slower
+  than TRACE_SLOW_MS, and for requests sent with `X-Trace: 1`.
+
+The header and `X-Trace` expose internal timings, so they only apply to
+requests carrying an admin token (also on public routes such as
+/recommend/*), unless SERVER_TIMING opens them to every client.
+
+Requests are identified by their X-Request-ID header (one is generated
+when missing), which is echoed back in the response.
+"""
+import json
+import logging
+import random
+import time
+import uuid
+
+from flask import g, has_request_context, request
+
+from configs.config import SERVER_TIMING, TRACE_SAMPLE_RATE, TRACE_SLOW_MS
+from model import metrics
+from model.auth_model import request_is_admin
+
+logger = logging.getLogger("sujhavmitra.trace")
+
+
+class Trace:
+    __slots__ = ("request_id", "start", "sampled", "stages")
+
+    def __init__(self, request_id, sampled):
+        self.request_id = request_id
+        self.start = time.perf_counter()
+        self.sampled = sampled
+        self.stages = {}  # stage -> [seconds, count], in first-seen order
+
+    def add(self, stage, seconds):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def server_timing(self, total):
+        parts = [f"{stage};dur={seconds * 1000:.3f}" for stage, (seconds, _) in self.stages.items()]
+        parts.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(parts)
+
+
+def _record_stage(stage, seconds):
+    if has_request_context():
+        trace = g.get("_trace")
+        if trace is not None:
+            trace.add(stage, seconds)
+
+
+metrics.stage_listeners.append(_record_stage)
+
+
+def begin_trace():
+    """before_request: start this request's trace"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    g._trace = Trace(request_id[:128], random.random() < TRACE_SAMPLE_RATE)
+
+
+def _timings_visible():
+    # Recommendation routes are public: an admin sends their token to see timings there
+    return SERVER_TIMING or request_is_admin()
+
+
+def finish_trace(response):
+    """after_request: Server-Timing and X-Request-ID headers, and the trace log line if sampled or slow"""
+    trace = g.pop("_trace", None)
+    if trace is None:
+        return response
+    total = time.perf_counter() - trace.start
+
+    response.headers["X-Request-ID"] = trace.request_id
+    visible = _timings_visible()
+    if visible:
+        response.headers["Server-Timing"] = trace.server_timing(total)
+
+    requested = visible and request.headers.get("X-Trace") == "1"
+    if trace.sampled or requested or total * 1000 >= TRACE_SLOW_MS:
+        logger.info(json.dumps({
+            "request_id": trace.request_id,
+            "method": request.method,
+            "route": request.url_rule.rule if request.url_rule else None,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 3),
+            "stages": {
+                stage: {"ms": round(seconds * 1000, 3), "count": count}
+                for stage, (seconds, count) in trace.stages.items()
+            },
+            "bytes": response.calculate_content_length(),
+            "cache": response.headers.get("X-Cache"),
+            "model_version": response.headers.get("X-Model-Version"),
+            "slow": total * 1000 >= TRACE_SLOW_MS,
+        }))
+    return response
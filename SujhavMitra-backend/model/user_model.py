@@ -1,26 +1,28 @@
 import mysql.connector
 from flask import make_response
-from configs.config import dbconfig, JWT_SECRET
+from configs.config import JWT_SECRET
+from model import db
 from datetime import datetime, timedelta
 import jwt
-import bcrypt
 import re
+from model.password_service import get_password_service, PasswordServiceBusy
+from model.queries import LOGIN_QUERY
 
 class user_model():
     def __init__(self):
+        # Connections are borrowed from the shared pool per call
+        self.pool = db.get_pool()
+        # bcrypt runs in a bounded process pool, off the request threads
+        self.passwords = get_password_service()
+        print("User model initialized")
+
+    def get_connection(self):
+        """Borrow a pooled database connection; close() returns it"""
         try:
-            self.conn = mysql.connector.connect(
-                host=dbconfig["host"],
-                port=dbconfig["port"],
-                user=dbconfig["user"],
-                password=dbconfig["password"],
-                database=dbconfig["database"],
-                autocommit=True
-            )
-            print("User DB Connection established")
+            return db.get_connection()
         except Exception as e:
             print(f"Error connecting to database: {e}")
-            self.conn = None
+            return None
 
     def validate_email(self, email):
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -32,23 +34,29 @@ class user_model():
         return re.match(pattern, phone) is not None
 
     def hash_password(self, password):
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        return self.passwords.hash(password)
 
     def verify_password(self, password, hashed):
-        # Accept hashed as str or bytes
-        if isinstance(hashed, str):
-            hashed_bytes = hashed.encode('utf-8')
-        else:
-            hashed_bytes = hashed
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_bytes)
+        return self.passwords.verify(password, hashed)
+
+    def busy_response(self):
+        return make_response({"error": "Server busy, please retry shortly"}, 503, {"Retry-After": "1"})
+
+    def store_password_hash(self, user_id, hashed_password):
+        """Replace a user's stored hash (used for transparent rehash on login)"""
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE sm_users SET password = %s WHERE id = %s", (hashed_password, user_id))
+            cursor.close()
 
     # Get all users - for admin
     def all_user_model(self):
-        if not self.conn:
+        conn = self.get_connection()
+        if not conn:
             return make_response({"error": "Database connection not established"}, 500)
         
         try:
-            cursor = self.conn.cursor(dictionary=True)
+            cursor = conn.cursor(dictionary=True)
             # Don't return passwords
             cursor.execute("SELECT id, name, phone, email, role_id FROM sm_users")
             result = cursor.fetchall()
@@ -61,12 +69,11 @@ class user_model():
         except Exception as e:
             print(f"Error fetching users: {e}")
             return make_response({"error": "Failed to fetch users"}, 500)
+        finally:
+            conn.close()
 
     # User signup
     def signup_user_model(self, user_data):
-        if not self.conn:
-            return make_response({"error": "Database connection not established"}, 500)
-
         # Validate required fields
         required_fields = ['name', 'phone', 'email', 'password']
         for field in required_fields:
@@ -85,25 +92,46 @@ class user_model():
         if len(user_data['password']) < 6:
             return make_response({"error": "Password must be at least 6 characters"}, 400)
 
+        email = user_data['email'].strip().lower()
+
+        conn = self.get_connection()
+        if not conn:
+            return make_response({"error": "Database connection not established"}, 500)
+
         try:
-            cursor = self.conn.cursor()
-            
-            # Check if email already exists
-            cursor.execute("SELECT id FROM sm_users WHERE email = %s", (user_data['email'],))
-            if cursor.fetchone():
-                cursor.close()
-                return make_response({"error": "Email already exists"}, 400)
+            # Check if email already exists before spending a hashing slot on it
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM sm_users WHERE email = %s", (email,))
+            exists = cursor.fetchone()
+            cursor.close()
+        except Exception as e:
+            print(f"Signup error: {e}")
+            return make_response({"error": "Registration failed"}, 500)
+        finally:
+            # Released before bcrypt so no connection is held while hashing
+            conn.close()
 
-            # Hash password
+        if exists:
+            return make_response({"error": "Email already exists"}, 400)
+
+        try:
             hashed_password = self.hash_password(user_data['password'])
-            
+        except PasswordServiceBusy:
+            return self.busy_response()
+
+        conn = self.get_connection()
+        if not conn:
+            return make_response({"error": "Database connection not established"}, 500)
+
+        try:
+            cursor = conn.cursor()
             query = "INSERT INTO sm_users (name, phone, email, role_id, password) VALUES (%s, %s, %s, %s, %s)"
             values = (
                 user_data["name"].strip(),
                 user_data["phone"].strip(),
-                user_data["email"].strip().lower(),
+                email,
                 3,  # Default user role
-                hashed_password.decode('utf-8')
+                hashed_password
             )
             
             cursor.execute(query, values)
@@ -112,36 +140,45 @@ class user_model():
             return make_response({"message": "User registered successfully"}, 201)
             
         except mysql.connector.IntegrityError as e:
+            # Signed up concurrently with the same email (unique key on email)
             print(f"Integrity error: {e}")
             return make_response({"error": "Email already exists"}, 400)
         except Exception as e:
             print(f"Signup error: {e}")
             return make_response({"error": "Registration failed"}, 500)
+        finally:
+            conn.close()
 
     # Update user
     def update_user_model(self, user_data):
-        if not self.conn:
-            return make_response({"error": "Database connection not established"}, 500)
-
         if 'id' not in user_data:
             return make_response({"error": "User ID is required"}, 400)
 
+        # Hash a new password (if any) before borrowing a connection
+        hashed_password = None
+        if 'password' in user_data and user_data['password']:
+            if len(user_data['password']) < 6:
+                return make_response({"error": "Password must be at least 6 characters"}, 400)
+            try:
+                hashed_password = self.hash_password(user_data['password'])
+            except PasswordServiceBusy:
+                return self.busy_response()
+
+        conn = self.get_connection()
+        if not conn:
+            return make_response({"error": "Database connection not established"}, 500)
+
         try:
-            cursor = self.conn.cursor()
+            cursor = conn.cursor()
             user_id = user_data['id']
 
             fields = []
             values = []
 
             # Handle password separately if provided
-            if 'password' in user_data and user_data['password']:
-                if len(user_data['password']) < 6:
-                    cursor.close()
-                    return make_response({"error": "Password must be at least 6 characters"}, 400)
-                
-                hashed_password = self.hash_password(user_data['password'])
+            if hashed_password:
                 fields.append("password = %s")
-                values.append(hashed_password.decode('utf-8'))
+                values.append(hashed_password)
 
             # Handle other fields
             for key, value in user_data.items():
@@ -184,14 +221,17 @@ class user_model():
         except Exception as e:
             print(f"Update error: {e}")
             return make_response({"error": "Update failed"}, 500)
+        finally:
+            conn.close()
 
     # Delete user
     def user_deleteprofile_model(self, user_id):
-        if not self.conn:
+        conn = self.get_connection()
+        if not conn:
             return make_response({"error": "Database connection not established"}, 500)
 
         try:
-            cursor = self.conn.cursor()
+            cursor = conn.cursor()
             query = "DELETE FROM sm_users WHERE id = %s"
             cursor.execute(query, (user_id,))
             affected_rows = cursor.rowcount
@@ -205,25 +245,38 @@ class user_model():
         except Exception as e:
             print(f"Delete error: {e}")
             return make_response({"error": "Delete failed"}, 500)
+        finally:
+            conn.close()
 
     # User login
     def user_login_model(self, data):
-        if not self.conn:
-            return make_response({"error": "Database connection not established"}, 500)
-
         # Validate required fields
         if not data.get('email') or not data.get('password'):
             return make_response({"error": "Email and password are required"}, 400)
 
-        try:
-            cursor = self.conn.cursor(dictionary=True)
+        conn = self.get_connection()
+        if not conn:
+            return make_response({"error": "Database connection not established"}, 500)
 
-            query = "SELECT id, role_id, email, name, phone, password FROM sm_users WHERE email = %s"
-            cursor.execute(query, (data['email'].strip().lower(),))
-            result = cursor.fetchone()
-            cursor.close()
+        try:
+            # Release the connection before the (slow) bcrypt check
+            try:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(LOGIN_QUERY, (data['email'].strip().lower(),))
+                result = cursor.fetchone()
+                cursor.close()
+            finally:
+                conn.close()
 
             if result and self.verify_password(data['password'], result['password']):
+                # Transparently upgrade hashes made with an older bcrypt cost
+                if self.passwords.needs_rehash(result['password']):
+                    user_id = result['id']
+                    self.passwords.rehash_async(
+                        data['password'],
+                        lambda new_hash: self.store_password_hash(user_id, new_hash)
+                    )
+
                 # Remove password from user data
                 user_data = {
                     'id': result['id'],
@@ -248,6 +301,8 @@ class user_model():
             else:
                 return make_response({"message": "Invalid email or password"}, 401)
                 
+        except PasswordServiceBusy:
+            return self.busy_response()
         except Exception as e:
             print(f"Login error: {e}")
             return make_response({"error": "Login failed"}, 500)
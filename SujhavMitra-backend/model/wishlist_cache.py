@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from configs.config import WISHLIST_CACHE_MAX_BYTES, WISHLIST_CACHE_TTL
+
+
+def _item_key(item_type, item_id):
+    return (item_type, str(item_id))
+
+
+def _estimate_size(item):
+    # Rough per-item footprint: the JSON size is a good proxy for the decoded dict
+    return len(json.dumps(item, default=str)) + 200
+
+
+class _Entry:
+    __slots__ = ("items", "keys", "size", "loaded_at")
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.keys = {_item_key(i["item_type"], i["item_id"]): i["id"] for i in self.items}
+        self.size = sum(_estimate_size(i) for i in self.items)
+        self.loaded_at = time.monotonic()
+
+
+class WishlistCache:
+    """
+    Per-user cache of decoded wishlist items (newest first).
+
+    Entries are filled on read and kept current write-through by the
+    wishlist model, so page loads and "is this saved?" checks do not hit
+    MySQL. Users are evicted least-recently-used once the estimated total
+    size exceeds `max_bytes`; entries older than `ttl` seconds are reloaded
+    to pick up writes made by other worker processes.
+    """
+
+    def __init__(self, max_bytes=WISHLIST_CACHE_MAX_BYTES, ttl=WISHLIST_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def _live_entry(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > self.ttl:
+            del self._entries[user_id]
+            self._bytes -= entry.size
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def get(self, user_id, item_type=None):
+        """Cached items for a user (optionally filtered by type), or None on a miss"""
+        with self._lock:
+            entry = self._live_entry(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if item_type:
+                return [i for i in entry.items if i["item_type"] == item_type]
+            return list(entry.items)
+
+    def contains(self, user_id, item_type, item_id):
+        """
+        Wishlist row id if the item is saved, False if not, None if the
+        user's wishlist is not cached. Up to `ttl` seconds stale across
+        workers, so only for read-only "saved" badges; writes go by the
+        database's unique key.
+        """
+        with self._lock:
+            entry = self._live_entry(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.keys.get(_item_key(item_type, item_id), False)
+
+    def set(self, user_id, items):
+        """Cache a user's full wishlist (as loaded from the database)"""
+        entry = _Entry(items)
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(user_id, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[user_id] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def add_item(self, user_id, item):
+        """Write-through for a newly inserted row; no-op if the user is not cached"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            key = _item_key(item["item_type"], item["item_id"])
+            if key in entry.keys:
+                return
+            entry.items.insert(0, item)
+            entry.keys[key] = item["id"]
+            size = _estimate_size(item)
+            entry.size += size
+            self._bytes += size
+            self._evict()
+
+    def remove_item(self, user_id, wishlist_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            for index, item in enumerate(entry.items):
+                if item["id"] == wishlist_id:
+                    del entry.items[index]
+                    entry.keys.pop(_item_key(item["item_type"], item["item_id"]), None)
+                    size = _estimate_size(item)
+                    entry.size -= size
+                    self._bytes -= size
+                    break
+
+    def clear(self, user_id, item_type=None):
+        """Write-through for clearing a whole wishlist or one item type"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            if item_type is None:
+                entry.items = []
+            else:
+                entry.items = [i for i in entry.items if i["item_type"] != item_type]
+            entry.keys = {_item_key(i["item_type"], i["item_id"]): i["id"] for i in entry.items}
+            new_size = sum(_estimate_size(i) for i in entry.items)
+            self._bytes += new_size - entry.size
+            entry.size = new_size
+
+    def invalidate(self, user_id):
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
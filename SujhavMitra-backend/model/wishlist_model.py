@@ -1,8 +1,13 @@
 import mysql.connector
 import json
 from flask import make_response
-from configs.config import dbconfig
-from datetime import datetime
+from model import db
+from model.activity_logger import log_activity
+from model.wishlist_cache import WishlistCache
+from model.registry import get_book_model, get_movie_model
+from model.queries import RECENT_ACTIVITY_QUERY, USER_ACTIVITY_QUERY, WISHLIST_QUERY
+from configs.config import WISHLIST_BULK_MAX
+from datetime import datetime, date, timedelta
 import logging
 
 # Configure logging
@@ -11,65 +16,40 @@ logger = logging.getLogger(__name__)
 
 class WishlistModel:
     def __init__(self):
-        self.conn = None
-        self.connect()
+        # Connections are borrowed from the shared pool per query, so
+        # concurrent Flask threads never share a single session
+        self.pool = db.get_pool()
+        # Decoded per-user wishlists, kept current write-through
+        self.cache = WishlistCache()
 
-    def connect(self):
-        """Establish database connection"""
-        try:
-            if self.conn and self.conn.is_connected():
-                return True
-                
-            self.conn = mysql.connector.connect(
-                host=dbconfig["host"],
-                port=dbconfig["port"],
-                user=dbconfig["user"],
-                password=dbconfig["password"],
-                database=dbconfig["database"],
-                autocommit=True
-            )
-            logger.info("Successfully connected to the database")
-            return True
-        except mysql.connector.Error as err:
-            logger.error(f"Database connection error: {err}")
-            self.conn = None
-            return False
-
-    def execute_query(self, query, params=None, fetch=True):
-        """Execute a database query with error handling and reconnection"""
+    def execute_query(self, query, params=None, fetch=True, return_id=False):
+        """Execute a database query on a pooled connection, retrying once on a dropped connection"""
         max_retries = 2
         for attempt in range(max_retries):
             try:
-                if not self.connect():
-                    raise Exception("Failed to connect to database")
+                with db.get_connection() as conn:
+                    cursor = conn.cursor(dictionary=True)
+                    cursor.execute(query, params or ())
                     
-                cursor = self.conn.cursor(dictionary=True)
-                cursor.execute(query, params or ())
-                
-                if fetch:
-                    result = cursor.fetchall()
+                    if fetch:
+                        result = cursor.fetchall()
+                        cursor.close()
+                        return result
+                    
+                    result = cursor.lastrowid if return_id else cursor.rowcount
                     cursor.close()
                     return result
                 
-                cursor.close()
-                return True
-                
+            except db.PoolTimeout:
+                raise
             except mysql.connector.Error as err:
                 logger.error(f"Database error (attempt {attempt + 1}): {err}")
-                self.conn = None  # Force reconnection on next attempt
                 if attempt == max_retries - 1:  # Last attempt
                     raise
 
     def log_activity(self, user_id, action):
-        """Log user activity to sm_user_activity table"""
-        try:
-            query = """
-                INSERT INTO sm_user_activity (user_id, action, timestamp) 
-                VALUES (%s, %s, %s)
-            """
-            self.execute_query(query, (user_id, action, datetime.now()), fetch=False)
-        except Exception as e:
-            logger.error(f"Error logging activity: {e}")
+        """Queue a row for sm_user_activity; written in batches off the request path"""
+        log_activity(user_id, action)
 
     def add_to_wishlist(self, user_id, item_type, item_id, title, **kwargs):
         """
@@ -80,7 +60,7 @@ class WishlistModel:
             item_type: Type of the item ('book' or 'movie')
             item_id: ID of the item
             title: Title of the item
-            **kwargs: Additional item data to be stored as JSON
+            **kwargs: Ignored; item details are hydrated from the catalog on read
             
         Returns:
             Response with success/error message
@@ -94,35 +74,35 @@ class WishlistModel:
             return make_response({"error": "item_id and title are required"}, 400)
 
         try:
-            # Check if item already exists in wishlist
-            check_query = """
-                SELECT id FROM sm_wishlist 
-                WHERE user_id = %s AND item_type = %s AND item_id = %s
+            # The unique key on (user_id, item_type, item_id) decides, not this
+            # worker's cache: another worker may have added or removed the item
+            # since the wishlist was cached here. An ignored insert reports no id.
+            # Store a reference only; metadata comes from the catalog at read time
+            insert_query = """
+                INSERT IGNORE INTO sm_wishlist 
+                (user_id, item_type, item_id, title, added_at) 
+                VALUES (%s, %s, %s, %s, %s)
             """
-            existing = self.execute_query(check_query, (user_id, item_type, item_id))
+            added_at = datetime.now()
+            wishlist_id = self.execute_query(
+                insert_query, 
+                (user_id, item_type, item_id, title, added_at),
+                fetch=False,
+                return_id=True
+            )
 
-            if existing and len(existing) > 0:
+            if not wishlist_id:
+                self.cache.invalidate(user_id)
                 return make_response({"message": "Item already in wishlist"}, 200)
 
-            # Prepare item data
-            item_data = {
-                'id': item_id,
+            self.cache.add_item(user_id, {
+                'id': wishlist_id,
+                'item_type': item_type,
+                'item_id': str(item_id),
                 'title': title,
-                'type': item_type,
-                **{k: v for k, v in kwargs.items() if v is not None}  # Include any additional fields
-            }
-            
-            # Add to wishlist with complete data
-            insert_query = """
-                INSERT INTO sm_wishlist 
-                (user_id, item_type, item_id, title, data, added_at) 
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            self.execute_query(
-                insert_query, 
-                (user_id, item_type, item_id, title, json.dumps(item_data), datetime.now()),
-                fetch=False
-            )
+                'data': None,
+                'added_at': added_at
+            })
 
             # Log activity
             self.log_activity(user_id, f"Added {item_type} '{title}' to wishlist")
@@ -139,6 +119,51 @@ class WishlistModel:
                 "details": str(e)
             }, 500)
 
+    def load_wishlist(self, user_id):
+        """All of a user's wishlist rows (newest first), via the cache"""
+        items = self.cache.get(user_id)
+        if items is not None:
+            return items
+
+        items = self.execute_query(WISHLIST_QUERY, (user_id,)) or []
+            
+        # Rows not yet slimmed by migration 0004 may still carry a JSON copy
+        for item in items:
+            if item.get('data') and isinstance(item['data'], str):
+                try:
+                    item['data'] = json.loads(item['data'])
+                except (json.JSONDecodeError, TypeError):
+                    # If data is not valid JSON, keep it as is
+                    pass
+
+        self.cache.set(user_id, items)
+        return items
+
+    def hydrate_items(self, items):
+        """
+        Attach current catalog metadata to wishlist rows as `data`, using one
+        batched lookup per item type. Items missing from the catalog fall
+        back to any legacy stored copy, then to the bare reference.
+        """
+        book_ids = [item['item_id'] for item in items if item['item_type'] == 'book']
+        movie_ids = [item['item_id'] for item in items if item['item_type'] == 'movie']
+        catalog = {
+            'book': get_book_model().get_books_by_isbns(book_ids) if book_ids else {},
+            'movie': get_movie_model().get_movies_by_ids(movie_ids) if movie_ids else {}
+        }
+
+        hydrated = []
+        for item in items:
+            data = catalog[item['item_type']].get(item['item_id'])
+            if data is None:
+                data = item.get('data') if isinstance(item.get('data'), dict) else {
+                    'id': item['item_id'],
+                    'title': item['title'],
+                    'type': item['item_type']
+                }
+            hydrated.append({**item, 'data': data})
+        return hydrated
+
     def get_wishlist(self, user_id, item_type=None):
         """Get user's wishlist, optionally filtered by item_type"""
         try:
@@ -147,32 +172,10 @@ class WishlistModel:
                     "error": "Invalid item type. Must be 'book' or 'movie'"
                 }, 400)
             
-            # Get wishlist items with their data
+            items = self.load_wishlist(user_id)
             if item_type:
-                query = """
-                    SELECT id, item_type, item_id, title, data, added_at 
-                    FROM sm_wishlist 
-                    WHERE user_id = %s AND item_type = %s
-                    ORDER BY added_at DESC
-                """
-                items = self.execute_query(query, (user_id, item_type)) or []
-            else:
-                query = """
-                    SELECT id, item_type, item_id, title, data, added_at 
-                    FROM sm_wishlist 
-                    WHERE user_id = %s
-                    ORDER BY added_at DESC
-                """
-                items = self.execute_query(query, (user_id,)) or []
-                
-            # Merge data with item details if available
-            for item in items:
-                if item.get('data') and isinstance(item['data'], str):
-                    try:
-                        item['data'] = json.loads(item['data'])
-                    except (json.JSONDecodeError, TypeError):
-                        # If data is not valid JSON, keep it as is
-                        pass
+                items = [item for item in items if item['item_type'] == item_type]
+            items = self.hydrate_items(items)
 
             return make_response({
                 "wishlist": items,
@@ -186,6 +189,28 @@ class WishlistModel:
                 "details": str(e)
             }, 500)
 
+    def is_in_wishlist(self, user_id, item_type, item_id):
+        """Cheap "is item X saved" check, answered from the cached wishlist"""
+        if item_type not in ['book', 'movie']:
+            return make_response({"error": "Invalid item type. Must be 'book' or 'movie'"}, 400)
+
+        try:
+            wishlist_id = self.cache.contains(user_id, item_type, item_id)
+            if wishlist_id is None:
+                self.load_wishlist(user_id)
+                wishlist_id = self.cache.contains(user_id, item_type, item_id)
+
+            return make_response({
+                "item_type": item_type,
+                "item_id": str(item_id),
+                "saved": bool(wishlist_id),
+                "wishlist_id": wishlist_id or None
+            }, 200)
+
+        except Exception as e:
+            logger.error(f"Error in is_in_wishlist: {str(e)}")
+            return make_response({"error": "Failed to check wishlist"}, 500)
+
     def remove_from_wishlist(self, user_id, wishlist_id):
         """Remove a specific item from wishlist by its wishlist ID"""
         try:
@@ -210,6 +235,7 @@ class WishlistModel:
                 WHERE id = %s AND user_id = %s
             """
             self.execute_query(delete_query, (wishlist_id, user_id), fetch=False)
+            self.cache.remove_item(user_id, wishlist_id)
 
             # Log activity
             self.log_activity(
@@ -229,28 +255,252 @@ class WishlistModel:
                 "details": str(e)
             }, 500)
 
+    def bulk_add_to_wishlist(self, user_id, items):
+        """
+        Add many books/movies in one transaction.
+
+        Existing items are found with one SELECT, new ones inserted with one
+        multi-row INSERT IGNORE, and their ids read back with one SELECT (see
+        _bulk_insert for concurrent adds). Returns a per-item result list in
+        request order.
+        """
+        if not isinstance(items, list) or not items:
+            return make_response({"error": "items must be a non-empty list"}, 400)
+        if len(items) > WISHLIST_BULK_MAX:
+            return make_response({"error": f"At most {WISHLIST_BULK_MAX} items per request"}, 400)
+
+        results = []
+        candidates = {}  # (item_type, item_id) -> title, first occurrence wins
+        for raw in items:
+            raw = raw if isinstance(raw, dict) else {}
+            item_type = raw.get('item_type')
+            item_id = raw.get('item_id')
+            title = raw.get('title')
+            result = {"item_type": item_type, "item_id": None if item_id is None else str(item_id)}
+            results.append(result)
+
+            if item_type not in ['book', 'movie']:
+                result.update(status="invalid", error="Invalid item type. Must be 'book' or 'movie'")
+                continue
+            if not item_id or not title:
+                result.update(status="invalid", error="item_id and title are required")
+                continue
+
+            key = (item_type, str(item_id))
+            if key not in candidates:
+                candidates[key] = title
+
+        added_at = datetime.now()
+        inserted = {}
+        existing = {}
+        if candidates:
+            try:
+                existing, inserted = self._bulk_insert(user_id, candidates, added_at)
+            except Exception as e:
+                logger.error(f"Error in bulk_add_to_wishlist: {str(e)}")
+                return make_response({"error": "Failed to add items to wishlist", "details": str(e)}, 500)
+
+        reported = set()
+        for result in results:
+            if result.get("status"):
+                continue
+            key = (result["item_type"], result["item_id"])
+            if key in inserted and key not in reported:
+                reported.add(key)
+                result.update(status="added", wishlist_id=inserted[key])
+            else:
+                # Already saved, or a duplicate within this request
+                result.update(status="exists", wishlist_id=existing.get(key) or inserted.get(key))
+
+        if existing:
+            # Rows this worker's cache may not know about (added via another worker)
+            self.cache.invalidate(user_id)
+        for key, wishlist_id in inserted.items():
+            self.cache.add_item(user_id, {
+                'id': wishlist_id,
+                'item_type': key[0],
+                'item_id': key[1],
+                'title': candidates[key],
+                'data': None,
+                'added_at': added_at
+            })
+            self.log_activity(user_id, f"Added {key[0]} '{candidates[key]}' to wishlist")
+
+        return make_response({
+            "results": results,
+            "added": sum(1 for r in results if r["status"] == "added"),
+            "existing": sum(1 for r in results if r["status"] == "exists"),
+            "failed": sum(1 for r in results if r["status"] == "invalid")
+        }, 200)
+
+    def _bulk_insert(self, user_id, candidates, added_at, attempts=3):
+        """
+        Insert the keys of `candidates` ({(item_type, item_id): title}) not yet
+        saved, in one transaction. Returns ({key: id} already saved, {key: id}
+        inserted by this call).
+
+        A concurrent request can save one of the keys between the SELECT and
+        the INSERT IGNORE, which then skips it. The insert's rowcount shows
+        that, and the attempt is rolled back and retried with a fresh
+        snapshot; the last attempt inserts row by row to tell the keys apart.
+        """
+        keys = list(candidates)
+        key_placeholders = ", ".join(["(%s, %s)"] * len(keys))
+        key_params = [value for key in keys for value in key]
+        with db.get_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                for attempt in range(attempts):
+                    row_by_row = attempt == attempts - 1
+                    try:
+                        conn.start_transaction()
+                        cursor.execute(
+                            f"""
+                            SELECT id, item_type, item_id FROM sm_wishlist
+                            WHERE user_id = %s AND (item_type, item_id) IN ({key_placeholders})
+                            """,
+                            [user_id, *key_params]
+                        )
+                        existing = {(r['item_type'], str(r['item_id'])): r['id'] for r in cursor.fetchall()}
+                        new_keys = [key for key in keys if key not in existing]
+                        if not new_keys:
+                            conn.commit()
+                            return existing, {}
+
+                        if row_by_row:
+                            inserted = {}
+                            for key in new_keys:
+                                cursor.execute(
+                                    """
+                                    INSERT IGNORE INTO sm_wishlist
+                                    (user_id, item_type, item_id, title, added_at)
+                                    VALUES (%s, %s, %s, %s, %s)
+                                    """,
+                                    (user_id, key[0], key[1], candidates[key], added_at)
+                                )
+                                if cursor.rowcount == 1:
+                                    inserted[key] = cursor.lastrowid
+                            raced = [key for key in new_keys if key not in inserted]
+                            if raced:
+                                cursor.execute(
+                                    f"""
+                                    SELECT id, item_type, item_id FROM sm_wishlist
+                                    WHERE user_id = %s AND (item_type, item_id) IN
+                                    ({", ".join(["(%s, %s)"] * len(raced))})
+                                    """,
+                                    [user_id, *[value for key in raced for value in key]]
+                                )
+                                existing.update({(r['item_type'], str(r['item_id'])): r['id'] for r in cursor.fetchall()})
+                            conn.commit()
+                            return existing, inserted
+
+                        cursor.execute(
+                            f"""
+                            INSERT IGNORE INTO sm_wishlist
+                            (user_id, item_type, item_id, title, added_at)
+                            VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(new_keys))}
+                            """,
+                            [value for key in new_keys for value in (
+                                user_id, key[0], key[1], candidates[key], added_at
+                            )]
+                        )
+                        if cursor.rowcount != len(new_keys):
+                            # Another request saved some of these keys meanwhile
+                            conn.rollback()
+                            continue
+                        cursor.execute(
+                            f"""
+                            SELECT id, item_type, item_id FROM sm_wishlist
+                            WHERE user_id = %s AND (item_type, item_id) IN
+                            ({", ".join(["(%s, %s)"] * len(new_keys))})
+                            """,
+                            [user_id, *[value for key in new_keys for value in key]]
+                        )
+                        inserted = {(r['item_type'], str(r['item_id'])): r['id'] for r in cursor.fetchall()}
+                        conn.commit()
+                        return existing, inserted
+                    except Exception:
+                        conn.rollback()
+                        raise
+            finally:
+                cursor.close()
+
+    def bulk_remove_from_wishlist(self, user_id, wishlist_ids):
+        """Remove many wishlist rows (by wishlist ID) in one transaction, with per-item results"""
+        if not isinstance(wishlist_ids, list) or not wishlist_ids:
+            return make_response({"error": "ids must be a non-empty list"}, 400)
+        if len(wishlist_ids) > WISHLIST_BULK_MAX:
+            return make_response({"error": f"At most {WISHLIST_BULK_MAX} items per request"}, 400)
+
+        try:
+            ids = list(dict.fromkeys(int(i) for i in wishlist_ids))
+        except (TypeError, ValueError):
+            return make_response({"error": "ids must be integers"}, 400)
+
+        placeholders = ", ".join(["%s"] * len(ids))
+        try:
+            with db.get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    conn.start_transaction()
+                    cursor.execute(
+                        f"""
+                        SELECT id, item_type, title FROM sm_wishlist
+                        WHERE user_id = %s AND id IN ({placeholders})
+                        FOR UPDATE
+                        """,
+                        [user_id, *ids]
+                    )
+                    found = {row['id']: row for row in cursor.fetchall()}
+                    if found:
+                        cursor.execute(
+                            f"DELETE FROM sm_wishlist WHERE user_id = %s AND id IN ({', '.join(['%s'] * len(found))})",
+                            [user_id, *found]
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Error in bulk_remove_from_wishlist: {str(e)}")
+            return make_response({"error": "Failed to remove items from wishlist", "details": str(e)}, 500)
+
+        results = []
+        for wishlist_id in ids:
+            item = found.get(wishlist_id)
+            if item:
+                self.cache.remove_item(user_id, wishlist_id)
+                self.log_activity(user_id, f"Removed {item['item_type']} '{item['title']}' from wishlist")
+                results.append({"wishlist_id": wishlist_id, "status": "removed"})
+            else:
+                results.append({"wishlist_id": wishlist_id, "status": "not_found"})
+
+        return make_response({
+            "results": results,
+            "removed": len(found),
+            "not_found": len(ids) - len(found)
+        }, 200)
+
     def clear_wishlist(self, user_id, item_type=None):
         """Clear user's entire wishlist or by type"""
         try:
-            cursor = self.conn.cursor()
-
             if item_type:
                 # Validate item_type
                 if item_type not in ['book', 'movie']:
-                    cursor.close()
                     return make_response({"error": "Invalid item type. Must be 'book' or 'movie'"}, 400)
                 
                 query = "DELETE FROM sm_wishlist WHERE user_id = %s AND item_type = %s"
-                cursor.execute(query, (user_id, item_type))
+                affected_rows = self.execute_query(query, (user_id, item_type), fetch=False)
+                self.cache.clear(user_id, item_type)
                 action = f"Cleared all {item_type}s from wishlist"
             else:
                 query = "DELETE FROM sm_wishlist WHERE user_id = %s"
-                cursor.execute(query, (user_id,))
+                affected_rows = self.execute_query(query, (user_id,), fetch=False)
+                self.cache.clear(user_id)
                 action = "Cleared entire wishlist"
 
-            affected_rows = cursor.rowcount
-            cursor.close()
-
             # Log activity
             self.log_activity(user_id, action)
 
@@ -263,22 +513,67 @@ class WishlistModel:
             print(f"Error clearing wishlist: {e}")
             return make_response({"error": "Failed to clear wishlist"}, 500)
 
-    def get_all_activity(self, limit=50):
-        """Get activity logs of all users (admin only)"""
-        if not self.conn:
-            return make_response({"error": "Database connection not established"}, 500)
+    def get_user_activity(self, user_id, limit=50):
+        """Get activity logs of a single user"""
+        try:
+            activities = self.execute_query(USER_ACTIVITY_QUERY, (user_id, limit))
 
+            return make_response({
+                "user_id": user_id,
+                "activities": activities,
+                "count": len(activities)
+            }, 200)
+        except Exception as e:
+            print(f"Error fetching user activity: {e}")
+            return make_response({"error": "Failed to fetch activity"}, 500)
+
+    def get_activity_summary(self, days=30, user_id=None):
+        """Per-day activity counters from the rollup table (admin dashboards)"""
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            query = """
-                SELECT id, user_id, action, timestamp
-                FROM sm_user_activity
-                ORDER BY timestamp DESC
-                LIMIT %s
-            """
-            cursor.execute(query, (limit,))
-            activities = cursor.fetchall()
-            cursor.close()
+            since = date.today() - timedelta(days=days)
+            if user_id:
+                query = """
+                    SELECT activity_date, action_type, SUM(event_count) AS event_count
+                    FROM sm_user_activity_daily
+                    WHERE user_id = %s AND activity_date >= %s
+                    GROUP BY activity_date, action_type
+                    ORDER BY activity_date DESC
+                """
+                rows = self.execute_query(query, (user_id, since))
+            else:
+                query = """
+                    SELECT activity_date, action_type, SUM(event_count) AS event_count,
+                           COUNT(DISTINCT user_id) AS active_users
+                    FROM sm_user_activity_daily
+                    WHERE activity_date >= %s
+                    GROUP BY activity_date, action_type
+                    ORDER BY activity_date DESC
+                """
+                rows = self.execute_query(query, (since,))
+
+            for row in rows:
+                row['activity_date'] = str(row['activity_date'])
+                row['event_count'] = int(row['event_count'])
+
+            return make_response({
+                "user_id": user_id,
+                "days": days,
+                "summary": rows
+            }, 200)
+        except Exception as e:
+            print(f"Error fetching activity summary: {e}")
+            return make_response({"error": "Failed to fetch activity summary"}, 500)
+
+    def get_all_activity(self, limit=50):
+        """
+        Most recent per-user, per-day counters of all users (admin only),
+        read from the rollup table instead of sorting the raw events
+        """
+        try:
+            activities = self.execute_query(RECENT_ACTIVITY_QUERY, (limit,))
+
+            for row in activities:
+                row['activity_date'] = str(row['activity_date'])
 
             return make_response({
                 "activities": activities,
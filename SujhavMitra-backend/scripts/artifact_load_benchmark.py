@@ -0,0 +1,144 @@
+"""
+Cold-start benchmark: pickled artifacts vs the columnar (Parquet + .npy) set.
+
+Each measurement loads BookRecommendModel and MovieRecommendModel in a
+fresh Python process and reports the load time, the peak RSS reached while
+loading and the anonymous (heap) memory left afterwards, both relative to
+the process right after imports. Memory-mapped .npy matrices live in the
+shared page cache rather than the heap, so they count towards RSS but not
+towards anonymous memory.
+
+Usage (from the backend directory):
+    python scripts/artifact_load_benchmark.py                        # converts models/ to a temp dir first
+    python scripts/artifact_load_benchmark.py --columnar /tmp/columnar --repeat 5 --touch
+    python scripts/artifact_load_benchmark.py --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+
+def _memory_kb():
+    """VmHWM (peak RSS), VmRSS and RssAnon of this process in KiB"""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("VmHWM", "VmRSS", "RssAnon"):
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def _reset_peak_rss():
+    # Linux 4.0+: restart the VmHWM high-water mark from the current RSS
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def child(directory, touch):
+    """Runs in a fresh process: load both models from `directory` and print the measurements"""
+    import numpy as np
+    from model.book_recommend_model import BookRecommendModel
+    from model.movie_recommend_model import MovieRecommendModel
+
+    _reset_peak_rss()
+    baseline = _memory_kb()
+
+    start = time.perf_counter()
+    book_model = BookRecommendModel(directory)
+    movie_model = MovieRecommendModel(directory)
+    load_seconds = time.perf_counter() - start
+
+    if touch:
+        for array in (book_model.similarity, movie_model.similarity, movie_model.vectors):
+            float(np.asarray(array).sum())
+    total_seconds = time.perf_counter() - start
+
+    after = _memory_kb()
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "total_seconds": total_seconds,
+        "peak_rss_delta_kb": after["VmHWM"] - baseline["VmRSS"],
+        "rss_delta_kb": after["VmRSS"] - baseline["VmRSS"],
+        "anon_delta_kb": after["RssAnon"] - baseline["RssAnon"],
+    }))
+
+
+def measure(directory, repeat, touch):
+    runs = []
+    for _ in range(repeat):
+        command = [sys.executable, os.path.abspath(__file__), "--child", directory]
+        if touch:
+            command.append("--touch")
+        output = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "runs": repeat,
+        "load_seconds_median": statistics.median(r["load_seconds"] for r in runs),
+        "total_seconds_median": statistics.median(r["total_seconds"] for r in runs),
+        "peak_rss_delta_mb": max(r["peak_rss_delta_kb"] for r in runs) / 1024,
+        "rss_delta_mb": max(r["rss_delta_kb"] for r in runs) / 1024,
+        "anon_delta_mb": max(r["anon_delta_kb"] for r in runs) / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare cold-start time and memory of pickle vs columnar artifacts")
+    parser.add_argument("--pickles", default=os.path.join(BASE_DIR, "models"), help="directory with the .pkl artifacts")
+    parser.add_argument("--columnar", help="directory with the Parquet/.npy artifacts (default: convert --pickles)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--touch", action="store_true", help="read every matrix after loading")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.touch)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        columnar = args.columnar
+        if not columnar:
+            from model.artifact_io import convert_to_columnar
+            columnar = tmp
+            convert_to_columnar(args.pickles, columnar)
+
+        results = {
+            "pickle": measure(os.path.abspath(args.pickles), args.repeat, args.touch),
+            "columnar": measure(os.path.abspath(columnar), args.repeat, args.touch),
+        }
+        sizes = {
+            fmt: sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d)
+                     if f.endswith((".pkl", ".parquet", ".npy")))
+            for fmt, d in (("pickle", args.pickles), ("columnar", columnar))
+        }
+    for fmt in results:
+        results[fmt]["artifact_mb"] = sizes[fmt] / 1024 / 1024
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'format':<10}{'files MB':>10}{'load s':>10}{'total s':>10}{'peak MB':>10}{'RSS MB':>10}{'heap MB':>10}")
+    for fmt, r in results.items():
+        print(f"{fmt:<10}{r['artifact_mb']:>10.1f}{r['load_seconds_median']:>10.3f}{r['total_seconds_median']:>10.3f}"
+              f"{r['peak_rss_delta_mb']:>10.1f}{r['rss_delta_mb']:>10.1f}{r['anon_delta_mb']:>10.1f}")
+    speedup = results["pickle"]["load_seconds_median"] / max(results["columnar"]["load_seconds_median"], 1e-9)
+    print(f"\ncolumnar loads {speedup:.1f}x faster (median of {args.repeat} cold processes"
+          f"{', matrices read once' if args.touch else ''})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
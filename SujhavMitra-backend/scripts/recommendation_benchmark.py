@@ -0,0 +1,296 @@
+"""
+Microbenchmarks for the recommendation hot paths, on synthetic artifacts.
+
+For each scale, a synthetic artifact set is written (scripts/synthetic_artifacts.py),
+reused (--artifacts) or trained from CSV datasets (--dataset, see
+scripts/synthetic_datasets.py; needs scikit-learn). The models are loaded from
+it, and each case is timed in isolation, including building the Flask response:
+
+    book_recommend_model          exact title -> 5 similar books
+    get_book_by_title             exact, substring and fuzzy (difflib) title lookups
+    movie_recommend_model         10 similar movies, without and with TF-IDF features
+    get_recommendations_for_user  collaborative filtering over a user's ratings
+                                  (served from memory instead of MySQL)
+    format_movie_row              one movie row -> response record
+
+Inputs rotate through the catalog so that no single row stays hot. Results
+go to a JSON file with the commit and library versions, so that runs on two
+commits can be compared:
+
+    python scripts/recommendation_benchmark.py --scale 0.25 --scale 1 --output before.json
+    git checkout my-branch
+    python scripts/recommendation_benchmark.py --scale 0.25 --scale 1 --output after.json --compare before.json
+    python scripts/recommendation_benchmark.py --dataset /data/synthetic-10x --output 10x.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from synthetic_artifacts import write_artifacts  # noqa: E402
+from model import activity_logger, registry  # noqa: E402
+from model.book_recommend_model import BookRecommendModel  # noqa: E402
+from model.movie_recommend_model import MovieRecommendModel  # noqa: E402
+from model.rating_model import RatingModel  # noqa: E402
+from model.serialization import json_provider  # noqa: E402
+
+# A case is reported as a regression in --compare when its median grows by more than this
+REGRESSION_THRESHOLD = 0.10
+
+
+class _RatingsCursor:
+    """Cursor answering the ratings query of get_recommendations_for_user from memory"""
+
+    def __init__(self, ratings):
+        self.ratings = ratings
+        self.user_id = None
+
+    def execute(self, query, params=None):
+        self.user_id = params[0] if params else None
+
+    def fetchall(self):
+        return self.ratings.get(self.user_id, [])
+
+    def close(self):
+        pass
+
+
+class _RatingsConnection:
+    def __init__(self, ratings):
+        self.ratings = ratings
+
+    def cursor(self, dictionary=False):
+        return _RatingsCursor(self.ratings)
+
+    def close(self):
+        pass
+
+
+class DiscardingActivityLogger(activity_logger.ActivityLogger):
+    """Queues events like the real writer (that cost stays in the timings) but never writes them"""
+
+    def _write(self, events):
+        self.written += len(events)
+
+
+class InMemoryRatingModel(RatingModel):
+    """RatingModel whose ratings come from a dict, so only the scoring is timed"""
+
+    def __init__(self, ratings):
+        super().__init__()
+        self.ratings = ratings
+
+    def get_db_connection(self):
+        return _RatingsConnection(self.ratings)
+
+
+def synthetic_ratings(book_model, users, ratings_per_user, seed):
+    """{user_id: [{"book_title", "rating"}]} over titles in the similarity matrix"""
+    rng = np.random.default_rng(seed)
+    titles = np.asarray(book_model.book_titles, dtype=object)
+    return {
+        user_id: [{"book_title": title, "rating": int(rng.integers(1, 11))}
+                  for title in rng.choice(titles, size=min(ratings_per_user, len(titles)), replace=False)]
+        for user_id in range(1, users + 1)
+    }
+
+
+def _time(fn, inputs, repeat, warmup):
+    """Per-call durations in microseconds, cycling through `inputs`"""
+    for i in range(warmup):
+        fn(inputs[i % len(inputs)])
+    samples = []
+    for i in range(repeat):
+        argument = inputs[i % len(inputs)]
+        start = time.perf_counter_ns()
+        fn(argument)
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    return samples
+
+
+def _summary(samples):
+    ordered = sorted(samples)
+    return {
+        "calls": len(samples),
+        "median_us": round(statistics.median(ordered), 2),
+        "mean_us": round(statistics.fmean(ordered), 2),
+        "p95_us": round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+        "min_us": round(ordered[0], 2),
+        "ops_per_second": round(1e6 / statistics.fmean(ordered), 1),
+    }
+
+
+def cases(book_model, movie_model, rating_model, rng):
+    """{case name: (function, inputs)}"""
+    book_titles = list(book_model.book_titles)
+    exact_books = [t for t in rng.choice(book_titles, size=min(200, len(book_titles)), replace=False)]
+    # First two words of a title: resolved by the substring scan
+    partial_books = [" ".join(t.split()[:2]).lower() for t in exact_books]
+    # A dropped letter: misses exact and substring matching, resolved by difflib
+    typo_books = [t[:len(t) // 2] + t[len(t) // 2 + 1:] for t in exact_books[:50]]
+
+    movie_titles = list(movie_model.movies["title"])
+    exact_movies = [t for t in rng.choice(movie_titles, size=min(200, len(movie_titles)), replace=False)]
+    movie_rows = movie_model.movies.to_dict("records")
+    sampled_rows = [movie_rows[i] for i in rng.choice(len(movie_rows), size=min(500, len(movie_rows)), replace=False)]
+    users = list(rating_model.ratings)
+
+    return {
+        "book_recommend_model": (book_model.book_recommend_model, exact_books),
+        "get_book_by_title[exact]": (book_model.get_book_by_title, exact_books),
+        "get_book_by_title[substring]": (book_model.get_book_by_title, partial_books),
+        "get_book_by_title[fuzzy]": (book_model.get_book_by_title, typo_books),
+        "movie_recommend_model": (movie_model.movie_recommend_model, exact_movies),
+        "movie_recommend_model[tfidf]": (lambda t: movie_model.movie_recommend_model(t, include_tfidf=True), exact_movies),
+        "get_recommendations_for_user": (rating_model.get_recommendations_for_user, users),
+        "format_movie_row": (movie_model.format_movie_row, sampled_rows),
+    }
+
+
+def run_scale(directory, repeat, warmup, seed, only=None):
+    app = Flask(__name__)
+    app.json = json_provider(app)
+
+    start = time.perf_counter()
+    book_model = BookRecommendModel(directory)
+    movie_model = MovieRecommendModel(directory)
+    load_seconds = time.perf_counter() - start
+    # RatingModel reads the book artifacts through the registry
+    registry.swap({"book_model": book_model})
+    activity_logger._activity_logger = DiscardingActivityLogger()
+    rating_model = InMemoryRatingModel(synthetic_ratings(book_model, users=50, ratings_per_user=20, seed=seed))
+
+    results = {}
+    rng = np.random.default_rng(seed)
+    with app.app_context():
+        for name, (fn, inputs) in cases(book_model, movie_model, rating_model, rng).items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            # difflib scans every title per call: far fewer calls keep the run short
+            calls = max(10, repeat // 20) if name.endswith("[fuzzy]") else repeat
+            results[name] = _summary(_time(fn, inputs, calls, min(warmup, calls)))
+    return {
+        "artifacts": {
+            "book_titles": len(book_model.book_titles),
+            "catalog_books": len(book_model.books),
+            "movies": len(movie_model.movies),
+            "tfidf_features": len(movie_model.feature_names),
+        },
+        "load_seconds": round(load_seconds, 3),
+        "cases": results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current, baseline):
+    """[(scale, case, baseline median, current median, change)] for cases present in both runs"""
+    rows = []
+    for scale, result in current["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if not previous:
+            continue
+        for name, stats in result["cases"].items():
+            before = previous["cases"].get(name)
+            if before:
+                change = stats["median_us"] / before["median_us"] - 1
+                rows.append((scale, name, before["median_us"], stats["median_us"], change))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the recommendation hot paths on synthetic artifacts")
+    parser.add_argument("--scale", type=float, action="append",
+                        help="artifact scale, repeatable (default: 0.25 and 1; 1 = real artifact sizes)")
+    parser.add_argument("--artifacts", help="use this artifact directory instead of generating one (single scale)")
+    parser.add_argument("--dataset", help="train the artifacts from this CSV dataset directory instead (single scale)")
+    parser.add_argument("--repeat", type=int, default=1000, help="timed calls per case")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--case", action="append", help="only run cases whose name contains this, repeatable")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "scales": {},
+    }
+
+    if args.artifacts:
+        runs = [("artifacts", args.artifacts)]
+    elif args.dataset:
+        runs = [("dataset", None)]
+    else:
+        runs = [(f"{scale:g}", None) for scale in (args.scale or [0.25, 1.0])]
+
+    for label, directory in runs:
+        with tempfile.TemporaryDirectory(prefix="sujhavmitra-bench-") as tmp:
+            if label == "dataset":
+                from train_models import train
+                print(f"Training artifacts from {args.dataset}...", file=sys.stderr)
+                train(args.dataset, tmp)
+                directory = tmp
+            elif directory is None:
+                print(f"Generating artifacts at scale {label}...", file=sys.stderr)
+                write_artifacts(tmp, float(label), args.seed)
+                directory = tmp
+            results["scales"][label] = run_scale(directory, args.repeat, args.warmup, args.seed, args.case)
+
+    for label, result in results["scales"].items():
+        sizes = ", ".join(f"{k}={v}" for k, v in result["artifacts"].items())
+        print(f"scale {label} ({sizes}; loaded in {result['load_seconds']}s)")
+        print(f"  {'case':<32}{'median us':>12}{'p95 us':>12}{'ops/s':>12}")
+        for name, stats in result["cases"].items():
+            print(f"  {name:<32}{stats['median_us']:>12.1f}{stats['p95_us']:>12.1f}{stats['ops_per_second']:>12.0f}")
+        print()
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.compare} (commit {baseline.get('meta', {}).get('commit')}):")
+        for scale, name, before, after, change in compare(results, baseline):
+            flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+            print(f"  {scale:<8}{name:<32}{before:>10.1f} -> {after:>10.1f} us  {change:+7.1%}{flag}")
+            if flag:
+                status = 1
+        results["baseline"] = {"file": args.compare, "commit": baseline.get("meta", {}).get("commit")}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
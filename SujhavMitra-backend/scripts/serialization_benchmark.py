@@ -0,0 +1,159 @@
+"""
+Serialization benchmark: Flask's default JSON encoder with uncompressed
+bodies (before) vs the NumPy-aware providers in model/serialization.py
+with gzip/brotli (after).
+
+Payloads are shaped like the real responses (format_movie_row with cast,
+crew and overview; the TF-IDF recommendation variant; the popular-books
+list). The "before" payloads hold plain Python numbers, as the models used
+to convert them by hand; the "after" payloads hold the NumPy scalars the
+models now pass through.
+
+Usage (from the backend directory):
+    python scripts/serialization_benchmark.py
+    python scripts/serialization_benchmark.py --repeat 2000 --json
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from configs.config import COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY  # noqa: E402
+from model.serialization import NumpyJSONProvider, OrjsonProvider, orjson  # noqa: E402
+from model.compression import brotli  # noqa: E402
+
+WORDS = ("love war family secret city journey young man woman world life death friend power "
+         "king story town father mother police team school night dream lost past future").split()
+
+
+def _words(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _movie(rng, as_numpy, tfidf):
+    number = np.float64 if as_numpy else float
+    movie = {
+        "id": rng.randint(1, 500000),
+        "title": _words(rng, 3).title(),
+        "overview": _words(rng, 60),
+        "genres": rng.sample(["Action", "Drama", "Comedy", "Thriller", "Romance", "Science Fiction"], 3),
+        "cast": [{"name": _words(rng, 2).title(), "character": _words(rng, 2).title()} for _ in range(8)],
+        "crew": [{"name": _words(rng, 2).title(), "job": rng.choice(["Director", "Writer", "Producer"])}
+                 for _ in range(5)],
+        "homepage": "https://example.com/" + _words(rng, 2).replace(" ", "-"),
+        "image": "https://image.tmdb.org/t/p/w500/" + "%032x.jpg" % rng.getrandbits(128),
+        "popularity": number(round(rng.uniform(0, 300), 6)),
+        "vote_average": number(round(rng.uniform(0, 10), 1)),
+        "similarity": f"{rng.uniform(10, 90):.2f}%",
+    }
+    if tfidf:
+        movie["common_features"] = [
+            {"feature": rng.choice(WORDS), "score_movie1": number(round(rng.random(), 4)),
+             "score_movie2": number(round(rng.random(), 4)), "contribution": number(round(rng.random(), 4))}
+            for _ in range(10)
+        ]
+    return movie
+
+
+def payloads(as_numpy, seed=7):
+    rng = random.Random(seed)
+    integer = np.int64 if as_numpy else int
+    number = np.float64 if as_numpy else float
+    return {
+        "recommend_movie": {"recommendations": [_movie(rng, as_numpy, False) for _ in range(10)]},
+        "recommend_movie_tfidf": {
+            "recommendations": [_movie(rng, as_numpy, True) for _ in range(10)],
+            "query_movie_tfidf": [{"feature": w, "score": number(round(rng.random(), 4))} for w in WORDS[:10]],
+            "query_movie_title": "Some Title",
+        },
+        "popular_books": {"popular_books": [
+            {"title": _words(rng, 4).title(), "author": _words(rng, 2).title(), "isbn": "%010d" % rng.getrandbits(32),
+             "publishdate": str(rng.randint(1950, 2005)), "publisher": _words(rng, 2).title(),
+             "imageurl": "http://images.amazon.com/images/P/%010d.01.LZZZZZZZ.jpg" % rng.getrandbits(32),
+             "num_rating": integer(rng.randint(250, 3000)), "avg_rating": number(round(rng.uniform(3, 5), 2))}
+            for _ in range(15)
+        ]},
+    }
+
+
+def _median_us(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def run(repeat):
+    app = Flask(__name__)
+    before = DefaultJSONProvider(app)
+    providers = {"stdlib+numpy": NumpyJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+
+    plain, numpy_payloads = payloads(as_numpy=False), payloads(as_numpy=True)
+    results = {}
+    for name in plain:
+        # Through provider.response(), as make_response(dict) does: body bytes included
+        body = before.response(plain[name]).get_data()
+        row = {"before": {"serialize_us": _median_us(lambda: before.response(plain[name]).get_data(), repeat),
+                          "bytes": len(body)}}
+        for label, provider in providers.items():
+            dump = lambda p=provider: p.response(numpy_payloads[name]).get_data()
+            row[label] = {"serialize_us": _median_us(dump, repeat), "bytes": len(dump())}
+
+        row["gzip"] = {
+            "compress_us": _median_us(lambda: gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0), repeat),
+            "bytes": len(gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)),
+        }
+        if brotli is not None:
+            row["br"] = {
+                "compress_us": _median_us(lambda: brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY), repeat),
+                "bytes": len(brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)),
+            }
+        results[name] = row
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare JSON serialization time and bytes on the wire")
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for name, row in results.items():
+        print(f"{name}")
+        print(f"  {'encoder':<16}{'serialize us':>14}{'bytes':>10}")
+        for label in ("before", "stdlib+numpy", "orjson"):
+            if label in row:
+                print(f"  {label:<16}{row[label]['serialize_us']:>14.1f}{row[label]['bytes']:>10}")
+        for label in ("gzip", "br"):
+            if label in row:
+                ratio = row["before"]["bytes"] / row[label]["bytes"]
+                print(f"  {label:<16}{row[label]['compress_us']:>14.1f}{row[label]['bytes']:>10}  ({ratio:.1f}x smaller)")
+        if "orjson" in row:
+            speedup = row["before"]["serialize_us"] / max(row["orjson"]["serialize_us"], 1e-9)
+            print(f"  orjson serializes {speedup:.1f}x faster")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
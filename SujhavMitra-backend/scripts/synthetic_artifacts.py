@@ -0,0 +1,212 @@
+"""
+Synthetic model artifacts shaped like the ones the notebooks produce.
+
+The checked-in models/*.pkl files are Git LFS pointers, so benchmarks and
+load tests need stand-ins. This writes the columnar artifact set read by
+model/artifact_io.py (Parquet tables and .npy matrices) with the real
+column names, dtypes and relationships:
+
+- books: several editions (ISBNs) per title, plus catalog books that
+  never made it into the similarity matrix;
+- similarity_scores: cosine similarity of non-negative user-rating
+  profiles over the titles with enough ratings (float64, like
+  sklearn's cosine_similarity);
+- popular_books: titles with num_rating / avg_rating;
+- movies / movie_links: TMDB-like rows with genres, overview, poster,
+  homepage, top-billed cast and director;
+- tfidf_vectors: L2-normalized rows over a vocabulary with Zipf-like
+  term frequencies, and similarity_movies = vectors @ vectors.T.
+
+SCALE 1 matches the size of the real filtered artifacts (706 titles in
+the book similarity matrix, a 271k-book catalog, 4806 movies, 5000
+TF-IDF features). The similarity matrices grow quadratically with the
+scale: 4806 movies take 185MB at float64, 10x that takes 18GB.
+
+These are generated directly, which is fast but skips training. For
+artifacts trained like the real ones, generate CSV datasets with
+scripts/synthetic_datasets.py and train them with scripts/train_models.py.
+
+Usage (from the backend directory):
+    python scripts/synthetic_artifacts.py /tmp/synthetic --scale 0.25 --seed 7
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Real artifact sizes at scale 1
+BOOK_TITLES = 706
+CATALOG_BOOKS = 271360
+POPULAR_BOOKS = 50
+MOVIES = 4806
+TFIDF_FEATURES = 5000
+RATING_PROFILE_DIM = 64
+TERMS_PER_MOVIE = 60
+
+WORDS = ("love war family secret city journey young man woman world life death friend power king story "
+         "town father mother police team school night dream lost past future dark house river garden "
+         "stone fire shadow summer winter heart island empire ghost silent last first little great").split()
+GENRES = ("action adventure animation comedy crime documentary drama family fantasy history horror "
+          "music mystery romance sciencefiction thriller war western").split()
+
+
+def _titles(rng, n, words=3):
+    """n distinct title-cased titles made of random words"""
+    titles, seen = [], set()
+    while len(titles) < n:
+        title = " ".join(rng.choice(WORDS, size=rng.integers(1, words + 1))).title()
+        if title.lower() in seen:
+            title = f"{title} {len(titles)}"
+        seen.add(title.lower())
+        titles.append(title)
+    return titles
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def book_artifacts(rng, scale=1.0):
+    """books, popular_books, book_titles and similarity_scores"""
+    n_titles = max(10, int(BOOK_TITLES * scale))
+    n_catalog = max(n_titles * 2, int(CATALOG_BOOKS * scale))
+
+    titles = _titles(rng, n_catalog, words=4)
+    indexed_titles = titles[:n_titles]
+    # Editions: popular titles are reprinted, so some titles get extra ISBNs
+    editions = rng.zipf(2.5, size=n_catalog).clip(1, 8)
+    book_titles = np.repeat(np.asarray(titles, dtype=object), editions)[:n_catalog]
+    rng.shuffle(book_titles)
+    authors = _titles(rng, max(1, n_catalog // 4), words=2)
+    publishers = _titles(rng, max(1, n_catalog // 200), words=2)
+    books = pd.DataFrame({
+        "ISBN": [f"{i:010d}" for i in rng.choice(10 ** 9, size=n_catalog, replace=False)],
+        "Book-Title": book_titles,
+        "Book-Author": rng.choice(np.asarray(authors, dtype=object), size=n_catalog),
+        "Year-Of-Publication": rng.integers(1950, 2006, size=n_catalog).astype(str).astype(object),
+        "Publisher": rng.choice(np.asarray(publishers, dtype=object), size=n_catalog),
+        "Image-URL-L": [f"http://images.amazon.com/images/P/{i:010d}.01.LZZZZZZZ.jpg" for i in range(n_catalog)],
+    })
+    # Every similarity title must resolve to a catalog row
+    missing = sorted(set(indexed_titles) - set(books["Book-Title"]))
+    if missing:
+        books.loc[books.index[:len(missing)], "Book-Title"] = missing
+
+    profiles = _normalize_rows(np.abs(rng.normal(size=(n_titles, RATING_PROFILE_DIM))) ** 2)
+    similarity = profiles @ profiles.T
+    np.fill_diagonal(similarity, 1.0)
+
+    popular = rng.choice(indexed_titles, size=min(POPULAR_BOOKS, n_titles), replace=False)
+    popular_books = pd.DataFrame({
+        "Book-Title": popular,
+        "num_rating": np.sort(rng.integers(250, 3000, size=len(popular)))[::-1],
+        "avg_rating": rng.uniform(3.0, 5.0, size=len(popular)),
+    })
+    return {
+        "books": books,
+        "popular_books": popular_books,
+        "book_titles": pd.DataFrame({"title": np.asarray(indexed_titles, dtype=object)}),
+        "similarity_scores": similarity,
+    }
+
+
+def movie_artifacts(rng, scale=1.0, dtype=np.float64):
+    """movies, movie_links, tfidf_features, tfidf_vectors and similarity_movies"""
+    n_movies = max(10, int(MOVIES * scale))
+    n_features = TFIDF_FEATURES if scale >= 1 else max(100, int(TFIDF_FEATURES * scale))
+    movie_ids = rng.choice(500000, size=n_movies, replace=False) + 1
+
+    movies = pd.DataFrame({
+        "movie_id": movie_ids,
+        "title": _titles(rng, n_movies),
+        "overview": [" ".join(rng.choice(WORDS, size=rng.integers(20, 80))) for _ in range(n_movies)],
+        "genres": [repr(list(rng.choice(GENRES, size=rng.integers(1, 4), replace=False))) for _ in range(n_movies)],
+        "popularity": rng.pareto(1.5, size=n_movies) * 10,
+        "vote_average": rng.normal(6.2, 1.1, size=n_movies).clip(0, 10).round(1),
+        "poster_path": [f"/{rng.integers(2 ** 63):016x}.jpg" for _ in range(n_movies)],
+    })
+
+    def person():
+        return " ".join(rng.choice(WORDS, size=2)).title()
+
+    # As the notebook stores them: the top 3 cast names (a list, kept as its repr
+    # in Parquet) and the director's name
+    has_homepage = rng.random(n_movies) < 0.35
+    movie_links = pd.DataFrame({
+        "movie_id": movie_ids,
+        "homepage": [f"http://www.example.com/movie/{m}" if h else None for m, h in zip(movie_ids, has_homepage)],
+        "cast_original": [repr([person() for _ in range(3)]) for _ in range(n_movies)],
+        "crew_original": [person() for _ in range(n_movies)],
+    })
+
+    # Zipf-like term usage: a few features appear in many movies, most in few
+    term_weights = 1.0 / np.arange(1, n_features + 1)
+    term_weights /= term_weights.sum()
+    vectors = np.zeros((n_movies, n_features), dtype=dtype)
+    for row in range(n_movies):
+        terms = rng.choice(n_features, size=min(TERMS_PER_MOVIE, n_features), replace=False, p=term_weights)
+        vectors[row, terms] = rng.random(len(terms))
+    vectors = _normalize_rows(vectors).astype(dtype)
+    similarity = vectors @ vectors.T
+
+    features = sorted({f"{w}{i}" if i else w for i, w in
+                       ((i // len(WORDS), WORDS[i % len(WORDS)]) for i in range(n_features))})
+    return {
+        "movies": movies,
+        "movie_links": movie_links,
+        "tfidf_features": pd.DataFrame({"feature": np.asarray(features, dtype=object)}),
+        "tfidf_vectors": vectors,
+        "similarity_movies": similarity,
+    }
+
+
+FILES = {
+    "books": "books.parquet",
+    "popular_books": "popular_books.parquet",
+    "book_titles": "book_titles.parquet",
+    "similarity_scores": "similarity_scores.npy",
+    "movies": "movies.parquet",
+    "movie_links": "movie_links.parquet",
+    "tfidf_features": "tfidf_features.parquet",
+    "tfidf_vectors": "tfidf_vectors.npy",
+    "similarity_movies": "similarity_movies.npy",
+}
+
+
+def write_artifacts(directory, scale=1.0, seed=0, dtype=np.float64):
+    """Generate and write the full artifact set. Returns {file name: size in bytes}."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    artifacts = {**book_artifacts(rng, scale), **movie_artifacts(rng, scale, dtype)}
+    written = {}
+    for name, value in artifacts.items():
+        path = os.path.join(directory, FILES[name])
+        if isinstance(value, pd.DataFrame):
+            value.to_parquet(path, compression="zstd")
+        else:
+            np.save(path, np.ascontiguousarray(value), allow_pickle=False)
+        written[FILES[name]] = os.path.getsize(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic model artifacts")
+    parser.add_argument("directory")
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = the size of the real artifacts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dtype", choices=["float64", "float32"], default="float64",
+                        help="dtype of the TF-IDF vectors and movie similarity matrix")
+    args = parser.parse_args(argv)
+
+    written = write_artifacts(args.directory, args.scale, args.seed, np.dtype(args.dtype))
+    for name, size in written.items():
+        print(f"{name:<26}{size / 2 ** 20:>10.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
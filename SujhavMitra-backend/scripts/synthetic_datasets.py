@@ -0,0 +1,488 @@
+"""
+Synthetic Book-Crossing and TMDB 5000 datasets, at any multiple of the real size.
+
+Writes the CSVs the notebooks (and scripts/train_models.py) read, with the
+same file names, columns and value formats:
+
+    <out>/book/Books.csv                  ISBN, Book-Title, Book-Author, Year-Of-Publication,
+                                          Publisher, Image-URL-S, Image-URL-M, Image-URL-L
+    <out>/book/Ratings.csv                User-ID, ISBN, Book-Rating (0 = implicit)
+    <out>/book/Users.csv                  User-ID, Location, Age
+    <out>/movie/tmdb_5000_movies.csv      budget, genres, homepage, id, keywords, ... (JSON lists as text)
+    <out>/movie/tmdb_5000_credits.csv     movie_id, title, cast, crew
+
+Distributions follow the real data closely enough for the training filters
+(users with more than 200 ratings, titles with at least 50 of their ratings,
+popular titles with 250+ ratings) to keep a comparable share of rows:
+
+- power-law popularity: title and actor/director popularity is Zipf-like,
+  user activity is Pareto-distributed, most users never rate anything;
+- taste clusters, so users who rate the same titles produce a meaningful
+  similarity matrix rather than noise;
+- most ratings are implicit zeros, explicit ones depend on the book and
+  the user;
+- title collisions: several editions (ISBNs) per title, different works
+  sharing a title, and movie remakes sharing a title with the original;
+- typos and variants: misspelled, lower-cased and double-spaced titles on
+  some editions, ratings of ISBNs missing from Books.csv, missing ages,
+  authors and overviews, and year 0.
+
+The output depends only on --scale and --seed. Rows are generated and
+written in chunks, so memory stays bounded at 10x and 100x (Ratings.csv
+alone has about 1.15 billion rows at 100x).
+
+Usage (from the backend directory):
+    python scripts/synthetic_datasets.py datasets --scale 1          # where the notebooks look
+    python scripts/synthetic_datasets.py /data/synthetic-10x --scale 10 --seed 7
+    python scripts/train_models.py /data/synthetic-10x /tmp/models-10x
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Sizes of the real datasets at scale 1
+BOOKS = 271360
+USERS = 278858
+RATINGS = 1149780
+MOVIES = 4803
+
+CHUNK_ROWS = 1_000_000
+TASTE_CLUSTERS = 16
+
+# Book-Crossing shape
+EDITIONS_ZIPF = 4.0  # editions (ISBNs) per title
+TITLE_POPULARITY_EXPONENT = 0.75  # Zipf exponent of ratings per title
+USER_ACTIVITY_ALPHA = 0.65  # Pareto tail of ratings per user
+RATING_USERS_SHARE = 0.38  # users who rated at least one book
+MAX_RATINGS_PER_USER = 13602
+IN_CLUSTER_SHARE = 0.6  # ratings a user gives inside their taste cluster
+IMPLICIT_SHARE = 0.62  # Book-Rating 0
+UNKNOWN_ISBN_SHARE = 0.1  # ratings of ISBNs that are not in Books.csv
+SHARED_TITLE_SHARE = 0.02  # different works published under an existing title
+TYPO_SHARE = 0.01  # editions whose title is misspelled or formatted differently
+TITLE_WORD_EXPONENT = 0.5  # Zipf exponent of title words; higher makes more one-word titles collide
+
+STOP_WORDS = "the a an of and to in is his her their with for on at by from as who when".split()
+COUNTRIES = ("usa", "usa", "usa", "usa", "canada", "united kingdom", "germany", "spain", "australia",
+             "italy", "france", "portugal", "new zealand", "netherlands", "switzerland", "brazil")
+GENRES = {28: "Action", 12: "Adventure", 16: "Animation", 35: "Comedy", 80: "Crime", 99: "Documentary",
+          18: "Drama", 10751: "Family", 14: "Fantasy", 36: "History", 27: "Horror", 10402: "Music",
+          9648: "Mystery", 10749: "Romance", 878: "Science Fiction", 10770: "TV Movie", 53: "Thriller",
+          10752: "War", 37: "Western", 10769: "Foreign"}
+LANGUAGES = ("en", "en", "en", "en", "en", "en", "fr", "es", "de", "ja", "zh", "hi", "it", "ko")
+CREW_JOBS = (("Writing", "Screenplay"), ("Writing", "Writer"), ("Production", "Producer"),
+             ("Production", "Executive Producer"), ("Editing", "Editor"), ("Sound", "Original Music Composer"),
+             ("Camera", "Director of Photography"), ("Production", "Casting"), ("Art", "Production Design"))
+
+
+def _zipf_weights(n, exponent, rng=None):
+    """Normalized rank^-exponent weights, shuffled over the n items when rng is given"""
+    weights = np.arange(1, n + 1, dtype=np.float64) ** -exponent
+    if rng is not None:
+        rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _syllable_words(rng, n, min_syllables=1, max_syllables=3):
+    """n distinct pronounceable words"""
+    onsets = np.array(list("bcdfghjklmnprstvwz") + ["br", "ch", "cl", "dr", "gr", "sh", "st", "th", "tr"])
+    vowels = np.array(["a", "e", "i", "o", "u", "ai", "ea", "ou", "y"])
+    codas = np.array(["", "", "", "n", "r", "s", "l", "t", "nd", "rk", "st"])
+    words = set()
+    while len(words) < n:
+        batch = n - len(words) + 64
+        syllables = rng.integers(min_syllables, max_syllables + 1, size=batch)
+        word = np.full(batch, "", dtype=object)
+        for i in range(max_syllables):
+            part = onsets[rng.integers(len(onsets), size=batch)] + vowels[rng.integers(len(vowels), size=batch)]
+            word = np.where(syllables > i, word + part, word)
+        word = word + codas[rng.integers(len(codas), size=batch)]
+        words.update(word.tolist())
+    return np.array(sorted(words)[:n], dtype=object)
+
+
+def _join_words(vocabulary, indices, lengths):
+    """One string per row of `indices`, using its first `lengths[i]` words"""
+    text = vocabulary[indices[:, 0]].astype(object)
+    for i in range(1, indices.shape[1]):
+        text = np.where(lengths > i, text + " " + vocabulary[indices[:, i]], text)
+    return text
+
+
+def _number_repeats(titles):
+    """Second and later uses of a title become sequels ("Title 2"), so collisions are only the intended ones"""
+    repeat = pd.Series(titles).groupby(titles).cumcount().to_numpy()
+    return np.where(repeat > 0, titles + " " + (repeat + 1).astype(str).astype(object), titles)
+
+
+def _isbn10(bodies):
+    """ISBN-10 strings (with check digit) for 9-digit integer bodies"""
+    digits = (bodies[:, None] // 10 ** np.arange(8, -1, -1)) % 10
+    check = (11 - (digits * np.arange(10, 1, -1)).sum(axis=1) % 11) % 11
+    body = np.char.zfill(bodies.astype(str), 9).astype(object)
+    return body + np.where(check == 10, "X", check.astype(str)).astype(object)
+
+
+def _typo(rng, title):
+    """A plausible misspelling or formatting variant of a title"""
+    kind = rng.integers(4)
+    if kind == 0 and len(title) > 3:
+        i = int(rng.integers(1, len(title) - 1))
+        return title[:i] + title[i + 1] + title[i] + title[i + 2:]  # swapped letters
+    if kind == 1 and len(title) > 3:
+        i = int(rng.integers(1, len(title) - 1))
+        return title[:i] + title[i + 1:]  # dropped letter
+    if kind == 2:
+        return title.lower()
+    return title.replace(" ", "  ", 1) if " " in title else title + " "
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._header = True
+
+    def write(self, frame):
+        frame[self.columns].to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+        self.rows += len(frame)
+
+
+def _log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+class BookCrossing:
+    """Books/Users/Ratings with shared title popularity and taste clusters"""
+
+    def __init__(self, rng, scale):
+        self.rng = rng
+        self.n_books = max(100, int(BOOKS * scale))
+        self.n_users = max(100, int(USERS * scale))
+        self.n_ratings = max(1000, int(RATINGS * scale))
+
+        # Titles (works) and their editions: book row -> title
+        editions = rng.zipf(EDITIONS_ZIPF, size=self.n_books).clip(1, 12)
+        self.book_title = np.repeat(np.arange(self.n_books), editions)[:self.n_books]
+        self.n_titles = int(self.book_title[-1]) + 1
+        # 0 for the first edition of each title, 1 for the second, ...
+        starts = np.r_[0, np.flatnonzero(np.diff(self.book_title)) + 1]
+        self.edition = np.arange(self.n_books) - np.repeat(starts, np.diff(np.r_[starts, self.n_books]))
+
+        self.title_cluster = rng.integers(TASTE_CLUSTERS, size=self.n_titles)
+        self.title_quality = rng.normal(7.6, 0.8, size=self.n_titles)
+        title_popularity = _zipf_weights(self.n_titles, TITLE_POPULARITY_EXPONENT, rng)
+        # Ratings of a title mostly go to its first edition
+        self.book_weight = title_popularity[self.book_title] / (1.0 + self.edition) ** 2
+
+        # ISBN bodies below 5e8 are in Books.csv, unknown ISBNs in ratings use the rest
+        self.isbn_bodies = np.sort(rng.choice(500_000_000, size=self.n_books, replace=False))
+        rng.shuffle(self.isbn_bodies)
+
+        self.cluster_books = []
+        for cluster in range(TASTE_CLUSTERS):
+            rows = np.flatnonzero(self.title_cluster[self.book_title] == cluster)
+            self.cluster_books.append((rows, np.cumsum(self.book_weight[rows])))
+        self.all_books = (np.arange(self.n_books), np.cumsum(self.book_weight))
+
+    def _pick_books(self, candidates, n):
+        rows, cumulative = candidates
+        if not len(rows):
+            rows, cumulative = self.all_books
+        picks = np.searchsorted(cumulative, self.rng.random(n) * cumulative[-1], side="right")
+        return rows[np.minimum(picks, len(rows) - 1)]
+
+    def books(self, writer):
+        rng = self.rng
+        title_vocabulary = _syllable_words(rng, 4000)
+        title_vocabulary = np.array([w.title() for w in title_vocabulary], dtype=object)
+        title_word_weights = _zipf_weights(len(title_vocabulary), TITLE_WORD_EXPONENT, rng)
+
+        lengths = rng.choice([1, 2, 2, 3, 3, 3, 4, 4, 5], size=self.n_titles)
+        words = rng.choice(len(title_vocabulary), size=(self.n_titles, 5), p=title_word_weights)
+        titles = _join_words(title_vocabulary, words, lengths)
+        titles = np.where(rng.random(self.n_titles) < 0.25, "The " + titles, titles)
+        titles = _number_repeats(titles)
+        # Different works published under the title of an earlier one
+        shared = np.flatnonzero(rng.random(self.n_titles) < SHARED_TITLE_SHARE)
+        titles[shared] = titles[rng.integers(self.n_titles, size=len(shared))]
+
+        n_authors = max(10, self.n_titles // 3)
+        first = _syllable_words(rng, 800)
+        last = _syllable_words(rng, 5000, 2, 3)
+        authors = np.array([f"{f.title()} {l.title()}" for f, l in
+                            zip(rng.choice(first, n_authors), rng.choice(last, n_authors))], dtype=object)
+        # Author names written with initials on some works
+        initials = rng.random(n_authors) < 0.1
+        authors[initials] = [f"{a[0]}. {a.split(' ', 1)[1]}" for a in authors[initials]]
+        title_author = rng.choice(n_authors, size=self.n_titles, p=_zipf_weights(n_authors, 0.8, rng))
+        publishers = np.array([f"{w.title()} {s}" for w, s in zip(
+            _syllable_words(rng, max(20, self.n_books // 160), 2, 3),
+            rng.choice(["Books", "Press", "Publishing", "House", "Inc", "Paperbacks"], max(20, self.n_books // 160)))],
+            dtype=object)
+        publisher_weights = _zipf_weights(len(publishers), 1.1, rng)
+        title_year = rng.normal(1993, 8, size=self.n_titles).clip(1900, 2004).astype(int)
+
+        for start in range(0, self.n_books, CHUNK_ROWS):
+            rows = np.arange(start, min(start + CHUNK_ROWS, self.n_books))
+            title_ids = self.book_title[rows]
+            book_titles = titles[title_ids].copy()
+            for i in np.flatnonzero(rng.random(len(rows)) < TYPO_SHARE):
+                book_titles[i] = _typo(rng, book_titles[i])
+            isbns = _isbn10(self.isbn_bodies[rows])
+            years = (title_year[title_ids] + self.edition[rows] * rng.integers(0, 4, size=len(rows))).clip(max=2006)
+            years = np.where(rng.random(len(rows)) < 0.015, 0, years)
+            author = authors[title_author[title_ids]]
+            author = np.where(rng.random(len(rows)) < 0.00001, None, author)
+            publisher = rng.choice(publishers, size=len(rows), p=publisher_weights)
+            publisher = np.where(rng.random(len(rows)) < 0.00001, None, publisher)
+            frame = pd.DataFrame({
+                "ISBN": isbns,
+                "Book-Title": book_titles,
+                "Book-Author": author,
+                "Year-Of-Publication": years,
+                "Publisher": publisher,
+            })
+            for size, suffix in (("S", "THUMBZZZ"), ("M", "MZZZZZZZ"), ("L", "LZZZZZZZ")):
+                frame[f"Image-URL-{size}"] = "http://images.amazon.com/images/P/" + frame["ISBN"] + f".01.{suffix}.jpg"
+            writer.write(frame)
+
+    def users(self, writer):
+        rng = self.rng
+        cities = _syllable_words(rng, max(50, self.n_users // 40), 2, 3)
+        regions = _syllable_words(rng, 300, 2, 3)
+        city_weights = _zipf_weights(len(cities), 1.0, rng)
+        country_of_region = rng.choice(COUNTRIES, size=len(regions))
+        for start in range(0, self.n_users, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, self.n_users - start)
+            region = rng.integers(len(regions), size=n)
+            location = (rng.choice(cities, size=n, p=city_weights) + ", " + regions[region] + ", "
+                        + country_of_region[region].astype(object))
+            age = rng.normal(35, 13, size=n).clip(5, 100).round()
+            age[rng.random(n) < 0.4] = np.nan
+            outliers = rng.random(n) < 0.002
+            age[outliers] = rng.choice([0.0, 1.0, 103.0, 150.0, 201.0, 244.0], size=outliers.sum())
+            writer.write(pd.DataFrame({"User-ID": np.arange(start + 1, start + n + 1), "Location": location, "Age": age}))
+
+    def ratings(self, writer):
+        rng = self.rng
+        # Ratings per user: most users none, a few hundred thousand-plus
+        rates = rng.random(self.n_users) < RATING_USERS_SHARE
+        counts = np.zeros(self.n_users, dtype=np.int64)
+        counts[rates] = np.floor((1 - rng.random(rates.sum())) ** (-1 / USER_ACTIVITY_ALPHA)).clip(1, MAX_RATINGS_PER_USER)
+        counts = np.maximum(np.round(counts * self.n_ratings / counts.sum()).astype(np.int64), rates.astype(np.int64))
+        user_cluster = rng.integers(TASTE_CLUSTERS, size=self.n_users)
+        user_bias = rng.normal(0, 0.7, size=self.n_users)
+
+        cumulative = np.cumsum(counts)
+        start = 0
+        while start < self.n_users:
+            # Users whose ratings add up to about CHUNK_ROWS
+            done = cumulative[start - 1] if start else 0
+            end = min(self.n_users, max(start + 1, int(np.searchsorted(cumulative, done + CHUNK_ROWS))))
+            users = np.repeat(np.arange(start, end), counts[start:end])
+            start = end
+            if not len(users):
+                continue
+            books = np.empty(len(users), dtype=np.int64)
+            in_cluster = rng.random(len(users)) < IN_CLUSTER_SHARE
+            clusters = user_cluster[users]
+            for cluster in range(TASTE_CLUSTERS):
+                mask = in_cluster & (clusters == cluster)
+                books[mask] = self._pick_books(self.cluster_books[cluster], int(mask.sum()))
+            books[~in_cluster] = self._pick_books(self.all_books, int((~in_cluster).sum()))
+
+            frame = pd.DataFrame({"user": users, "book": books}).drop_duplicates()
+            users, books = frame["user"].to_numpy(), frame["book"].to_numpy()
+            bodies = self.isbn_bodies[books]
+            unknown = rng.random(len(books)) < UNKNOWN_ISBN_SHARE
+            bodies[unknown] = rng.integers(500_000_000, 1_000_000_000, size=unknown.sum())
+
+            explicit = np.rint(rng.normal(self.title_quality[self.book_title[books]] + user_bias[users], 1.5)).clip(1, 10)
+            rating = np.where(rng.random(len(books)) < IMPLICIT_SHARE, 0, explicit).astype(np.int64)
+            writer.write(pd.DataFrame({"User-ID": users + 1, "ISBN": _isbn10(bodies), "Book-Rating": rating}))
+
+
+class Tmdb:
+    """tmdb_5000_movies / tmdb_5000_credits rows with genre-topic overviews and power-law people"""
+
+    def __init__(self, rng, scale):
+        self.rng = rng
+        self.n_movies = max(50, int(MOVIES * scale))
+        self.vocabulary = _syllable_words(rng, 30000, 1, 3)
+        self.word_weights = _zipf_weights(len(self.vocabulary), 1.05, rng)
+        # Each genre favours its own topic words, so overviews of a genre share terms
+        self.genre_topics = {g: rng.choice(len(self.vocabulary), size=300, replace=False) for g in GENRES}
+        self.keywords = _syllable_words(rng, max(500, self.n_movies * 2), 2, 3)
+        self.keyword_weights = _zipf_weights(len(self.keywords), 0.9, rng)
+
+        n_people = max(1000, self.n_movies * 12)
+        first = _syllable_words(rng, 1500)
+        last = _syllable_words(rng, 8000, 2, 3)
+        self.people = np.array([f"{f.title()} {l.title()}" for f, l in
+                                zip(rng.choice(first, n_people), rng.choice(last, n_people))], dtype=object)
+        self.people_ids = rng.choice(2_000_000, size=n_people, replace=False) + 1
+        self.people_gender = rng.choice([0, 1, 2], size=n_people, p=[0.3, 0.3, 0.4])
+        self.actor_weights = _zipf_weights(n_people, 0.9, rng)
+        n_directors = max(50, self.n_movies // 2)
+        self.directors = rng.choice(n_people, size=n_directors, replace=False)
+        self.director_weights = _zipf_weights(n_directors, 0.8, rng)
+        self.companies = _syllable_words(rng, max(100, self.n_movies // 2), 2, 3)
+        self.company_weights = _zipf_weights(len(self.companies), 1.0, rng)
+
+    def _overview(self, genre_ids):
+        rng = self.rng
+        n = int(rng.integers(15, 90))
+        topic = rng.random(n) < 0.35
+        words = self.vocabulary[rng.choice(len(self.vocabulary), size=n, p=self.word_weights)]
+        topics = np.concatenate([self.genre_topics[g] for g in genre_ids])
+        words[topic] = self.vocabulary[rng.choice(topics, size=topic.sum())]
+        stop = rng.random(n) < 0.25
+        words[stop] = rng.choice(STOP_WORDS, size=stop.sum())
+        text = " ".join(words)
+        return text[0].upper() + text[1:] + "."
+
+    def _credits(self, movie_index):
+        rng = self.rng
+        cast_size = int(rng.integers(4, 40))
+        actors = rng.choice(len(self.people), size=cast_size, replace=False, p=self.actor_weights)
+        cast = [{
+            "cast_id": int(i + 1),
+            "character": " ".join(rng.choice(self.vocabulary, size=int(rng.integers(1, 3)))).title(),
+            "credit_id": "%024x" % rng.integers(2 ** 62),
+            "gender": int(self.people_gender[a]),
+            "id": int(self.people_ids[a]),
+            "name": self.people[a],
+            "order": int(i),
+        } for i, a in enumerate(actors)]
+
+        crew = []
+        # A handful of entries have no director, like the real data
+        if rng.random() > 0.005:
+            director = self.directors[rng.choice(len(self.directors), p=self.director_weights)]
+            crew.append({"credit_id": "%024x" % rng.integers(2 ** 62), "department": "Directing",
+                         "gender": int(self.people_gender[director]), "id": int(self.people_ids[director]),
+                         "job": "Director", "name": self.people[director]})
+        for person in rng.choice(len(self.people), size=int(rng.integers(2, 30))):
+            department, job = CREW_JOBS[rng.integers(len(CREW_JOBS))]
+            crew.append({"credit_id": "%024x" % rng.integers(2 ** 62), "department": department,
+                         "gender": int(self.people_gender[person]), "id": int(self.people_ids[person]),
+                         "job": job, "name": self.people[person]})
+        return json.dumps(cast), json.dumps(crew)
+
+    def write(self, movies_writer, credits_writer):
+        rng = self.rng
+        genre_ids = np.array(list(GENRES))
+        genre_weights = np.array([6 if GENRES[g] in ("Drama", "Comedy", "Thriller", "Action") else 2 for g in genre_ids],
+                                 dtype=np.float64)
+        genre_weights /= genre_weights.sum()
+        ids = rng.choice(450_000, size=self.n_movies, replace=False) + 1
+        title_words = self.vocabulary[rng.choice(len(self.vocabulary), size=(self.n_movies, 4), p=self.word_weights)]
+        lengths = rng.choice([1, 2, 2, 3, 3, 4], size=self.n_movies)
+        titles = np.array([" ".join(w[:k]).title() for w, k in zip(title_words, lengths)], dtype=object)
+        titles = _number_repeats(titles)
+        # Remakes and unrelated films that share a title
+        remakes = np.flatnonzero(rng.random(self.n_movies) < 0.003)
+        titles[remakes] = titles[rng.integers(self.n_movies, size=len(remakes))]
+
+        for start in range(0, self.n_movies, CHUNK_ROWS // 100):
+            rows = range(start, min(start + CHUNK_ROWS // 100, self.n_movies))
+            movies, credits = [], []
+            for i in rows:
+                genres = [int(g) for g in rng.choice(genre_ids, size=int(rng.integers(1, 5)), replace=False, p=genre_weights)]
+                keywords = rng.choice(len(self.keywords), size=int(rng.integers(0, 15)), replace=False,
+                                      p=self.keyword_weights)
+                companies = rng.choice(len(self.companies), size=int(rng.integers(0, 4)), replace=False,
+                                       p=self.company_weights)
+                language = str(rng.choice(LANGUAGES))
+                votes = int(rng.lognormal(5.5, 1.8)) if rng.random() > 0.01 else 0
+                released = pd.Timestamp("1916-01-01") + pd.Timedelta(days=int(rng.beta(5, 1.5) * 36500))
+                budget = int(rng.lognormal(16.5, 1.5)) if rng.random() > 0.25 else 0
+                movies.append({
+                    "budget": budget,
+                    "genres": json.dumps([{"id": g, "name": GENRES[g]} for g in genres]),
+                    "homepage": f"http://www.{titles[i].lower().replace(' ', '')}movie.com/" if rng.random() < 0.35 else None,
+                    "id": int(ids[i]),
+                    "keywords": json.dumps([{"id": int(k) + 1000, "name": self.keywords[k]} for k in keywords]),
+                    "original_language": language,
+                    "original_title": titles[i] if language == "en" or rng.random() < 0.5
+                    else " ".join(rng.choice(self.vocabulary, size=2)).title(),
+                    "overview": self._overview(genres) if rng.random() > 0.0006 else None,
+                    "popularity": float(rng.pareto(1.3) * 8),
+                    "production_companies": json.dumps([{"name": self.companies[c].title() + " Pictures",
+                                                         "id": int(c) + 1} for c in companies]),
+                    "production_countries": json.dumps([{"iso_3166_1": "US", "name": "United States of America"}]),
+                    "release_date": released.strftime("%Y-%m-%d") if rng.random() > 0.0002 else None,
+                    "revenue": int(budget * rng.lognormal(0.8, 1.0)) if budget and rng.random() > 0.3 else 0,
+                    "runtime": float(round(np.clip(rng.normal(107, 22), 0, 338))),
+                    "spoken_languages": json.dumps([{"iso_639_1": language, "name": ""}]),
+                    "status": "Released" if rng.random() > 0.002 else "Rumored",
+                    "tagline": " ".join(rng.choice(self.vocabulary, size=int(rng.integers(3, 9)))).capitalize()
+                    if rng.random() > 0.17 else None,
+                    "title": titles[i],
+                    "vote_average": float(round(np.clip(rng.normal(6.1, 1.0), 0, 10), 1)) if votes else 0.0,
+                    "vote_count": votes,
+                })
+                cast, crew = self._credits(i)
+                credits.append({"movie_id": int(ids[i]), "title": titles[i], "cast": cast, "crew": crew})
+            movies_writer.write(pd.DataFrame(movies))
+            credits_writer.write(pd.DataFrame(credits))
+
+
+def generate(out, scale=1.0, seed=0, books=True, movies=True):
+    """Write the datasets under `out`. Returns {path: rows}."""
+    rng = np.random.default_rng(seed)
+    written = {}
+    if books:
+        os.makedirs(os.path.join(out, "book"), exist_ok=True)
+        crossing = BookCrossing(np.random.default_rng(rng.integers(2 ** 63)), scale)
+        for name, columns, method in (
+            ("Books.csv", ["ISBN", "Book-Title", "Book-Author", "Year-Of-Publication", "Publisher",
+                           "Image-URL-S", "Image-URL-M", "Image-URL-L"], crossing.books),
+            ("Users.csv", ["User-ID", "Location", "Age"], crossing.users),
+            ("Ratings.csv", ["User-ID", "ISBN", "Book-Rating"], crossing.ratings),
+        ):
+            start = time.perf_counter()
+            writer = _CsvWriter(os.path.join(out, "book", name), columns)
+            method(writer)
+            written[writer.path] = writer.rows
+            _log(f"{writer.path}: {writer.rows} rows in {time.perf_counter() - start:.1f}s")
+    if movies:
+        os.makedirs(os.path.join(out, "movie"), exist_ok=True)
+        start = time.perf_counter()
+        tmdb = Tmdb(np.random.default_rng(rng.integers(2 ** 63)), scale)
+        movies_writer = _CsvWriter(os.path.join(out, "movie", "tmdb_5000_movies.csv"), [
+            "budget", "genres", "homepage", "id", "keywords", "original_language", "original_title", "overview",
+            "popularity", "production_companies", "production_countries", "release_date", "revenue", "runtime",
+            "spoken_languages", "status", "tagline", "title", "vote_average", "vote_count"])
+        credits_writer = _CsvWriter(os.path.join(out, "movie", "tmdb_5000_credits.csv"),
+                                    ["movie_id", "title", "cast", "crew"])
+        tmdb.write(movies_writer, credits_writer)
+        for writer in (movies_writer, credits_writer):
+            written[writer.path] = writer.rows
+        _log(f"{movies_writer.path}, {credits_writer.path}: {movies_writer.rows} movies "
+             f"in {time.perf_counter() - start:.1f}s")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Book-Crossing and TMDB shaped CSV datasets")
+    parser.add_argument("out", help="output directory (book/ and movie/ are created inside)")
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = the size of the real datasets")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", choices=["books", "movies"], help="generate one of the two datasets")
+    args = parser.parse_args(argv)
+
+    generate(args.out, args.scale, args.seed, books=args.only != "movies", movies=args.only != "books")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
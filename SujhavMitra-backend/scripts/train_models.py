@@ -0,0 +1,194 @@
+"""
+Train the book and movie models from the Book-Crossing and TMDB CSVs.
+
+The same steps as notebooks/book-recommender.ipynb and
+notebooks/movie-recommender.ipynb, without the exploration and plots, so
+that retraining (and training on the output of scripts/synthetic_datasets.py)
+does not need Jupyter:
+
+- books: ratings of users with more than 200 ratings, on titles with at
+  least 50 of those ratings, pivoted into a title x user matrix; cosine
+  similarity between titles; the 50 best-rated titles with 250+ ratings;
+- movies: overview, genres, keywords, top 3 cast and director as tags,
+  TF-IDF with 5000 features, cosine similarity between movies.
+
+One deviation: the movie rows are renumbered after dropping incomplete
+ones, so that row labels match the similarity matrix rows.
+
+The output is the artifact set the app serves, ready for
+`python -m model.artifacts publish`: Parquet + .npy by default, or the
+notebooks' pickles with --format pickle. The book similarity matrix is
+titles^2 x 8 bytes and the movie one movies^2 x 8 bytes, so a 10x dataset
+needs a few GB of memory.
+
+Usage (from the backend directory; needs scikit-learn):
+    python scripts/train_models.py datasets models/versions/2025-01-15
+    python scripts/train_models.py /data/synthetic-10x /tmp/models-10x --only books
+"""
+import argparse
+import ast
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from model.artifact_io import convert_to_columnar  # noqa: E402
+
+ACTIVE_USER_RATINGS = 200  # users with more ratings than this feed the similarity matrix
+MATRIX_TITLE_RATINGS = 50  # ... on titles with at least this many of their ratings
+POPULAR_MIN_RATINGS = 250
+POPULAR_BOOKS = 50
+TFIDF_FEATURES = 5000
+TOP_CAST = 3
+
+
+def train_books(dataset_dir):
+    """{pickle name: object} as written by the book notebook"""
+    books = pd.read_csv(os.path.join(dataset_dir, "book", "Books.csv"), dtype={"Year-Of-Publication": str})
+    ratings = pd.read_csv(os.path.join(dataset_dir, "book", "Ratings.csv"))
+
+    # Only the title is needed from books to group the ratings
+    book_name_rating = ratings.merge(books[["ISBN", "Book-Title"]], on="ISBN")
+
+    by_title = book_name_rating.groupby("Book-Title")["Book-Rating"]
+    popular_books_df = pd.DataFrame({"num_rating": by_title.count(), "avg_rating": by_title.mean()}).reset_index()
+    popular_books_df = popular_books_df[popular_books_df["num_rating"] >= POPULAR_MIN_RATINGS]
+    popular_books_df = popular_books_df.sort_values("avg_rating", ascending=False).head(POPULAR_BOOKS)
+    popular_books_df = popular_books_df.merge(books, on="Book-Title").drop_duplicates("Book-Title")[
+        ["Book-Title", "Book-Author", "Image-URL-M", "num_rating", "avg_rating"]]
+
+    user_rating_counts = book_name_rating.groupby("User-ID")["Book-Rating"].count()
+    active_users = user_rating_counts[user_rating_counts > ACTIVE_USER_RATINGS].index
+    filtered_ratings = book_name_rating[book_name_rating["User-ID"].isin(active_users)]
+    book_rating_counts = filtered_ratings.groupby("Book-Title")["Book-Rating"].count()
+    matrix_titles = book_rating_counts[book_rating_counts >= MATRIX_TITLE_RATINGS].index
+    final_filtered_ratings = filtered_ratings[filtered_ratings["Book-Title"].isin(matrix_titles)]
+
+    book_user_matrix = final_filtered_ratings.pivot_table(index="Book-Title", columns="User-ID", values="Book-Rating")
+    book_user_matrix.fillna(0, inplace=True)
+    similarity_scores = cosine_similarity(book_user_matrix)
+
+    return {
+        "popular_books_df": popular_books_df,
+        "book_user_matrix": book_user_matrix,
+        "books": books,
+        "similarity_scores": similarity_scores,
+    }
+
+
+def _names(obj):
+    names = []
+    try:
+        for item in ast.literal_eval(obj):
+            names.append(item["name"])
+    except (ValueError, SyntaxError):
+        pass  # skip this row
+    return names
+
+
+def _director(obj):
+    for item in ast.literal_eval(obj):
+        if item["job"] == "Director":
+            return item["name"]
+    return ""
+
+
+def _squash(values):
+    return [value.replace(" ", "").lower() for value in values]
+
+
+def train_movies(dataset_dir):
+    """{pickle name: object} as written by the movie notebook"""
+    movies = pd.read_csv(os.path.join(dataset_dir, "movie", "tmdb_5000_movies.csv"))
+    credits = pd.read_csv(os.path.join(dataset_dir, "movie", "tmdb_5000_credits.csv"))
+
+    movies = movies.merge(credits, on="title")
+    movies_detailsfor_frontend = movies[["movie_id", "homepage"]].copy()
+
+    movies = movies[["movie_id", "title", "overview", "genres", "keywords", "cast", "crew", "popularity",
+                     "vote_average"]].dropna()
+    movies["genres"] = movies["genres"].apply(_names)
+    movies["keywords"] = movies["keywords"].apply(_names)
+    movies["cast"] = movies["cast"].apply(lambda x: _names(x)[:TOP_CAST])
+    movies_detailsfor_frontend["cast_original"] = movies["cast"]
+    movies["crew"] = movies["crew"].apply(_director)
+    movies_detailsfor_frontend["crew_original"] = movies["crew"]
+
+    movies["genres"] = movies["genres"].apply(_squash)
+    movies["keywords"] = movies["keywords"].apply(_squash)
+    movies["cast"] = movies["cast"].apply(_squash)
+    movies["crew"] = movies["crew"].apply(lambda x: x.replace(" ", "").lower())
+    movies["overview"] = movies["overview"].apply(lambda x: x.lower().split())
+    movies["tags"] = movies["overview"] + movies["genres"] + movies["keywords"] + movies["cast"] + movies["crew"].apply(lambda x: [x])
+
+    new_movies_list = movies.drop(columns=["keywords"]).reset_index(drop=True)
+    new_movies_list["tags"] = new_movies_list["tags"].apply(lambda x: " ".join(x))
+
+    vectorizer = TfidfVectorizer(max_features=TFIDF_FEATURES, stop_words="english")
+    vectors = vectorizer.fit_transform(new_movies_list["tags"]).toarray()
+    similarity = cosine_similarity(vectors)
+
+    return {
+        "movie_list": new_movies_list,
+        "similarity_movies": similarity,
+        "movie_homepage_link": movies_detailsfor_frontend,
+        "tfidf_vectorizer": vectorizer,
+        "tfidf_vectors": vectors,
+    }
+
+
+def _dump(objects, directory):
+    os.makedirs(directory, exist_ok=True)
+    for name, obj in objects.items():
+        with open(os.path.join(directory, f"{name}.pkl"), "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def train(dataset_dir, out, artifact_format="columnar", books=True, movies=True):
+    """Train and write the artifacts. Returns {file name: size in bytes}."""
+    objects = {}
+    for enabled, label, step in ((books, "books", train_books), (movies, "movies", train_movies)):
+        if enabled:
+            start = time.perf_counter()
+            objects.update(step(dataset_dir))
+            print(f"Trained {label} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    if artifact_format == "pickle":
+        _dump(objects, out)
+        return {f"{name}.pkl": os.path.getsize(os.path.join(out, f"{name}.pkl")) for name in objects}
+
+    # Written through the notebooks' pickles, so the columnar set is exactly what
+    # `python -m model.artifacts convert` produces from them
+    if not (books and movies):
+        raise ValueError("the columnar set needs both models; use --format pickle with --only")
+    with tempfile.TemporaryDirectory(prefix="sujhavmitra-train-") as tmp:
+        _dump(objects, tmp)
+        objects.clear()
+        return convert_to_columnar(tmp, out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the recommendation artifacts from the CSV datasets")
+    parser.add_argument("dataset_dir", help="directory holding book/ and movie/ (e.g. datasets)")
+    parser.add_argument("out", help="artifact directory to write")
+    parser.add_argument("--format", choices=["columnar", "pickle"], default="columnar")
+    parser.add_argument("--only", choices=["books", "movies"], help="train one model (pickle format only)")
+    args = parser.parse_args(argv)
+
+    written = train(args.dataset_dir, args.out, args.format, books=args.only != "movies", movies=args.only != "books")
+    for name, size in written.items():
+        print(f"{name:<26}{size / 2 ** 20:>10.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Per-process memory report for a running gunicorn master and its workers.
+
+RSS counts every resident page, including pages still shared with the
+master, so summing worker RSS overstates real usage. USS (unique set size:
+Private_Clean + Private_Dirty) is what each worker would free on exit, and
+PSS splits shared pages evenly between the processes mapping them. A worker
+whose USS stays small while its RSS is large is sharing the preloaded
+models; USS growing under traffic means pages are being copied.
+
+Usage (Linux, from the backend directory, while gunicorn is running):
+    python scripts/worker_memory.py                     # master pid from GUNICORN_PIDFILE
+    python scripts/worker_memory.py --pid 12345
+    python scripts/worker_memory.py --hit http://127.0.0.1:5000/recommend/book?title=1984 --requests 200
+    python scripts/worker_memory.py --json
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.request
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configs.config import GUNICORN_PIDFILE
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def read_smaps_rollup(pid):
+    """Memory counters for a process in KiB, from /proc/<pid>/smaps_rollup"""
+    counters = dict.fromkeys(FIELDS, 0)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            key = parts[0].rstrip(":")
+            if key in counters:
+                counters[key] = int(parts[1])
+    counters["Uss"] = counters["Private_Clean"] + counters["Private_Dirty"]
+    counters["Shared"] = counters["Shared_Clean"] + counters["Shared_Dirty"]
+    return counters
+
+
+def child_pids(parent):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; the ppid follows the closing ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == parent:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def generate_traffic(url, count):
+    """Send `count` GET requests so workers touch the shared artifacts"""
+    failures = 0
+    for _ in range(count):
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                response.read()
+        except Exception:
+            failures += 1
+    return failures
+
+
+def report(master_pid):
+    processes = [("master", master_pid)] + [("worker", pid) for pid in child_pids(master_pid)]
+    rows = []
+    for role, pid in processes:
+        try:
+            rows.append({"role": role, "pid": pid, **read_smaps_rollup(pid)})
+        except OSError:
+            continue  # exited while we were looking
+
+    workers = [r for r in rows if r["role"] == "worker"]
+    summary = {
+        "workers": len(workers),
+        "naive_rss_total_kb": sum(r["Rss"] for r in rows),
+        "pss_total_kb": sum(r["Pss"] for r in rows),
+        "worker_uss_total_kb": sum(r["Uss"] for r in workers),
+        "worker_shared_total_kb": sum(r["Shared"] for r in workers),
+    }
+    # What forking saved versus every process holding a private copy
+    summary["shared_savings_kb"] = summary["naive_rss_total_kb"] - summary["pss_total_kb"]
+    return rows, summary
+
+
+def print_report(rows, summary):
+    mb = lambda kb: f"{kb / 1024:9.1f}"
+    print(f"{'role':<8}{'pid':>8}{'RSS MB':>10}{'PSS MB':>10}{'Shared MB':>10}{'USS MB':>10}")
+    for r in rows:
+        print(f"{r['role']:<8}{r['pid']:>8}{mb(r['Rss'])} {mb(r['Pss'])} {mb(r['Shared'])} {mb(r['Uss'])}")
+    print()
+    print(f"workers:                 {summary['workers']}")
+    print(f"sum of RSS (naive):      {mb(summary['naive_rss_total_kb']).strip()} MB")
+    print(f"sum of PSS (actual):     {mb(summary['pss_total_kb']).strip()} MB")
+    print(f"worker USS total:        {mb(summary['worker_uss_total_kb']).strip()} MB")
+    print(f"saved by sharing:        {mb(summary['shared_savings_kb']).strip()} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-worker unique/shared memory of a gunicorn master")
+    parser.add_argument("--pid", type=int, help="gunicorn master pid (default: read GUNICORN_PIDFILE)")
+    parser.add_argument("--hit", metavar="URL", help="request this URL before measuring")
+    parser.add_argument("--requests", type=int, default=100, help="number of requests sent with --hit")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("This script needs Linux /proc/<pid>/smaps_rollup (kernel 4.14+)")
+        return 1
+
+    master_pid = args.pid
+    if master_pid is None:
+        try:
+            with open(GUNICORN_PIDFILE) as f:
+                master_pid = int(f.read().strip())
+        except (OSError, ValueError):
+            print(f"Could not read the master pid from {GUNICORN_PIDFILE}; pass --pid")
+            return 1
+
+    before = None
+    if args.hit:
+        before = report(master_pid)
+        failures = generate_traffic(args.hit, args.requests)
+        if failures:
+            print(f"{failures}/{args.requests} requests failed")
+
+    rows, summary = report(master_pid)
+    if args.json:
+        result = {"processes": rows, "summary": summary}
+        if before:
+            result["before_traffic"] = {"processes": before[0], "summary": before[1]}
+        print(json.dumps(result, indent=2))
+        return 0
+
+    if before:
+        print("Before traffic:")
+        print_report(*before)
+        print(f"\nAfter {args.requests} requests to {args.hit}:")
+    print_report(rows, summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())